@@ -0,0 +1,15 @@
+from django_filters import FilterSet, CharFilter, DateFilter, NumberFilter
+
+from analyses.models import AnalysisResult
+
+
+class AnalysesResultFilter(FilterSet):
+    analysis = NumberFilter(field_name="analysis_id", label="Analysis ID")
+    patient = NumberFilter(field_name="analysis__patient_id", label="Patient ID")
+    test_name = CharFilter(field_name="test_name", lookup_expr="icontains", label="Test Name")
+    measured_from = DateFilter(field_name="measured_at", lookup_expr="gte", label="Measured From")
+    measured_to = DateFilter(field_name="measured_at", lookup_expr="lte", label="Measured To")
+
+    class Meta:
+        model = AnalysisResult
+        fields = ['analysis', 'patient', 'test_name', 'measured_from', 'measured_to']
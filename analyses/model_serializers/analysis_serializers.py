@@ -10,6 +10,7 @@ from django.contrib.auth import get_user_model
 import fitz
 
 from analyses.models import Analysis, AnalysisResult
+from core.response_cache import invalidate_models
 
 User = get_user_model()
 
@@ -121,5 +122,6 @@ class AnalysisWriteSerializer(serializers.ModelSerializer):
                 for row in rows
             ]
             AnalysisResult.objects.bulk_create(bulk)
+            invalidate_models(AnalysisResult)  # bulk_create sends no post_save
 
         return analysis
\ No newline at end of file
@@ -1,17 +1,21 @@
 from analyses.filters import AnalysesResultFilter
-from core.api_views import BaseLCAPIView, BaseRUDAPIView
+from core.api_views import BaseBulkAPIView, BaseLCAPIView, BaseRUDAPIView, PatientScopedMixin
 from analyses.models import AnalysisResult
 from analyses.model_serializers.analysis_result_serializers import AnalysisResultReadSerializer, AnalysisResultWriteSerializer
 from core.permissions import CanWritePatientData
+from profiles.models import PatientDoctorConsent
 
 
-class AnalysisResultListCreateView(BaseLCAPIView):
+class AnalysisResultListCreateView(PatientScopedMixin, BaseLCAPIView):
     queryset = AnalysisResult.objects.select_related("analysis", "analysis__patient").all()
     read_serializer_class = AnalysisResultReadSerializer
     write_serializer_class = AnalysisResultWriteSerializer
     list_read_serializer_class = AnalysisResultReadSerializer
     permission_classes = [CanWritePatientData]
+    patient_path = "analysis__patient"
+    consent_scope = PatientDoctorConsent.Scope.ANALYSES
     filterset_class = AnalysesResultFilter
+    fast_read_serializer = True
 
 
 class AnalysisResultRUDView(BaseRUDAPIView):
@@ -19,3 +23,14 @@ class AnalysisResultRUDView(BaseRUDAPIView):
     read_serializer_class = AnalysisResultReadSerializer
     write_serializer_class = AnalysisResultWriteSerializer
     permission_classes = [CanWritePatientData]
+    patient_path = "analysis__patient"
+    consent_scope = PatientDoctorConsent.Scope.ANALYSES
+
+
+class AnalysisResultBulkView(BaseBulkAPIView):
+    queryset = AnalysisResult.objects.select_related("analysis", "analysis__patient").all()
+    read_serializer_class = AnalysisResultReadSerializer
+    write_serializer_class = AnalysisResultWriteSerializer
+    permission_classes = [CanWritePatientData]
+    patient_path = "analysis__patient"
+    consent_scope = PatientDoctorConsent.Scope.ANALYSES
@@ -1,15 +1,19 @@
-from core.api_views import BaseLCAPIView, BaseRUDAPIView
+from core.api_views import BaseLCAPIView, BaseRUDAPIView, PatientScopedMixin
 from analyses.models import Analysis
 from analyses.model_serializers.analysis_serializers import AnalysisReadSerializer, AnalysisWriteSerializer
 from core.permissions import CanWritePatientData
+from profiles.models import PatientDoctorConsent
 
 
-class AnalysisListCreateView(BaseLCAPIView):
+class AnalysisListCreateView(PatientScopedMixin, BaseLCAPIView):
     queryset = Analysis.objects.select_related("patient", "uploaded_by").prefetch_related("results").all()
     read_serializer_class = AnalysisReadSerializer
     write_serializer_class = AnalysisWriteSerializer
     list_read_serializer_class = AnalysisReadSerializer
+    cache_responses = True
     permission_classes = [CanWritePatientData]
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.ANALYSES
 
 
 class AnalysisRUDView(BaseRUDAPIView):
@@ -17,3 +21,5 @@ class AnalysisRUDView(BaseRUDAPIView):
     read_serializer_class = AnalysisReadSerializer
     write_serializer_class = AnalysisWriteSerializer
     permission_classes = [CanWritePatientData]
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.ANALYSES
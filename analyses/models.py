@@ -8,6 +8,9 @@ class Analysis(BaseModel):
         verbose_name = "Analysis"
         verbose_name_plural = "Analysis"
         db_table = "analysis"
+        indexes = [
+            models.Index(fields=["patient", "date_created"]),
+        ]
 
     class Source(models.TextChoices):
         PATIENT = "PATIENT", "Patient"
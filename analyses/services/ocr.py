@@ -11,6 +11,7 @@ import pytesseract
 from pdf2image import convert_from_path
 
 from analyses.models import AnalysisResult, Analysis
+from core.response_cache import invalidate_models
 
 DATE_RE = re.compile(r"\b(\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})\b")
 # Example line formats:
@@ -116,3 +117,4 @@ def save_ocr_output(analysis: Analysis, lang: str = "eng") -> None:
             for r in rows
         ]
         AnalysisResult.objects.bulk_create(bulk)
+        invalidate_models(AnalysisResult)  # bulk_create sends no post_save
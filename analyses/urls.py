@@ -4,7 +4,7 @@ from analyses.model_views.analysis_view import (
     AnalysisListCreateView, AnalysisRUDView,
 )
 from analyses.model_views.analysis_result_view import (
-    AnalysisResultListCreateView, AnalysisResultRUDView,
+    AnalysisResultBulkView, AnalysisResultListCreateView, AnalysisResultRUDView,
 )
 
 app_name = "analyses"
@@ -17,4 +17,5 @@ urlpatterns = [
     # Structured results
     path("results/", AnalysisResultListCreateView.as_view(), name="analysisresult-list-create"),
     path("results/<int:pk>/", AnalysisResultRUDView.as_view(), name="analysisresult-rud"),
+    path("results/bulk/", AnalysisResultBulkView.as_view(), name="analysisresult-bulk"),
 ]
@@ -0,0 +1,112 @@
+from itertools import chain
+from typing import Iterator
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from audit.filters import AuditLogFilter
+from audit.models import AuditLog
+from core.api_views import _client_ip
+from core.const import VALIDATION_ERROR
+from core.permissions import IsAdmin
+from core.signals import audit_event
+from core.streaming import CSV_CONTENT_TYPE, NDJSON_CONTENT_TYPE, iter_csv, iter_keyset, iter_ndjson
+from core.utils import error_response
+
+# output column -> ORM lookup; same fields as AuditLogReadSerializer
+EXPORT_COLUMNS = {
+    "id": "id",
+    "actor": "actor_id",
+    "actor_email": "actor__email",
+    "action": "action",
+    "target_type": "target_type",
+    "target_id": "target_id",
+    "ip_address": "ip_address",
+    "metadata": "metadata",
+    "date_created": "date_created",
+    "date_last_updated": "date_last_updated",
+}
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+class AuditLogExportView(APIView):
+    """
+    Streams the audit log as NDJSON (default) or CSV with constant memory: rows are read AUDIT_EXPORT_CHUNK_SIZE at
+    a time by `id` seeks (core.streaming.iter_keyset), never through one open cursor.
+    Accepts the same filters as the list endpoint plus:
+      - export_format: "ndjson" | "csv"
+      - after: resume cursor, the last `id` received by an interrupted export
+    Rows are emitted in ascending `id` order, so `after` always resumes exactly where the stream stopped.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        export_format = request.query_params.get("export_format", "ndjson").lower()
+        if export_format not in EXPORT_FORMATS:
+            return error_response(
+                message=f"export_format must be one of {', '.join(EXPORT_FORMATS)}",
+                error_type=VALIDATION_ERROR,
+            )
+
+        filterset = AuditLogFilter(data=request.query_params, queryset=AuditLog.objects.all(), request=request)
+        if not filterset.is_valid():
+            return error_response(
+                message="Invalid filters",
+                errors=[f"{key}: {' '.join(value)}" for key, value in filterset.errors.items()],
+                error_type=VALIDATION_ERROR,
+            )
+
+        queryset = filterset.qs.order_by("id")
+        after = request.query_params.get("after")
+        if after:
+            try:
+                queryset = queryset.filter(id__gt=int(after))
+            except ValueError:
+                return error_response(message="after must be an integer id", error_type=VALIDATION_ERROR)
+
+        chunks = iter_keyset(
+            queryset.values_list(*EXPORT_COLUMNS.values()),
+            getattr(settings, "AUDIT_EXPORT_CHUNK_SIZE", 2000),
+            key=lambda row: row[:1],  # "id" is the first column and the whole ordering
+        )
+        rows = chain.from_iterable(chunks)
+        filters = {name: request.query_params[name] for name in filterset.filters if name in request.query_params}
+        metadata = {"export_format": export_format, "filters": filters, "after": after}
+        rows = self._audited(request, rows, metadata)
+
+        if export_format == "csv":
+            response = StreamingHttpResponse(iter_csv(list(EXPORT_COLUMNS), rows), content_type=CSV_CONTENT_TYPE)
+            response["Content-Disposition"] = 'attachment; filename="audit_log.csv"'
+        else:
+            columns = list(EXPORT_COLUMNS)
+            response = StreamingHttpResponse(
+                iter_ndjson(dict(zip(columns, row)) for row in rows),
+                content_type=NDJSON_CONTENT_TYPE,
+            )
+        return response
+
+    def _audited(self, request: Request, rows: Iterator[tuple], metadata: dict) -> Iterator[tuple]:
+        """
+        Pass rows through and record one READ event with the exported row count once the stream ends.
+        """
+        count = 0
+        try:
+            for row in rows:
+                count += 1
+                yield row
+        finally:
+            try:
+                audit_event.send(
+                    sender=self.__class__,
+                    actor=getattr(request, "user", None),
+                    action="READ",
+                    target_type="hv_audit.auditlog",
+                    target_id="",
+                    ip_address=_client_ip(request),
+                    metadata={**metadata, "count": count},
+                )
+            except Exception:
+                pass
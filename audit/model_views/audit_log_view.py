@@ -1,4 +1,5 @@
 from rest_framework.permissions import IsAuthenticated
+from audit.filters import AuditLogFilter
 from core.api_views import BaseListAPIView, BaseRetrieveAPIView
 from audit.models import AuditLog
 from audit.model_serializers.audit_log_serializers import AuditLogReadSerializer
@@ -9,6 +10,9 @@ class AuditLogListView(BaseListAPIView):
     queryset = AuditLog.objects.select_related("actor").all()
     serializer_class = AuditLogReadSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    filterset_class = AuditLogFilter
+    ordering_fields = ["date_created"]
+    fast_read_serializer = True
 
 
 class AuditLogRetrieveView(BaseRetrieveAPIView):
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from core.indexes import BrinIndex
 from core.models import BaseModel
 
 
@@ -16,9 +17,13 @@ class AuditLog(BaseModel):
         verbose_name = "Audit Log"
         verbose_name_plural = "Audit Logs"
         db_table = "audit_log"
+        # One composite index per supported filter of AuditLogFilter, each ending in date_created so the
+        # default `-date_created` ordering and date-range filters are served from the same index.
         indexes = [
-            models.Index(fields=["target_type", "target_id"]),
+            models.Index(fields=["actor", "date_created"]),
+            models.Index(fields=["target_type", "target_id", "date_created"]),
             models.Index(fields=["action", "date_created"]),
+            BrinIndex(fields=["date_created"]),  # append-only table: cheap index for pure time-range scans
         ]
         ordering = ["-date_created"]
 
@@ -3,6 +3,7 @@ from typing import Any, Mapping, Optional
 from django.dispatch import receiver
 from core.signals import audit_event
 from audit.models import AuditLog
+from core.metrics import timed
 
 @receiver(audit_event)
 def handle_audit_event(
@@ -16,14 +17,15 @@ def handle_audit_event(
     **kwargs: Any,
 ) -> None:
     try:
-        AuditLog.objects.create(
-            actor=actor,
-            action=action or AuditLog.Action.READ,
-            target_type=target_type or (getattr(sender, "__name__", "") or "Unknown"),
-            target_id=str(target_id or ""),
-            ip_address=ip_address,
-            metadata=dict(metadata or {}),
-        )
+        with timed("audit"):
+            AuditLog.objects.create(
+                actor=actor,
+                action=action or AuditLog.Action.READ,
+                target_type=target_type or (getattr(sender, "__name__", "") or "Unknown"),
+                target_id=str(target_id or ""),
+                ip_address=ip_address,
+                metadata=dict(metadata or {}),
+            )
     except Exception:
         # Never break the main request because of audit failures
         pass
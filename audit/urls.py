@@ -3,10 +3,12 @@ from django.urls import path
 from audit.model_views.audit_log_view import (
     AuditLogListView, AuditLogRetrieveView,
 )
+from audit.model_views.audit_log_export_view import AuditLogExportView
 
 app_name = "audit"
 
 urlpatterns = [
     path("", AuditLogListView.as_view(), name="auditlog-list"),
     path("<int:pk>/", AuditLogRetrieveView.as_view(), name="auditlog-retrieve"),
+    path("export/", AuditLogExportView.as_view(), name="auditlog-export"),
 ]
@@ -0,0 +1,80 @@
+# authentication/jwt_auth.py
+import copy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.lru import TTLLRUCache
+
+ROLE_CLAIM = "role"
+TOKEN_VERSION_CLAIM = "tv"
+_VERSION_KEY = "user:token_version:{}"
+
+_users = TTLLRUCache(
+    maxsize=getattr(settings, "USER_CACHE_SIZE", 4096),
+    ttl=getattr(settings, "USER_CACHE_TTL", 30),
+)
+
+
+def evict_cached_user(user_id) -> None:
+    _users.delete(str(user_id))
+
+
+def clear_user_cache() -> None:
+    _users.clear()
+
+
+def publish_token_version(user_id, version: int) -> None:
+    """
+    Tell every process the user's current `token_version` (-1 once deleted). Rows cached before it expire within
+    USER_CACHE_TTL, and so does the key.
+    """
+    cache.set(_VERSION_KEY.format(user_id), version, getattr(settings, "USER_CACHE_TTL", 30))
+
+
+def _load_user(user_id):
+    User = get_user_model()
+    user_id = str(user_id)  # simplejwt serializes the claim as a string
+    user = _users.get(user_id)
+    if user is not None:
+        version = cache.get(_VERSION_KEY.format(user_id))
+        if version is not None and version != user.token_version:
+            user = None  # revoked (or deleted) through another process
+    if user is None:
+        try:
+            user = User.objects.select_related("group").get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        _users.set(user_id, user)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication backed by a small in-process TTL/LRU cache of users (group preloaded), so
+    authentication and role checks on hot endpoints need no queries.
+    Tokens carry the role and the user's `token_version`; a role change or deactivation bumps the version,
+    which rejects every outstanding token. Cached rows are evicted on user save/delete in this process; the
+    other processes see the new version in the shared cache (one lookup per request) and reload the user.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = _load_user(user_id)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        if ROLE_CLAIM in validated_token and validated_token[ROLE_CLAIM] != getattr(user.group, "name", None):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        # requests may mutate request.user; never hand out the shared instance
+        return copy.copy(user)
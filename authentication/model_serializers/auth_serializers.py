@@ -6,6 +6,7 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from authentication.const import PATIENT, DOCTOR, ADMIN
+from authentication.jwt_auth import ROLE_CLAIM, TOKEN_VERSION_CLAIM
 from profiles.model_serializers.doctor_profile_serializers import DoctorProfileWriteSerializer
 from profiles.model_serializers.patient_profile_serializers import PatientProfileWriteSerializer
 
@@ -107,6 +108,13 @@ class SignupSerializer(serializers.ModelSerializer):
 
 
 class LoginSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ROLE_CLAIM] = getattr(user.group, "name", None)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
     def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
         data: Dict[str, Any] = super().validate(attrs)
         user = self.user  # AbstractBaseUser
@@ -25,6 +25,11 @@ class UserReadSerializer(serializers.ModelSerializer):
             "date_created", "date_last_updated",
         ]
         read_only_fields = fields
+        prefetch_hints = {
+            "role": "group",
+            "doctor_profile": "doctor_profile",
+            "patient_profile": "patient_profile",
+        }
 
     @staticmethod
     def get_role(obj: User) -> Optional[str]:
@@ -1,15 +1,14 @@
 from typing import Any, Optional
 from django.contrib.auth import get_user_model
 from django.contrib.auth.base_user import AbstractBaseUser
-from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.http import HttpRequest
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import APIException
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
 
@@ -20,11 +19,11 @@ from authentication.model_serializers.auth_password_serializers import (
     ResetPasswordSerializer,
 )
 from authentication.model_serializers.auth_serializers import LoginSerializer, SignupSerializer
+from authentication.services import password_reset
 from core.api_views import BaseCreateAPIView
+from core.signals import audit_event
 from core.utils import success_response, error_response
 
-from notifications.models import Notification
-from django.core.mail import send_mail
 from django.conf import settings
 
 User = get_user_model()
@@ -37,39 +36,9 @@ def _client_ip(request: HttpRequest) -> Optional[str]:
     return request.META.get("REMOTE_ADDR")
 
 
-def _build_reset_url(request: HttpRequest, uidb64: str, token: str) -> str:
+def _reset_base_url(request: HttpRequest) -> str:
     base = getattr(settings, "FRONTEND_RESET_PASSWORD_URL", None)
-    if base:
-        sep = "&" if "?" in base else "?"
-        return f"{base}{sep}uidb64={uidb64}&token={token}"
-    return request.build_absolute_uri(f"/reset-password?uidb64={uidb64}&token={token}")
-
-
-def _queue_password_reset_notification(user: AbstractBaseUser, reset_url: str) -> Notification:
-    return Notification.objects.create(
-        user=user,
-        kind=Notification.Kind.SYSTEM,
-        channel=Notification.Channel.EMAIL,
-        subject="Password reset",
-        body=f"Use this link to reset your password: {reset_url}",
-        payload={"reset_url": reset_url},
-    )
-
-
-def _send_password_reset_email_immediately(user: AbstractBaseUser, reset_url: str) -> None:
-    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
-    if not from_email:
-        return
-    try:
-        send_mail(
-            "Password reset",
-            f"Hello,\n\nUse this link to reset your password:\n{reset_url}\n\nIf you didn't request this, ignore this email.",
-            from_email,
-            [getattr(user, "email", "")],
-            fail_silently=True,
-        )
-    except Exception:
-        pass
+    return base or request.build_absolute_uri("/reset-password")
 
 
 class SignupView(BaseCreateAPIView):
@@ -79,29 +48,35 @@ class SignupView(BaseCreateAPIView):
 
 
 class LoginView(TokenObtainPairView):
+    """
+    Validates credentials exactly once (one password hash) and reuses the authenticated user
+    for both the token pair and the LOGIN audit event. The event is a compliance record, so it is written
+    before the response is returned rather than on a background thread a restart could lose it with.
+    """
     permission_classes = [AllowAny]
     serializer_class = LoginSerializer
 
     def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        raw = super().post(request, *args, **kwargs)
-        if raw.status_code == status.HTTP_200_OK:
-            # audit login (best-effort)
-            try:
-                ser = self.get_serializer(data=request.data)
-                ser.is_valid(raise_exception=True)
-                user: AbstractBaseUser = ser.user
-                AuditLog.objects.create(
-                    actor=user,
-                    action=AuditLog.Action.LOGIN,
-                    target_type="User",
-                    target_id=str(user.id),
-                    ip_address=_client_ip(request._request),
-                    metadata={},
-                )
-            except Exception:
-                pass
-            return success_response(result=raw.data, status=status.HTTP_200_OK)
-        return error_response(message="Invalid credentials", status=raw.status_code, errors=[raw.data])
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            return error_response(message="Invalid credentials", status=status.HTTP_401_UNAUTHORIZED, errors=[str(e)])
+        except APIException as e:
+            return error_response(message="Invalid credentials", status=e.status_code, errors=[e.detail])
+
+        user: AbstractBaseUser = serializer.user
+        response = success_response(result=serializer.validated_data, status=status.HTTP_200_OK)
+        audit_event.send(
+            sender=self.__class__,
+            actor=user,
+            action=AuditLog.Action.LOGIN,
+            target_type="User",
+            target_id=str(user.id),
+            ip_address=_client_ip(request._request),
+            metadata={},
+        )
+        return response
 
 
 class RefreshView(TokenRefreshView):
@@ -135,8 +110,8 @@ class LogoutView(APIView):
 
 class ForgotPasswordView(APIView):
     """
-    Accepts email; if user exists creates a reset token + queues/sends mail.
-    Always returns 200 to avoid user enumeration.
+    Accepts email and stores the request; the outbox worker sends a reset link if the account exists.
+    Always returns 200, in the same time, to avoid user enumeration.
     """
     permission_classes = [AllowAny]
 
@@ -149,44 +124,9 @@ class ForgotPasswordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        email: str = serializer.validated_data["email"]
-        try:
-            user = User.objects.get(email__iexact=email, is_active=True)
-        except User.DoesNotExist:
-            return success_response(message="If the email exists, a reset link has been sent.")
-
-        uidb64: str = urlsafe_base64_encode(force_bytes(user.pk))
-        token: str = PasswordResetTokenGenerator().make_token(user)
-        reset_url: str = _build_reset_url(request._request, uidb64, token)  # uses your helper
-
-        # Queue a notification (optional)
-        try:
-            Notification.objects.create(
-                user=user,
-                kind=Notification.Kind.SYSTEM,
-                channel=Notification.Channel.EMAIL,
-                subject="Password reset",
-                body=f"Use this link to reset your password: {reset_url}",
-                payload={"reset_url": reset_url},
-            )
-        except Exception:
-            pass
-
-        # Try sending immediately (optional)
-        try:
-            from django.conf import settings
-            from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
-            if from_email:
-                send_mail(
-                    subject="Password reset",
-                    message=f"Hello,\n\nUse this link to reset your password:\n{reset_url}\n\nIf you didn't request this, ignore this email.",
-                    from_email=from_email,
-                    recipient_list=[user.email],
-                    fail_silently=True,
-                )
-        except Exception:
-            pass
-
+        # the lookup, the token and the email all happen in the outbox worker: a known address costs the same one
+        # INSERT as an unknown one and answers the same, and the request survives a restart
+        password_reset.request_reset(serializer.validated_data["email"], _reset_base_url(request._request))
         return success_response(message="If the email exists, a reset link has been sent.")
 
 
@@ -12,7 +12,7 @@ from authentication.model_serializers.user_serializers import (
     AdminUserWriteSerializer,
 )
 from core.permissions import IsAdmin, IsAdminOrOwner, IsAdminOrDoctorForCreate
-from profiles.models import PatientDoctorConsent
+from profiles.services.consents import consented_patient_ids
 
 User = get_user_model()
 
@@ -42,10 +42,7 @@ class UserListCreateView(BaseLCAPIView):
 
         # Doctor: only their patients (assuming Consent model links them)
         if role == DOCTOR:
-            patient_ids = PatientDoctorConsent.objects.filter(
-                doctor=user, is_active=True
-            ).values_list("patient_id", flat=True)
-            return qs.filter(id__in=patient_ids)
+            return qs.filter(id__in=consented_patient_ids(user.id, request=self.request))
 
         # Patients cannot list other users
         return qs.none()
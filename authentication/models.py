@@ -72,10 +72,35 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
     is_staff = models.BooleanField(_("staff status"), default=False)
     is_active = models.BooleanField(_("active"), default=True)
 
+    # embedded in issued JWTs ("tv" claim); bumping it revokes every token issued before
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
     objects = MyUserManager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_auth_state = instance._auth_state()
+        return instance
+
+    def _auth_state(self) -> tuple:
+        # read from __dict__ so deferred fields are never loaded just for this
+        return self.__dict__.get("group_id"), self.__dict__.get("is_active")
+
+    def save(self, *args, **kwargs):
+        # a role change or (de)activation revokes all outstanding tokens
+        loaded = getattr(self, "_loaded_auth_state", None)
+        if loaded is not None and loaded != self._auth_state():
+            self.token_version += 1
+            self._token_version_bumped = True  # published to the other processes (authentication.signals)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
+        self._loaded_auth_state = self._auth_state()
+
     def set_password(self, raw_password):
         self.password = make_password(raw_password)
         self._password = raw_password
@@ -93,3 +118,17 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
     def get_user_by_token(data: Dict):
         token_user_id = AccessToken(data["token"])["user_id"]
         return User.objects.get(id=token_user_id)
+
+
+class PasswordResetRequest(BaseModel):
+    """
+    A forgot-password request, stored as is so the endpoint does the same single INSERT for known and unknown
+    addresses. The notification outbox worker resolves and deletes these (authentication.services.password_reset).
+    """
+    class Meta:
+        verbose_name = "Password reset request"
+        verbose_name_plural = "Password reset requests"
+        db_table = "auth_password_reset_request"
+
+    email = models.EmailField()
+    reset_base_url = models.URLField(max_length=500)  # where the frontend's reset page lives
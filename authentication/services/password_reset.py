@@ -0,0 +1,70 @@
+# authentication/services/password_reset.py
+"""
+Forgot-password requests. The endpoint only stores a PasswordResetRequest row (`request_reset()`), the same one
+INSERT whether the address is known or not, so neither its timing nor its answer tells accounts apart and a
+restart loses nothing. The notification outbox worker (`manage.py deliver_notifications`) calls
+`resolve_pending()`: it claims the rows with SELECT ... FOR UPDATE SKIP LOCKED, queues a reset email for every
+active account among them and deletes them.
+"""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from authentication.models import PasswordResetRequest
+from notifications.models import Notification
+
+User = get_user_model()
+
+
+def _build_reset_url(base: str, uidb64: str, token: str) -> str:
+    sep = "&" if "?" in base else "?"
+    return f"{base}{sep}uidb64={uidb64}&token={token}"
+
+
+def _queue_password_reset_notification(user: AbstractBaseUser, reset_url: str) -> Notification:
+    # delivered by the notification outbox (manage.py deliver_notifications)
+    return Notification.objects.create(
+        user=user,
+        kind=Notification.Kind.SYSTEM,
+        channel=Notification.Channel.EMAIL,
+        subject="Password reset",
+        body=f"Hello,\n\nUse this link to reset your password:\n{reset_url}\n\nIf you didn't request this, ignore this email.",
+        payload={"reset_url": reset_url},
+    )
+
+
+def request_reset(email: str, reset_base_url: str) -> None:
+    PasswordResetRequest.objects.create(email=email, reset_base_url=reset_base_url)
+
+
+def resolve_pending(batch_size: int = 100) -> int:
+    """
+    Claim up to `batch_size` requests, oldest first, queue the emails of those naming an active account and
+    delete them all; returns how many were claimed.
+    """
+    with transaction.atomic():
+        requests = list(PasswordResetRequest.objects.select_for_update(skip_locked=True).order_by("pk")[:batch_size])
+        if not requests:
+            return 0
+        users = {
+            user.email_lower: user
+            for user in User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in={request.email.lower() for request in requests}, is_active=True)
+        }
+        generator = PasswordResetTokenGenerator()
+        for request in requests:
+            user = users.get(request.email.lower())
+            if user is None:
+                continue
+            uidb64: str = urlsafe_base64_encode(force_bytes(user.pk))
+            _queue_password_reset_notification(
+                user, _build_reset_url(request.reset_base_url, uidb64, generator.make_token(user))
+            )
+        PasswordResetRequest.objects.filter(pk__in=[request.pk for request in requests]).delete()
+    return len(requests)
@@ -1,9 +1,12 @@
 from typing import Iterable
+from django.conf import settings
 from django.contrib.auth.models import Group
-from django.db.models.signals import post_migrate
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 
 from authentication.const import ROLE_NAMES
+from authentication.jwt_auth import evict_cached_user, publish_token_version
 
 @receiver(post_migrate)
 def ensure_groups(sender, **kwargs):
@@ -12,4 +15,17 @@ def ensure_groups(sender, **kwargs):
     if app_label not in {"auth", "authentication"}:
         return
     for name in ROLE_NAMES:
-        Group.objects.get_or_create(name=name)
\ No newline at end of file
+        Group.objects.get_or_create(name=name)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def evict_user(sender, instance, signal, **kwargs):
+    user_id = instance.pk
+    evict_cached_user(user_id)
+    if signal is post_delete:
+        transaction.on_commit(lambda: publish_token_version(user_id, -1))
+    elif getattr(instance, "_token_version_bumped", False):
+        instance._token_version_bumped = False
+        version = instance.token_version
+        transaction.on_commit(lambda: publish_token_version(user_id, version))
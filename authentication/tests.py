@@ -1,3 +1,177 @@
-from django.test import TestCase
+import copy
+import logging
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from audit.models import AuditLog
+from authentication.const import DOCTOR, PATIENT
+from authentication.jwt_auth import CachedJWTAuthentication, _users, clear_user_cache
+from authentication.models import PasswordResetRequest
+from authentication.model_serializers.auth_serializers import LoginSerializer
+from core.permissions import IsPatient
+from notifications.models import Notification
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+class LoginTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="patient@example.com", password="s3cret-pass")
+        self.client = APIClient()
+        self.url = reverse("authentication:auth-login")
+
+    def test_login_hashes_password_once_and_audits(self):
+        with mock.patch.object(User, "check_password", autospec=True, side_effect=User.check_password) as check:
+            response = self.client.post(self.url, {"email": self.user.email, "password": "s3cret-pass"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(check.call_count, 1)
+        self.assertIn("access", response.data["result"])
+        self.assertEqual(response.data["result"]["user"]["id"], self.user.id)
+        self.assertTrue(
+            AuditLog.objects.filter(actor=self.user, action=AuditLog.Action.LOGIN, target_id=str(self.user.id)).exists()
+        )
+
+    def test_login_audit_is_written_before_responding(self):
+        response = self.client.post(self.url, {"email": self.user.email, "password": "s3cret-pass"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AuditLog.objects.filter(actor=self.user, action=AuditLog.Action.LOGIN).exists())
+
+    def test_invalid_credentials(self):
+        response = self.client.post(self.url, {"email": self.user.email, "password": "wrong"}, format="json")
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.data["is_success"])
+        self.assertFalse(AuditLog.objects.filter(action=AuditLog.Action.LOGIN).exists())
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        clear_user_cache()
+        self.user = User.objects.create_user(email="patient@example.com", password="s3cret-pass",
+                                             group=Group.objects.get_or_create(name=PATIENT)[0])
+        self.auth = CachedJWTAuthentication()
+
+    def _request(self, user):
+        token = LoginSerializer.get_token(user).access_token
+        return APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _authenticate(self, request):
+        return self.auth.authenticate(request)[0]
+
+    def test_token_carries_role_and_version(self):
+        token = LoginSerializer.get_token(self.user).access_token
+        self.assertEqual(token["role"], PATIENT)
+        self.assertEqual(token["tv"], 0)
+
+    def test_cached_user_needs_no_queries(self):
+        request = self._request(self.user)
+        self._authenticate(request)
+        with self.assertNumQueries(0):
+            user = self._authenticate(request)
+            self.assertTrue(IsPatient().has_permission(mock.Mock(user=user), None))
+
+    def test_role_change_revokes_tokens(self):
+        request = self._request(self.user)
+        self._authenticate(request)
+        self.user.group = Group.objects.get_or_create(name=DOCTOR)[0]
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(request)
+        self.assertEqual(self._authenticate(self._request(self.user)).id, self.user.id)
+
+    def test_deactivation_revokes_tokens(self):
+        request = self._request(self.user)
+        self._authenticate(request)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(request)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+
+    def test_revocation_reaches_other_processes(self):
+        request = self._request(self.user)
+        stale = copy.copy(self._authenticate(request))
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        _users.set(str(self.user.pk), stale)  # another process still holds the active user
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(request)
+
+    def test_unrelated_save_keeps_tokens_valid(self):
+        request = self._request(self.user)
+        self.user.first_name = "Ada"
+        self.user.save()
+        self.assertEqual(self._authenticate(request).first_name, "Ada")
+
+
+class ForgotPasswordTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="patient@example.com", password="s3cret-pass")
+        self.client = APIClient()
+        self.url = reverse("authentication:auth-forgot-password")
+
+    def _post(self, email: str):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"email": email}, format="json")
+        return response, [query["sql"].split()[0] for query in queries]
+
+    def test_hit_and_miss_answer_alike(self):
+        hit, hit_queries = self._post("Patient@example.com")
+        miss, miss_queries = self._post("nobody@example.com")
+        self.assertEqual((hit.status_code, hit.content), (miss.status_code, miss.content))
+        # the request does no lookup in either case: it only stores the request
+        self.assertEqual(hit_queries, ["INSERT"])
+        self.assertEqual(miss_queries, ["INSERT"])
+        self.assertEqual(PasswordResetRequest.objects.count(), 2)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_outbox_worker_queues_the_email_for_known_addresses(self):
+        self._post("nobody@example.com")
+        self._post("Patient@example.com")
+        call_command("deliver_notifications", stdout=StringIO())
+        self.assertFalse(PasswordResetRequest.objects.exists())
+        notification = Notification.objects.get()
+        self.assertEqual((notification.user, notification.channel), (self.user, Notification.Channel.EMAIL))
+        self.assertTrue(notification.payload["reset_url"].startswith("http://testserver/reset-password?uidb64="))
+        self.assertIsNotNone(notification.sent_at)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+
+
+@tag("benchmark")
+class LoginThroughputBenchmark(TestCase):
+    """
+    Login throughput with the production password hasher. Run with `manage.py test --tag=benchmark`.
+    """
+    ROUNDS = 5
+
+    def test_login_throughput(self):
+        user = User.objects.create_user(email="bench@example.com", password="s3cret-pass")
+        client = APIClient()
+        url = reverse("authentication:auth-login")
+        payload = {"email": user.email, "password": "s3cret-pass"}
+
+        with mock.patch.object(User, "check_password", autospec=True, side_effect=User.check_password) as check:
+            started = time.perf_counter()
+            for _ in range(self.ROUNDS):
+                self.assertEqual(client.post(url, payload, format="json").status_code, 200)
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(check.call_count, self.ROUNDS)  # one password hash per login
+        logger.info("login: %.2f req/s, %.1f ms/login", self.ROUNDS / elapsed, elapsed / self.ROUNDS * 1000)
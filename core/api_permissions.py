@@ -1,34 +1,29 @@
-from django.contrib.contenttypes.models import ContentType
 from rest_framework.permissions import BasePermission
 
+from core.permission_matrix import role_has_perm
 
-class CanView(BasePermission):
+
+class ModelActionPermission(BasePermission):
+    """
+    Model-level permission for the view's queryset model, answered from the in-memory role permission matrix.
+    """
+    action = ""
 
     def has_permission(self, request, view):
-        user = request.user
-        obj = ContentType.objects.get_for_model(view.queryset.model)
-        return user and user.has_perm(obj.app_label + '.view_' + obj.model)
+        return role_has_perm(request.user, self.action, view.queryset.model)
 
 
-class CanAdd(BasePermission):
+class CanView(ModelActionPermission):
+    action = "view"
 
-    def has_permission(self, request, view):
-        user = request.user
-        obj = ContentType.objects.get_for_model(view.queryset.model)
-        return user and user.has_perm(obj.app_label + '.add_' + obj.model)
 
+class CanAdd(ModelActionPermission):
+    action = "add"
 
-class CanChange(BasePermission):
 
-    def has_permission(self, request, view):
-        user = request.user
-        obj = ContentType.objects.get_for_model(view.queryset.model)
-        return user and user.has_perm(obj.app_label + '.change_' + obj.model)
+class CanChange(ModelActionPermission):
+    action = "change"
 
 
-class CanDelete(BasePermission):
-
-    def has_permission(self, request, view):
-        user = request.user
-        obj = ContentType.objects.get_for_model(view.queryset.model)
-        return user and user.has_perm(obj.app_label + '.delete_' + obj.model)
+class CanDelete(ModelActionPermission):
+    action = "delete"
@@ -1,25 +1,43 @@
 import json
 import logging
+import time
 
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import IntegrityError
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.db import IntegrityError, connection
 from django.db.transaction import atomic
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import permission_classes
 from rest_framework.exceptions import ValidationError
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView, RetrieveAPIView
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView, RetrieveUpdateDestroyAPIView, RetrieveAPIView, \
+    get_object_or_404
 
 from core.api_permissions import CanView, CanAdd, CanChange, CanDelete
+from core.conditional import (
+    TIMESTAMP_FIELD, instance_validators, list_stats, list_validators, not_modified, precondition_failed, set_validators,
+)
 from core.const import DATA, ERROR_TYPE, ERRORS, MESSAGE, VALIDATION_ERROR, HTTP_404, INTEGRITY_ERROR, INVALID_DATA, \
-    OTHER
+    OTHER, PRECONDITION_FAILED, UNAUTHORIZED
 from core.exceptions import InvalidData, APIException202
-from core.serializers import ResponseWithResultSerializer, ResponseSerializer
-from core.utils import success_response, error_response
+from core.fast_serializers import compile_read_serializer
+from core import metrics, response_cache
+from core.prefetch import apply_related_plan
+from core.renderers import fast_dumps
+from core.streaming import NDJSON_CONTENT_TYPE, iter_keyset, iter_ndjson, keyset_ordering
+from core.serializers import BulkListSerializer, ResponseWithResultSerializer, ResponseSerializer
+from core.utils import success_response, success_streaming_response, error_response
 
 from typing import Any, Mapping, Optional
+from django.db.models import QuerySet
 from django.http import HttpRequest
+from authentication.const import ADMIN, DOCTOR
+from core.permissions import _has_role, _is_authenticated, _patient_id_from_path, can_write_patient_data
 from core.signals import audit_event
+from profiles.services.consents import active_consent_exists
 
 
 logger = logging.getLogger(__name__)
@@ -32,32 +50,155 @@ class BaseListAPIView(ListAPIView):
     filter_serializer_class = None
     filter_map = {}
     queryset_kwargs = {}
-
-    def list(self, request, *args, **kwargs):
+    # serialize list pages with core.fast_serializers (columns via values_list, no model instances)
+    fast_read_serializer = False
+    # add the select/prefetch_related lookups the read serializer needs (core.prefetch)
+    auto_prefetch = True
+    # ETag from one aggregate over the scoped queryset (core.conditional); 304 on a matching If-None-Match
+    conditional_requests = True
+    known_count = None
+    # serve repeated page requests from core.response_cache; `cache_tags` adds models the data depends on
+    cache_responses = False
+    cache_tags = ()
+
+    def streams(self, request) -> bool:
+        """
+        Whether the list is streamed (`?paginate=false`, or no paginator) rather than paged.
+        """
+        if self.paginator is None:
+            return True
+        wants_pagination = getattr(self.paginator, "wants_pagination", None)
+        return wants_pagination is not None and not wants_pagination(request)
+
+    def response_cache_key(self, request):
+        if not self.cache_responses or not response_cache.enabled() or self.streams(request):
+            return None  # streamed (unpaginated) lists are never cached
+        return response_cache.cache_key(self, request)
+
+    def read_queryset(self, queryset):
+        """
+        `queryset` prepared for serialization: fast-path columns or the read serializer's related lookups.
+        """
+        if self.fast_read_serializer:
+            return compile_read_serializer(self.get_serializer_class()).rows(queryset)
+        if self.auto_prefetch:
+            return apply_related_plan(queryset, self.get_serializer_class())
+        return queryset
+
+    def serialize_list(self, rows):
+        with metrics.timed("serializer"):
+            if self.fast_read_serializer:
+                return compile_read_serializer(self.get_serializer_class()).serialize(rows)
+            return self.get_serializer(rows, many=True).data
+
+    def _stream_rows(self, queryset, state):
+        """
+        Serialized rows, `LIST_STREAM_CHUNK_SIZE` per query in the list's order (keyset seeks, see
+        core.streaming.iter_keyset: no open cursor for the driver to buffer), stopping at LIST_STREAM_MAX_ROWS rows
+        or after LIST_STREAM_MAX_SECONDS seconds (recorded in `state["truncated"]`).
+        """
+        chunk_size = getattr(settings, "LIST_STREAM_CHUNK_SIZE", 500)
+        max_rows = getattr(settings, "LIST_STREAM_MAX_ROWS", 50000)
+        deadline = time.monotonic() + getattr(settings, "LIST_STREAM_MAX_SECONDS", 30)
+        for chunk in iter_keyset(queryset, chunk_size, rows=self.read_queryset):
+            if state["count"] + len(chunk) > max_rows:
+                chunk = chunk[:max_rows - state["count"]]
+                state["truncated"] = "row_limit"
+            yield from self.serialize_list(chunk)
+            state["count"] += len(chunk)
+            if state["truncated"]:
+                return
+            if len(chunk) == chunk_size and time.monotonic() > deadline:
+                state["truncated"] = "time_limit"
+                return
+
+    def _audited_stream(self, request, queryset, state):
         try:
-            queryset = self.filter_queryset(self.get_queryset())
-            page = self.paginate_queryset(queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(ResponseWithResultSerializer.success(serializer.data))
-
-            serializer = self.get_serializer(queryset, many=True)
+            yield from self._stream_rows(queryset, state)
+        finally:
+            # sent once the stream ends (or the client goes away) with the number of rows actually sent
             try:
-                model = getattr(self.get_queryset(), "model", None)
-                target_type = f"{model._meta.app_label}.{model._meta.model_name}" if model else "Unknown"
-                total = getattr(queryset, "count", lambda: None)()
+                model = getattr(queryset, "model", None)
+                metadata = {"count": state["count"], "streamed": True}
+                if state["truncated"]:
+                    metadata["truncated"] = state["truncated"]
                 audit_event.send(
                     sender=self.__class__,
                     actor=getattr(request, "user", None),
                     action="READ",
-                    target_type=target_type,
+                    target_type=f"{model._meta.app_label}.{model._meta.model_name}" if model else "Unknown",
                     target_id="",  # list has no single target
                     ip_address=_client_ip(request),
-                    metadata={"count": total} if total is not None else {},
+                    metadata=metadata,
                 )
             except Exception:
                 pass
-            return success_response(result=serializer.data)
+
+    def stream_list(self, request, queryset):
+        """
+        Unpaginated lists (`?paginate=false`) are streamed rather than built in memory: the success envelope
+        with `result` written incrementally, or one JSON object per line with `?stream_format=ndjson`.
+        They carry no ETag/Last-Modified, which would take a COUNT and MAX over the whole scope up front.
+        A stream cut short by the row/time limits ends with `"truncated": "<row_limit|time_limit>"`
+        (a trailing envelope key, or a final NDJSON line).
+        """
+        state = {"count": 0, "truncated": None}
+        rows = self._audited_stream(request, queryset, state)
+        if request.query_params.get("stream_format") == "ndjson":
+            def lines():
+                yield from iter_ndjson(rows)
+                if state["truncated"]:
+                    yield fast_dumps({"truncated": state["truncated"]}) + b"\n"
+            return StreamingHttpResponse(lines(), content_type=NDJSON_CONTENT_TYPE)
+        return success_streaming_response(
+            rows, trailer=lambda: {"truncated": state["truncated"]} if state["truncated"] else None
+        )
+
+    def list(self, request, *args, **kwargs):
+        try:
+            cache_key = self.response_cache_key(request)
+            if cache_key is not None:
+                entry = response_cache.get(cache_key)
+                if entry is not None:
+                    return response_cache.cached_response(request, entry)
+
+            queryset = self.filter_queryset(self.get_queryset())
+            if self.streams(request):
+                if api_settings.ORDERING_PARAM in request.query_params and keyset_ordering(queryset) is None:
+                    # streaming would fall back to primary key order, not the one asked for
+                    raise ValidationError({api_settings.ORDERING_PARAM: [
+                        "This ordering cannot be streamed with paginate=false; order by non-null columns of the "
+                        "listed model, or page through the list."
+                    ]})
+                return self.stream_list(request, queryset)
+
+            validators = None
+            if self.conditional_requests:
+                stats = list_stats(queryset, self.get_serializer_class())
+                validators = list_validators(queryset, request, stats)
+                # the paginator reuses the row count instead of running its own COUNT
+                self.known_count = stats[0] if stats else None
+            if not_modified(request, validators):
+                return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), validators)
+
+            page = self.paginate_queryset(self.read_queryset(queryset))
+            if page is None:
+                return self.stream_list(request, queryset)
+            response = set_validators(
+                self.get_paginated_response(ResponseWithResultSerializer.success(self.serialize_list(page))),
+                validators,
+            )
+            if cache_key is not None:
+                response_cache.store(cache_key, response, validators)
+            return response
+        except ValidationError as ve:
+            # invalid filter values (DjangoFilterBackend) are a client error, not a server failure
+            error_dict = ve.get_full_details()
+            return error_response(
+                message=get_validation_error_message(error_dict),
+                errors=[str(err) for err in error_dict.values()] if isinstance(error_dict, dict) else [str(error_dict)],
+                error_type=VALIDATION_ERROR,
+            )
         except Exception as e:
             return error_response(message="Failed to fetch list", status=status.HTTP_500_INTERNAL_SERVER_ERROR, errors=[str(e)])
 
@@ -87,7 +228,9 @@ class BaseRetrieveAPIView(RetrieveAPIView):
                 )
             except Exception:
                 pass
-            return success_response(result=serializer.data)
+            with metrics.timed("serializer"):
+                data = serializer.data
+            return success_response(result=data)
         except Http404 as e:
             return error_response(
                 message="Object not found",
@@ -138,7 +281,9 @@ class BaseCreateAPIView(CreateAPIView):
                 pass
 
             # headers = self.get_success_headers(serializer.data)
-            return success_response(result=serializer.data, status=status.HTTP_201_CREATED)
+            with metrics.timed("serializer"):
+                data = serializer.data
+            return success_response(result=data, status=status.HTTP_201_CREATED)
         except ValidationError as ve:
             error_dict = ve.get_full_details()
             return error_response(
@@ -178,6 +323,39 @@ class BaseCreateAPIView(CreateAPIView):
             )
 
 
+class PatientScopedMixin:
+    """
+    Narrows `get_queryset()` to patient data the requesting user may read, entirely in SQL:
+      - Admins: everything
+      - Patients: rows they own
+      - Doctors: rows of patients with an active consent (a single correlated EXISTS)
+      - anyone else: nothing
+    `patient_path` is the ORM path from the model to the patient user, e.g. "patient",
+    "analysis__patient", "note__patient" or "user".
+    `consent_scope` is the PatientDoctorConsent.Scope a doctor's consent must cover (ALL always does);
+    None accepts any scope. Expired consents never match.
+    """
+    patient_path = "patient"
+    consent_scope = None
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+        user = getattr(self.request, "user", None)
+        if not _is_authenticated(user):
+            return queryset.none()
+        if _has_role(user, [ADMIN]):
+            return queryset
+        if _has_role(user, [DOCTOR]):
+            return queryset.filter(active_consent_exists(user.id, self.patient_path, self.consent_scope))
+        return queryset.filter(**{self.patient_path: user.id})
+
+    def response_cache_key(self, request):
+        # a doctor's scope also shrinks when a consent expires, which no write announces
+        if _has_role(request.user, [DOCTOR]):
+            return None
+        return super().response_cache_key(request)
+
+
 class BaseLCAPIView(BaseCreateAPIView, BaseListAPIView):
     list_read_serializer_class = None
     read_serializer_class = None
@@ -213,6 +391,64 @@ class BaseRUDAPIView(RetrieveUpdateDestroyAPIView):
     write_serializer_class = None
     serializer_error_msg = "'%s' should either include a `serializer_class` attribute, or override the `get_serializer_class()` method."
     delete_obj_id_physical = None
+    auto_prefetch = True
+    # ETag/Last-Modified from the date_last_updated of the row and the rows it nests (core.conditional):
+    # 304 on If-None-Match, 412 on a stale If-Match
+    conditional_requests = True
+    # serve repeated GETs from core.response_cache; `cache_tags` adds models the data depends on
+    cache_responses = False
+    cache_tags = ()
+
+    def response_cache_key(self, request):
+        if not self.cache_responses or not response_cache.enabled():
+            return None
+        return response_cache.cache_key(self, request)
+
+    def wants_lock(self) -> bool:
+        return self.conditional_requests and self.request.method != 'GET' and bool(self.request.headers.get("If-Match"))
+
+    def representation_serializer_class(self):
+        # validators describe the object as GET renders it, whichever method computes them
+        return self.read_serializer_class or self.serializer_class
+
+    def check_if_match(self, request, instance):
+        """
+        Error response when If-Match names a version other than the stored one. `get_object()` read the row with
+        SELECT ... FOR UPDATE (see `get_queryset()`), so it is current and stays locked until the surrounding
+        transaction ends: a matching update cannot race another writer.
+        """
+        if not self.wants_lock():
+            return None
+        validators = instance_validators(instance, self.representation_serializer_class())
+        if validators is not None and precondition_failed(request, validators[0]):
+            return error_response(
+                message="Object was modified by someone else; fetch it again before updating",
+                status=status.HTTP_412_PRECONDITION_FAILED,
+                error_type=PRECONDITION_FAILED,
+            )
+        return None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.auto_prefetch and self.request.method == 'GET':
+            queryset = apply_related_plan(queryset, self.get_serializer_class())
+        if self.wants_lock():
+            # the If-Match check compares the version of what GET renders, nested rows included
+            queryset = apply_related_plan(queryset, self.representation_serializer_class())
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
+
+    def get_object_for_permissions(self):
+        """
+        `get_object()` for a response-cache hit: one query, without the related rows the cached response already
+        holds, still checked by `check_object_permissions()`.
+        """
+        self.auto_prefetch = False
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+        return obj
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -223,9 +459,26 @@ class BaseRUDAPIView(RetrieveUpdateDestroyAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         try:
+            cache_key = self.response_cache_key(request)
+            if cache_key is not None:
+                entry = response_cache.get(cache_key)
+                if entry is not None:
+                    # object permissions (a doctor's consent, its expiry) can change without a write the key tracks
+                    self.get_object_for_permissions()
+                    return response_cache.cached_response(request, entry)
+
             instance = self.get_object()
+            validators = (instance_validators(instance, self.representation_serializer_class())
+                          if self.conditional_requests else None)
+            if not_modified(request, validators):
+                return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), validators)
             serializer = self.get_serializer(instance)
-            return success_response(result=serializer.data)
+            with metrics.timed("serializer"):
+                data = serializer.data
+            response = set_validators(success_response(result=data), validators)
+            if cache_key is not None:
+                response_cache.store(cache_key, response, validators)
+            return response
         except Http404 as e:
             return error_response(
                 message="Object not found",
@@ -246,6 +499,9 @@ class BaseRUDAPIView(RetrieveUpdateDestroyAPIView):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        failed = self.check_if_match(request, instance)
+        if failed is not None:
+            return failed
         data = {}
 
         # handle file uploads + json data
@@ -277,7 +533,11 @@ class BaseRUDAPIView(RetrieveUpdateDestroyAPIView):
                     )
             except Exception:
                 pass
-            return success_response(result=serializer.data)
+            validators = (instance_validators(serializer.instance, self.representation_serializer_class())
+                          if self.conditional_requests else None)
+            with metrics.timed("serializer"):
+                data = serializer.data
+            return set_validators(success_response(result=data), validators)
         except ValidationError as ve:
             error_dict = ve.get_full_details()
             return error_response(
@@ -301,10 +561,14 @@ class BaseRUDAPIView(RetrieveUpdateDestroyAPIView):
                 error_type=OTHER
             )
 
+    @atomic
     @permission_classes([CanDelete])
     def delete(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
+            failed = self.check_if_match(request, instance)
+            if failed is not None:
+                return failed
             target_type, target_id = _target_from_instance(instance)
 
             self.perform_destroy(instance)
@@ -347,6 +611,170 @@ class BaseRUDAPIView(RetrieveUpdateDestroyAPIView):
             )
 
 
+class BaseBulkAPIView(GenericAPIView):
+    """
+    Batch create (POST) and partial update (PATCH, each item carrying its "id") with a JSON array as the body.
+    Items are validated by one `many=True` BulkListSerializer and written with a single bulk_create/bulk_update
+    in one transaction; write access is checked once per distinct patient (`patient_path`, as in
+    PatientScopedMixin; None leaves access to `permission_classes`) and one aggregated audit event is sent.
+    Any invalid item rejects the whole batch unless the caller passes `?partial=true`: then the valid items are
+    written and the others are reported by position under "failed".
+    """
+    queryset = None
+    read_serializer_class = None
+    write_serializer_class = None
+    patient_path = None
+    consent_scope = None
+    partial_query_param = "partial"
+
+    def post(self, request, *args, **kwargs):
+        return self.bulk_write(request, creating=True)
+
+    def patch(self, request, *args, **kwargs):
+        return self.bulk_write(request, creating=False)
+
+    def after_bulk_write(self, objects, creating: bool) -> None:
+        """
+        Hook run inside the transaction once `objects` are written with bulk_create/bulk_update, for what post_save
+        receivers would do. Not called for creates on backends that return no ids from bulk inserts (MySQL): those
+        objects are saved one by one and post_save fires.
+        """
+
+    def allows_partial_success(self, request) -> bool:
+        return request.query_params.get(self.partial_query_param, 'false').lower() in ['true', '1', 'yes']
+
+    def load_instances(self, items, failed):
+        """
+        Instance for each item (None where it failed), locked for the rest of the transaction.
+        """
+        model = self.get_queryset().model
+        to_python = model._meta.pk.to_python
+        pks = {}
+        for position, item in enumerate(items):
+            try:
+                pks[position] = to_python(item["id"])
+            except (KeyError, TypeError, ValueError, DjangoValidationError):
+                failed[position] = {"id": ["A valid id is required."]}
+        found = self.get_queryset().select_for_update(of=("self",)).in_bulk(set(pks.values()))
+        instances, seen = [None] * len(items), set()
+        for position, pk in pks.items():
+            if pk not in found:
+                failed[position] = {"id": ["Not found."]}
+            elif pk in seen:
+                failed[position] = {"id": ["Duplicate id in this batch."]}
+            else:
+                seen.add(pk)
+                instances[position] = found[pk]
+        return instances
+
+    def patient_ids(self, data, instance=None) -> set:
+        """
+        Patients an item touches: the instance's current patient and the one the item assigns.
+        """
+        ids = set()
+        if instance is not None:
+            ids.add(_patient_id_from_path(instance, self))
+        first, *rest = self.patient_path.split("__")
+        if first in data:
+            value = data[first]
+            if rest:
+                for relation in rest[:-1]:
+                    value = getattr(value, relation, None)
+                ids.add(getattr(value, f"{rest[-1]}_id", None))
+            else:
+                ids.add(getattr(value, "pk", value))
+        return ids
+
+    @atomic
+    def bulk_write(self, request, creating: bool):
+        items = request.data
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return error_response(message="Expected a non-empty JSON array of objects", error_type=INVALID_DATA)
+        max_items = getattr(settings, "BULK_MAX_ITEMS", 500)
+        if len(items) > max_items:
+            return error_response(message=f"At most {max_items} items per request", error_type=INVALID_DATA)
+
+        failed = {}
+        instances = None if creating else self.load_instances(items, failed)
+        pending = [position for position in range(len(items)) if position not in failed]
+        serializer = BulkListSerializer(
+            child=self.write_serializer_class(partial=not creating),
+            data=[items[position] for position in pending],
+            instances=None if creating else [instances[position] for position in pending],
+            partial=not creating,
+            context=self.get_serializer_context(),
+        )
+        if not serializer.is_valid():
+            failed.update({pending[index]: errors for index, errors in enumerate(serializer.errors) if errors})
+        valid = {pending[index]: data for index, data in serializer.item_results.items()}
+
+        denied = False
+        if self.patient_path is not None:
+            touched = {position: self.patient_ids(data, None if creating else instances[position])
+                       for position, data in valid.items()}
+            allowed = {patient_id: can_write_patient_data(request, self, patient_id)
+                       for patient_id in set().union(*touched.values())}
+            for position, patient_ids in touched.items():
+                if not all(allowed[patient_id] for patient_id in patient_ids):
+                    denied = True
+                    failed[position] = {"detail": ["You do not have permission to write this patient's data."]}
+                    del valid[position]
+
+        if failed and (not self.allows_partial_success(request) or not valid):
+            return error_response(
+                message="Permission denied" if denied else "Invalid items",
+                errors=_item_error_messages(failed),
+                status=status.HTTP_403_FORBIDDEN if denied else status.HTTP_400_BAD_REQUEST,
+                error_type=UNAUTHORIZED if denied else VALIDATION_ERROR,
+            )
+
+        model = self.get_queryset().model
+        if creating:
+            objects = [model(**data) for data in valid.values()]
+            if connection.features.can_return_rows_from_bulk_insert:
+                model.objects.bulk_create(objects)
+            else:
+                # MySQL reports no ids for a multi-row INSERT: insert one by one so every object gets its pk (for
+                # the response and the audit event). save() sends post_save, so the receivers do the hook's work
+                for obj in objects:
+                    obj.save(force_insert=True)
+        else:
+            objects, fields = [], {TIMESTAMP_FIELD}
+            now = timezone.now()
+            for position, data in valid.items():
+                instance = instances[position]
+                for attr, value in data.items():
+                    setattr(instance, attr, value)
+                setattr(instance, TIMESTAMP_FIELD, now)  # bulk_update skips auto_now
+                fields.update(data)
+                objects.append(instance)
+            model.objects.bulk_update(objects, sorted(fields))
+        if not creating or connection.features.can_return_rows_from_bulk_insert:
+            self.after_bulk_write(objects, creating)
+        response_cache.invalidate_models(model)  # bulk writes send no post_save
+
+        try:
+            audit_event.send(
+                sender=self.__class__,
+                actor=getattr(request, "user", None),
+                action="CREATE" if creating else "UPDATE",
+                target_type=f"{model._meta.app_label}.{model._meta.model_name}",
+                target_id="",
+                ip_address=_client_ip(request),
+                metadata={"bulk": True, "count": len(objects), "ids": [obj.pk for obj in objects],
+                          "failed": len(failed)},
+            )
+        except Exception:
+            pass
+
+        with metrics.timed("serializer"):
+            items = self.read_serializer_class(objects, many=True, context=self.get_serializer_context()).data
+        result = {
+            "items": items,
+            "failed": [{"index": position, "errors": errors} for position, errors in sorted(failed.items())],
+        }
+        return success_response(result=result, status=status.HTTP_201_CREATED if creating else status.HTTP_200_OK)
+
 def get_validation_error_message(error_data):
     try:
         response_message = ''
@@ -373,6 +801,15 @@ def get_validation_error_message(error_data):
 
 
 
+def _item_error_messages(failed: Mapping[int, Any]) -> list:
+    messages = []
+    for position, errors in sorted(failed.items()):
+        for field, field_errors in errors.items():
+            for error in field_errors if isinstance(field_errors, list) else [field_errors]:
+                messages.append(f"[{position}] {field}: {error}")
+    return messages
+
+
 def _client_ip(request: HttpRequest) -> Optional[str]:
     try:
         xff = request.META.get("HTTP_X_FORWARDED_FOR", "")
@@ -0,0 +1,236 @@
+# core/benchmarks.py
+"""
+Endpoint latency benchmarks (driven by `manage.py bench_endpoints`).
+
+Every GET route of the URLconf is requested through the test client as each role (admin, a doctor holding
+consents, a patient with data) using real JWT bearer tokens, so authentication, permissions, serialization and
+rendering all count. Detail routes get a primary key the role can actually read; a password reset request for
+a known and for an unknown address shows any timing gap between them. Results map "<url name> <role>" (or
+"<url name> hit|miss") to latency percentiles, queries per request, throughput and status codes, and can be
+compared against a stored baseline run.
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from authentication.const import ADMIN, DOCTOR, PATIENT
+from authentication.model_serializers.auth_serializers import LoginSerializer
+from authentication.models import User
+from core import response_cache
+from profiles.models import PatientDoctorConsent
+
+# routes that only document the API
+SKIPPED_ROUTES = {"schema-swagger-ui", "schema-redoc", "schema-json"}
+
+
+@dataclass
+class Case:
+    name: str  # "<url name> <role>"
+    method: str
+    path: str
+    user: Optional[User]
+    data: Optional[dict] = None
+
+
+@dataclass
+class Measurement:
+    latencies: List[float] = field(default_factory=list)
+    queries: List[int] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile (q in 0..100) of a non-empty list.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def role_users() -> Dict[str, User]:
+    """
+    One user per role: the doctor with the most active consents and the patient with the most analyses.
+    """
+    users = {}
+    admin = User.objects.filter(group__name=ADMIN, is_active=True).order_by("pk").first()
+    doctor = (User.objects.filter(group__name=DOCTOR, is_active=True)
+              .annotate(consents=Count("consents_as_doctor")).order_by("-consents", "pk").first())
+    patient = (User.objects.filter(group__name=PATIENT, is_active=True)
+               .annotate(analyses_count=Count("analyses")).order_by("-analyses_count", "pk").first())
+    for role, user in ((ADMIN, admin), (DOCTOR, doctor), (PATIENT, patient)):
+        if user is not None:
+            users[role] = user
+    return users
+
+
+def _routes(patterns=None, namespace: str = "") -> Iterator[tuple]:
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            nested = f"{namespace}{pattern.namespace}:" if pattern.namespace else namespace
+            yield from _routes(pattern.url_patterns, nested)
+        elif isinstance(pattern, URLPattern) and pattern.name and pattern.name not in SKIPPED_ROUTES:
+            yield f"{namespace}{pattern.name}", pattern
+
+
+def _readable_pk(view_class, user: User) -> Optional[Any]:
+    """
+    Primary key of a row of the view's model that `user` may read: any row for admins, rows under a live consent
+    covering the view's `consent_scope` for doctors, their own rows otherwise.
+    """
+    queryset = getattr(view_class, "queryset", None)
+    if queryset is None:
+        return None
+    queryset = queryset.all().order_by("pk")
+    readable = queryset
+    patient_path = getattr(view_class, "patient_path", None)
+    if user.is_admin():
+        readable = queryset
+    elif patient_path is not None and user.group.name == DOCTOR:
+        consents = user.consents_as_doctor.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()),
+                                                  is_active=True)
+        consent_scope = getattr(view_class, "consent_scope", None)
+        if consent_scope is not None:
+            consents = consents.filter(scope__in=[PatientDoctorConsent.Scope.ALL, consent_scope])
+        readable = queryset.filter(**{f"{patient_path}__in": consents.values("patient")})
+    elif patient_path is not None:
+        readable = queryset.filter(**{patient_path: user})
+    elif queryset.model is User:
+        readable = queryset.filter(pk=user.pk)
+    else:
+        # owner-scoped models (profiles, notifications, consents)
+        fields = {f.name for f in queryset.model._meta.concrete_fields}
+        owner_field = next((name for name in ("user", "patient", "doctor") if name in fields), None)
+        if owner_field is None:
+            return None
+        readable = queryset.filter(**{owner_field: user})
+    return readable.values_list("pk", flat=True).first()
+
+
+def endpoint_cases(users: Dict[str, User], login_password: Optional[str] = None) -> List[Case]:
+    """
+    A GET case per route and role (detail routes only where the role has a readable row), plus a login and
+    forgot-password hit/miss when `login_password` is known: that is only the case for a seeded dataset, so real
+    accounts of a benchmarked database are never sent reset links.
+    """
+    cases = []
+    for name, pattern in _routes():
+        view_class = getattr(pattern.callback, "view_class", None)
+        if view_class is None or not hasattr(view_class, "get"):
+            continue
+        converters = pattern.pattern.converters
+        for role, user in users.items():
+            kwargs = {}
+            if converters:
+                if set(converters) != {"pk"}:
+                    continue
+                pk = _readable_pk(view_class, user)
+                if pk is None:
+                    continue
+                kwargs["pk"] = pk
+            cases.append(Case(f"{name} {role.lower()}", "GET", reverse(name, kwargs=kwargs), user))
+    if login_password is not None and PATIENT in users:
+        cases.append(Case("authentication:auth-login anonymous", "POST", reverse("authentication:auth-login"), None,
+                          {"email": users[PATIENT].email, "password": login_password}))
+    if login_password is not None and PATIENT in users:
+        # a known against an unknown address: any gap between the two tells an attacker which accounts exist
+        url = reverse("authentication:auth-forgot-password")
+        cases.append(Case("authentication:auth-forgot-password hit", "POST", url, None, {"email": users[PATIENT].email}))
+        cases.append(Case("authentication:auth-forgot-password miss", "POST", url, None,
+                          {"email": "nobody@unknown.example.test"}))
+    return cases
+
+
+def _client_for(user: Optional[User]) -> Client:
+    if user is None:
+        return Client()
+    token = LoginSerializer.get_token(user).access_token
+    return Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+def measure(case: Case, requests: int, warmup: int = 2, cold: bool = False,
+            clock: Callable[[], float] = time.perf_counter) -> Measurement:
+    """
+    Run `case` `warmup` + `requests` times; with `cold`, caches are cleared before every request.
+    """
+    client = _client_for(case.user)
+    measurement = Measurement()
+    for iteration in range(warmup + requests):
+        if cold:
+            cache.clear()
+            response_cache.clear_local()
+        with CaptureQueriesContext(connection) as queries:
+            started = clock()
+            if case.method == "GET":
+                response = client.get(case.path)
+            else:
+                response = client.post(case.path, case.data, content_type="application/json")
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = clock() - started
+        if iteration < warmup:
+            continue
+        measurement.latencies.append(elapsed)
+        measurement.queries.append(len(queries))
+        measurement.elapsed += elapsed
+        status = str(response.status_code)
+        measurement.statuses[status] = measurement.statuses.get(status, 0) + 1
+    return measurement
+
+
+def summarize(measurement: Measurement) -> Dict[str, Any]:
+    latencies = measurement.latencies
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "queries": max(measurement.queries),
+        "throughput_rps": round(len(latencies) / measurement.elapsed, 1) if measurement.elapsed else None,
+        "statuses": measurement.statuses,
+    }
+
+
+def run(cases: List[Case], requests: int, warmup: int = 2, cold: bool = False) -> Dict[str, Dict[str, Any]]:
+    return {case.name: summarize(measure(case, requests, warmup, cold)) for case in cases}
+
+
+def hit_miss_gaps(results: Dict[str, Dict[str, Any]], metric: str = "p50_ms") -> Dict[str, float]:
+    """
+    `metric` of every "<name> hit" case minus that of its "<name> miss" case, in the same run.
+    """
+    gaps = {}
+    for name, summary in results.items():
+        if name.endswith(" hit") and f"{name[:-4]} miss" in results:
+            gaps[name[:-4]] = round(summary[metric] - results[f"{name[:-4]} miss"][metric], 3)
+    return gaps
+
+
+def compare(current: Dict[str, Dict[str, Dict[str, Any]]], baseline: Dict[str, Dict[str, Dict[str, Any]]],
+            tolerance: float = 0.2, metric: str = "p95_ms") -> List[str]:
+    """
+    Regressions of `current` against `baseline` (both: size -> case -> summary): `metric` more than `tolerance`
+    (a fraction) slower, or more queries per request.
+    """
+    regressions = []
+    for size, cases in current.items():
+        for name, summary in cases.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            if before.get(metric) and summary[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"[{size}] {name}: {metric} {before[metric]} -> {summary[metric]}")
+            if summary["queries"] > before.get("queries", summary["queries"]):
+                regressions.append(f"[{size}] {name}: queries {before['queries']} -> {summary['queries']}")
+    return regressions
@@ -0,0 +1,175 @@
+# core/conditional.py
+"""
+ETag / Last-Modified validators for the base views, derived from `BaseModel.date_last_updated`:
+  - lists: one aggregate over the scoped, filtered queryset (row count + latest `date_last_updated`); ETag only,
+    since a deleted row leaves the latest timestamp unchanged,
+  - objects: the row's own timestamp (no extra query).
+Rows the read serializer nests or follows (core.prefetch.plan_related) are part of the representation: their latest
+`date_last_updated` and, for collections, their count go into the ETag too (for an object, read from the related
+rows its view loads for the serializer anyway), and such objects get no Last-Modified either.
+"""
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Manager, Max, QuerySet
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from core.prefetch import plan_related
+
+TIMESTAMP_FIELD = "date_last_updated"
+
+Validators = Tuple[str, Optional[datetime]]  # (etag, last modified)
+
+
+def _has_timestamp(model) -> bool:
+    return any(field.name == TIMESTAMP_FIELD for field in model._meta.concrete_fields)
+
+
+def _digest(*parts) -> str:
+    return hashlib.md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _version(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+@lru_cache(maxsize=None)
+def _nested(model, serializer_class) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Relations `serializer_class` renders over `model` rows: (paths to models with a timestamp, multi-valued paths).
+    """
+    if serializer_class is None:
+        return (), ()
+    select, prefetch = plan_related(serializer_class, model)
+    stamped = []
+    for path in select + prefetch:
+        current = model
+        for attr in path.split("__"):
+            current = current._meta.get_field(attr).related_model
+        if _has_timestamp(current):
+            stamped.append(path)
+    return tuple(stamped), prefetch
+
+
+def _nested_aggregates(model, serializer_class) -> Dict[str, Any]:
+    stamped, collections = _nested(model, serializer_class)
+    aggregates = {f"nested_updated_{index}": Max(f"{path}__{TIMESTAMP_FIELD}") for index, path in enumerate(stamped)}
+    aggregates.update({f"nested_count_{index}": Count(path, distinct=True) for index, path in enumerate(collections)})
+    return aggregates
+
+
+def _aggregated_versions(stats: Dict[str, Any], aggregates: Dict[str, Any]) -> Tuple[str, ...]:
+    return tuple(_version(stats[name]) for name in sorted(aggregates))
+
+
+def instance_etag(model, pk, last_updated: Optional[datetime], nested: Tuple[str, ...] = ()) -> str:
+    # strong: identifies one version of one row (and the rows it nests), so it can guard updates via If-Match
+    return f'"{_digest(model._meta.label, pk, last_updated.isoformat() if last_updated else "", *nested)}"'
+
+
+def _related_objects(instance, path: str) -> list:
+    objects = [instance]
+    for attr in path.split("__"):
+        following = []
+        for obj in objects:
+            try:
+                value = getattr(obj, attr)
+            except ObjectDoesNotExist:  # missing reverse one-to-one
+                continue
+            if isinstance(value, Manager):
+                following.extend(value.all())
+            elif value is not None:
+                following.append(value)
+        objects = following
+    return objects
+
+
+def instance_validators(instance, serializer_class=None) -> Optional[Validators]:
+    """
+    Validators of `instance` as `serializer_class` renders it. Nested rows are read through the instance, so a
+    view that loaded them for the serializer (select/prefetch_related) pays no extra query.
+    """
+    model = type(instance)
+    if not _has_timestamp(model):
+        return None
+    last_updated = getattr(instance, TIMESTAMP_FIELD)
+    stamped, collections = _nested(model, serializer_class)
+    if not stamped and not collections:
+        return instance_etag(model, instance.pk, last_updated), last_updated
+    nested = [
+        _version(max((getattr(obj, TIMESTAMP_FIELD) for obj in _related_objects(instance, path)), default=None))
+        for path in stamped
+    ]
+    nested += [str(len({obj.pk for obj in _related_objects(instance, path)})) for path in collections]
+    return instance_etag(model, instance.pk, last_updated, tuple(nested)), None
+
+
+def list_stats(queryset: QuerySet, serializer_class=None) -> Optional[Tuple[int, Tuple[str, ...]]]:
+    """
+    (row count, version parts) of the scoped queryset in one aggregate query: the latest `date_last_updated` of its
+    rows and of the rows `serializer_class` nests, plus the size of nested collections.
+    """
+    if not _has_timestamp(queryset.model):
+        return None
+    aggregates = _nested_aggregates(queryset.model, serializer_class)
+    joins_collections = bool(_nested(queryset.model, serializer_class)[1])
+    stats = queryset.order_by().aggregate(
+        count=Count("pk", distinct=joins_collections), last_updated=Max(TIMESTAMP_FIELD), **aggregates
+    )
+    return stats["count"], (_version(stats["last_updated"]),) + _aggregated_versions(stats, aggregates)
+
+
+def list_validators(queryset: QuerySet, request, stats) -> Optional[Validators]:
+    """
+    Weak ETag for a list: it changes whenever a row in scope (or a row it nests) is added, removed or updated. The
+    full path (filters, page, ordering) and the user are part of the tag since both shape the response.
+    No Last-Modified: removing a row leaves every timestamp as it was.
+    """
+    if stats is None:
+        return None
+    count, versions = stats
+    user_id = getattr(getattr(request, "user", None), "pk", None)
+    etag = _digest(queryset.model._meta.label, user_id, request.get_full_path(), count, *versions)
+    return f'W/"{etag}"', None
+
+
+def _weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def not_modified(request, validators: Optional[Validators]) -> bool:
+    """
+    True when the client's copy is current (If-None-Match, else If-Modified-Since).
+    """
+    if validators is None:
+        return False
+    etag, last_updated = validators
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        tags = parse_etags(if_none_match)
+        return tags == ["*"] or _weak(etag) in {_weak(tag) for tag in tags}
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    return since is not None and last_updated is not None and int(last_updated.timestamp()) <= since
+
+
+def precondition_failed(request, etag: str) -> bool:
+    """
+    True when an If-Match header is present and does not name the current version (strong comparison).
+    """
+    if_match = request.headers.get("If-Match")
+    if not if_match:
+        return False
+    tags = parse_etags(if_match)
+    return tags != ["*"] and etag not in tags
+
+
+def set_validators(response, validators: Optional[Validators]):
+    if validators is not None:
+        etag, last_updated = validators
+        response["ETag"] = etag
+        if last_updated is not None:
+            response["Last-Modified"] = http_date(last_updated.timestamp())
+    return response
@@ -19,6 +19,7 @@ FIELD_ERROR = 'FieldError'
 INVALID_DATA = 'InvalidData'
 UNAUTHORIZED = 'Unauthorized'
 EMAIL_ERROR = 'EmailError'
+PRECONDITION_FAILED = 'PreconditionFailed'
 
 DEFAULT_COUNTRY_ID = 1
 
@@ -0,0 +1,145 @@
+# core/fast_serializers.py
+"""
+Compiled fast path for read-only list serializers.
+
+`compile_read_serializer(SerializerClass)` turns a flat `ModelSerializer` (model fields, forward FK/one-to-one
+paths such as `source="patient.email"`, primary-key related fields) into:
+  - `columns`: the exact lookups to fetch with `.values_list()`, and
+  - `serialize(rows)`: a generated function building the same dicts DRF would, without instantiating models
+    or walking fields per row.
+
+Output matches `SerializerClass(instances, many=True).data` exactly, including key order, `None` handling and
+keys omitted when a nullable relation on a dotted source is empty (DRF's SkipField). Serializers the compiler
+cannot reproduce exactly (method fields, nested serializers, `source="*"`, reverse relations, field defaults)
+raise ImproperlyConfigured instead of silently diverging.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+
+class CompiledReadSerializer:
+    def __init__(self, serializer_class, columns: Sequence[str], source: str, serialize: Callable) -> None:
+        self.serializer_class = serializer_class
+        self.columns = tuple(columns)
+        self.source = source  # generated code, kept for debugging
+        self._serialize = serialize
+
+    def rows(self, queryset: QuerySet) -> QuerySet:
+        return queryset.values_list(*self.columns)
+
+    def serialize(self, rows: Iterable[Tuple]) -> List[Dict[str, Any]]:
+        return self._serialize(rows)
+
+    def serialize_queryset(self, queryset: QuerySet) -> List[Dict[str, Any]]:
+        return self._serialize(self.rows(queryset))
+
+
+def _resolve(model, serializer_class, field) -> Tuple[str, List[str]]:
+    """
+    Lookup for the field's source plus the lookups of nullable relations crossed on the way.
+    """
+    attrs = field.source_attrs
+    if not attrs:  # source="*"
+        raise ImproperlyConfigured(f"{serializer_class.__name__}.{field.field_name}: source='*' cannot be compiled")
+
+    guards, path, current = [], [], model
+    for index, attr in enumerate(attrs):
+        try:
+            model_field = current._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__}.{field.field_name}: '{attr}' is not a field of {current.__name__}"
+            )
+        if not model_field.concrete or model_field.many_to_many:
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__}.{field.field_name}: '{attr}' is not a concrete forward field"
+            )
+        path.append(attr)
+        if index == len(attrs) - 1:
+            if model_field.is_relation and not isinstance(field, serializers.PrimaryKeyRelatedField):
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{field.field_name}: relations compile only as primary keys"
+                )
+            break
+        if not model_field.is_relation:
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__}.{field.field_name}: '{attr}' is not a relation"
+            )
+        if model_field.null:
+            guards.append("__".join(path))
+        current = model_field.related_model
+    return "__".join(path), guards
+
+
+def _converter(field) -> Tuple[str, bool]:
+    """
+    Expression template for `field.to_representation(v)`; the flag says whether it calls the bound method.
+    """
+    method = type(field).to_representation
+    if method is serializers.PrimaryKeyRelatedField.to_representation and field.pk_field is None:
+        return "{v}", False  # values_list already yields the primary key
+    if method is serializers.JSONField.to_representation and not field.binary:
+        return "{v}", False
+    if method is serializers.CharField.to_representation:
+        return "str({v})", False
+    if method is serializers.IntegerField.to_representation:
+        return "int({v})", False
+    return "{f}({v})", True
+
+
+@lru_cache(maxsize=None)
+def compile_read_serializer(serializer_class) -> CompiledReadSerializer:
+    meta = getattr(serializer_class, "Meta", None)
+    model = getattr(meta, "model", None)
+    if model is None:
+        raise ImproperlyConfigured(f"{serializer_class.__name__} is not a ModelSerializer")
+
+    columns: List[str] = []
+    namespace: Dict[str, Any] = {}
+    lines = ["def _row(r):", "    d = {}"]
+
+    def column(lookup: str) -> int:
+        if lookup not in columns:
+            columns.append(lookup)
+        return columns.index(lookup)
+
+    for field in serializer_class().fields.values():
+        if field.write_only:
+            continue
+        name = field.field_name
+        if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer,
+                              serializers.ManyRelatedField, serializers.HiddenField)):
+            raise ImproperlyConfigured(f"{serializer_class.__name__}.{name}: {type(field).__name__} cannot be compiled")
+        if field.default is not empty:
+            raise ImproperlyConfigured(f"{serializer_class.__name__}.{name}: fields with a default cannot be compiled")
+
+        lookup, guards = _resolve(model, serializer_class, field)
+        position = column(lookup)
+        template, bound = _converter(field)
+        if bound:
+            namespace[f"_f{position}"] = field.to_representation
+        value = template.format(v=f"r[{position}]", f=f"_f{position}")
+
+        indent = "    "
+        if guards:
+            missing = " or ".join(f"r[{column(guard)}] is None" for guard in guards)
+            if field.allow_null:
+                lines.append(f"    if {missing}:")
+                lines.append(f"        d[{name!r}] = None")
+                lines.append("    else:")
+            else:  # DRF skips the key when a relation on the source path is empty
+                lines.append(f"    if not ({missing}):")
+            indent = "        "
+        lines.append(f"{indent}d[{name!r}] = None if r[{position}] is None else {value}")
+
+    lines.append("    return d")
+    lines.append("def serialize(rows):")
+    lines.append("    return [_row(r) for r in rows]")
+    source = "\n".join(lines) + "\n"
+    exec(compile(source, f"<compiled {serializer_class.__qualname__}>", "exec"), namespace)
+    return CompiledReadSerializer(serializer_class, columns, source, namespace["serialize"])
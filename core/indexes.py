@@ -0,0 +1,60 @@
+from typing import Optional
+
+from django.db import models
+
+
+class BrinIndex(models.Index):
+    """
+    Block-range index for append-only tables ordered by insertion time.
+    PostgreSQL gets a real `USING brin` index; other backends (MySQL, SQLite) fall back to a plain B-tree
+    so the same model definition migrates everywhere.
+    """
+    suffix = "brin"
+
+    def __init__(self, *expressions, pages_per_range: Optional[int] = None, **kwargs):
+        if pages_per_range is not None and pages_per_range <= 0:
+            raise ValueError("pages_per_range must be None or a positive integer")
+        self.pages_per_range = pages_per_range
+        super().__init__(*expressions, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        if self.pages_per_range is not None:
+            kwargs["pages_per_range"] = self.pages_per_range
+        return path, args, kwargs
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        statement = super().create_sql(model, schema_editor, using=" USING brin", **kwargs)
+        if self.pages_per_range is not None:
+            statement.parts["extra"] = " WITH (pages_per_range = %d)%s" % (
+                self.pages_per_range,
+                statement.parts["extra"],
+            )
+        return statement
+
+
+class PartialIndex(models.Index):
+    """
+    Index over the rows matching `condition`. Backends without partial indexes (MySQL) would silently index every
+    row on `fields` instead, which may not serve the query at all; they get a plain index on `fallback_fields`,
+    which should cover the condition's columns in a prefix the query can use.
+    """
+
+    def __init__(self, *expressions, fallback_fields=(), **kwargs):
+        if kwargs.get("condition") is None or not fallback_fields:
+            raise ValueError("PartialIndex requires a condition and fallback_fields")
+        self.fallback_fields = list(fallback_fields)
+        super().__init__(*expressions, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        kwargs["fallback_fields"] = self.fallback_fields
+        return path, args, kwargs
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.features.supports_partial_indexes:
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        fallback = models.Index(fields=self.fallback_fields, name=self.name, db_tablespace=self.db_tablespace)
+        return fallback.create_sql(model, schema_editor, using=using, **kwargs)
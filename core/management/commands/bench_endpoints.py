@@ -0,0 +1,124 @@
+import io
+import json
+import platform
+import subprocess
+from typing import Any, Dict, List
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from core import benchmarks
+
+SEED_PASSWORD = "bench-password"
+
+
+class Command(BaseCommand):
+    help = ("Benchmark every GET endpoint (plus login) as admin, doctor and patient on freshly seeded databases of "
+            "several sizes; prints p50/p95/p99 latency, queries per request and throughput, stores the results as "
+            "JSON and optionally compares them with a baseline run. Use production-like settings (DEBUG off).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="100,1000",
+                            help="Comma-separated patient counts; each size gets its own seeded test database")
+        parser.add_argument("--current-db", action="store_true",
+                            help="Benchmark the configured database as it is instead of seeding test databases")
+        parser.add_argument("--requests", type=int, default=30, help="Measured requests per endpoint and role")
+        parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests before measuring")
+        parser.add_argument("--cold", action="store_true", help="Clear the caches before every request")
+        parser.add_argument("--only", default="", help="Only cases whose name contains this text")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+        parser.add_argument("--baseline", default="", help="JSON results of an earlier run to compare against")
+        parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="Allowed p95 slowdown against the baseline, as a fraction")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            setup_test_environment()  # test client host, in-memory email backend
+            owns_environment = True
+        except RuntimeError:
+            owns_environment = False  # already inside a test run
+        try:
+            if options["current_db"]:
+                results = {"current": self.benchmark(options, login_password=None)}
+            else:
+                results = {size: self.benchmark_size(int(size), options) for size in self.sizes(options["sizes"])}
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+
+        report = {"meta": self.meta(options), "results": results}
+        with open(options["output"], "w") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as handle:
+                baseline = json.load(handle)["results"]
+            regressions = benchmarks.compare(results, baseline, tolerance=options["tolerance"])
+            for regression in regressions:
+                self.stdout.write(self.style.WARNING(f"Regression: {regression}"))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+            elif options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+
+    @staticmethod
+    def sizes(value: str) -> List[str]:
+        sizes = [size.strip() for size in value.split(",") if size.strip()]
+        if not sizes or not all(size.isdigit() for size in sizes):
+            raise CommandError("--sizes must be a comma-separated list of patient counts")
+        return sizes
+
+    def benchmark_size(self, size: int, options) -> Dict[str, Any]:
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Dataset with {size} patients"))
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            call_command("seed_scale", patients=size, doctors=max(2, size // 20), admins=1, seed=options["seed"],
+                         password=SEED_PASSWORD, stdout=io.StringIO())
+            return self.benchmark(options, login_password=SEED_PASSWORD)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, options, login_password) -> Dict[str, Any]:
+        cases = [case for case in benchmarks.endpoint_cases(benchmarks.role_users(), login_password)
+                 if options["only"] in case.name]
+        results = {}
+        for case in cases:
+            summary = benchmarks.summarize(
+                benchmarks.measure(case, options["requests"], options["warmup"], options["cold"])
+            )
+            results[case.name] = summary
+            self.stdout.write(
+                f"{case.name:<60} p50 {summary['p50_ms']:>8.2f}ms  p95 {summary['p95_ms']:>8.2f}ms  "
+                f"p99 {summary['p99_ms']:>8.2f}ms  {summary['queries']:>3} queries  "
+                f"{summary['throughput_rps'] or 0:>7.1f} req/s  {summary['statuses']}"
+            )
+        for name, gap in benchmarks.hit_miss_gaps(results).items():
+            self.stdout.write(f"{name}: hit p50 - miss p50 = {gap:+.2f}ms")
+        return results
+
+    @staticmethod
+    def meta(options) -> Dict[str, Any]:
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                    check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "created_at": timezone.now().isoformat(),
+            "commit": commit,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "requests": options["requests"],
+            "warmup": options["warmup"],
+            "cold": options["cold"],
+            "seed": options["seed"],
+        }
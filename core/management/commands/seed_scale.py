@@ -0,0 +1,331 @@
+import random
+import time
+from datetime import timedelta
+from typing import Callable, Iterable, Iterator, List
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from analyses.models import Analysis, AnalysisResult
+from audit.models import AuditLog
+from authentication.const import ADMIN, DOCTOR, PATIENT, Gender
+from authentication.models import User
+from core.response_cache import invalidate_models
+from notes.models import ClinicalNote, ClinicalNoteAttachment
+from notifications.models import Notification
+from notifications.services import unread
+from profiles.models import DoctorProfile, PatientDoctorConsent, PatientProfile
+from profiles.services.consents import invalidate_doctor_consents
+from reminders.models import Reminder, ReminderOccurrence
+from reminders.services import occurrences
+
+# test name, unit, reference low, reference high
+LAB_PANEL = [
+    ("Hemoglobin", "g/dL", 12.0, 16.0),
+    ("Hematocrit", "%", 36.0, 48.0),
+    ("WBC", "10^3/uL", 4.0, 11.0),
+    ("Platelets", "10^3/uL", 150.0, 400.0),
+    ("Glucose", "mg/dL", 70.0, 110.0),
+    ("HbA1c", "%", 4.0, 5.6),
+    ("Creatinine", "mg/dL", 0.6, 1.2),
+    ("Urea", "mg/dL", 15.0, 45.0),
+    ("ALT", "U/L", 7.0, 56.0),
+    ("AST", "U/L", 10.0, 40.0),
+    ("Total cholesterol", "mg/dL", 125.0, 200.0),
+    ("HDL", "mg/dL", 40.0, 80.0),
+    ("LDL", "mg/dL", 50.0, 130.0),
+    ("Triglycerides", "mg/dL", 50.0, 150.0),
+    ("TSH", "mIU/L", 0.4, 4.0),
+    ("Ferritin", "ng/mL", 20.0, 250.0),
+    ("Vitamin D", "ng/mL", 30.0, 100.0),
+    ("CRP", "mg/L", 0.0, 5.0),
+]
+FIRST_NAMES = ["Ana", "Ion", "Maria", "Andrei", "Elena", "Mihai", "Ioana", "Alex", "Sofia", "Radu", "Irina", "Dan"]
+LAST_NAMES = ["Popescu", "Ionescu", "Stan", "Dumitru", "Moldovan", "Marin", "Tudor", "Rusu", "Matei", "Ilie"]
+SPECIALIZATIONS = ["Cardiology", "Endocrinology", "Family medicine", "Internal medicine", "Nephrology", "Hematology"]
+HOSPITALS = ["City Hospital", "University Clinic", "Regional Medical Center", "Private Practice"]
+NOTE_TITLES = ["Follow-up visit", "Annual check-up", "Lab review", "Medication adjustment", "Referral"]
+NOTE_SENTENCES = [
+    "Patient reports feeling well.", "Blood pressure within normal limits.", "Continue current medication.",
+    "Repeat labs in three months.", "Advised dietary changes and regular exercise.", "No acute complaints.",
+    "Discussed recent lab results.", "Mild fatigue reported over the last weeks.",
+]
+REMINDER_TITLES = ["Blood test", "Check-up", "Take medication", "Cardiology control", "Vaccination"]
+RRULES = ["", "", "FREQ=MONTHLY;COUNT=12", "FREQ=WEEKLY;COUNT=8", "FREQ=YEARLY"]
+AUDITED_MODELS = [Analysis, AnalysisResult, ClinicalNote, Reminder, Notification, PatientDoctorConsent, User]
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = ("Fill the database with a deterministic synthetic dataset (users, profiles, consents, analyses, notes, "
+            "reminders, notifications, audit logs) for scale testing. Run against an empty database or use a "
+            "new --prefix: seeded emails and order ids are unique. Nothing else may write to the database while "
+            "it runs.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--patients", type=int, default=1000)
+        parser.add_argument("--doctors", type=int, default=50)
+        parser.add_argument("--admins", type=int, default=2)
+        parser.add_argument("--consents-per-patient", type=int, default=2, help="Doctors consented per patient")
+        parser.add_argument("--analyses-per-patient", type=int, default=5)
+        parser.add_argument("--results-per-analysis", type=int, default=8)
+        parser.add_argument("--notes-per-patient", type=int, default=2)
+        parser.add_argument("--attachments-per-note", type=int, default=1)
+        parser.add_argument("--reminders-per-patient", type=int, default=3)
+        parser.add_argument("--notifications-per-patient", type=int, default=5)
+        parser.add_argument("--audit-logs-per-user", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed builds the same data")
+        parser.add_argument("--password", default="seed-password", help="Password of every generated user")
+        parser.add_argument("--prefix", default="seed", help="Prefix of generated emails and order ids")
+
+    def handle(self, *args, **options):
+        if options["consents_per_patient"] > options["doctors"]:
+            raise CommandError("--consents-per-patient cannot exceed --doctors")
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.prefix = options["prefix"]
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        # hashing is deliberately slow: hash once, share it between all users
+        password = make_password(options["password"])
+        groups = {name: Group.objects.get_or_create(name=name)[0] for name in (ADMIN, DOCTOR, PATIENT)}
+        self.create_users("admin", options["admins"], groups[ADMIN], password)
+        doctors = self.create_users("doctor", options["doctors"], groups[DOCTOR], password)
+        patients = self.create_users("patient", options["patients"], groups[PATIENT], password)
+
+        self.insert(DoctorProfile, (self.doctor_profile(index, user_id) for index, user_id in enumerate(doctors)))
+        self.insert(PatientProfile, (self.patient_profile(user_id) for user_id in patients))
+        self.insert(PatientDoctorConsent, (
+            consent for patient_id in patients
+            for consent in self.consents(patient_id, doctors, options["consents_per_patient"])
+        ))
+        self.create_analyses(patients, doctors, options["analyses_per_patient"], options["results_per_analysis"])
+        self.create_notes(patients, doctors, options["notes_per_patient"], options["attachments_per_note"])
+        self.create_reminders(patients, doctors, options["reminders_per_patient"])
+        self.insert(Notification, (
+            self.notification(patient_id)
+            for patient_id in patients for _ in range(options["notifications_per_patient"])
+        ))
+        users = doctors + patients
+        self.insert(AuditLog, (
+            self.audit_log(users) for _ in range(len(users) * options["audit_logs_per_user"])
+        ))
+
+        # bulk_create sends no signals: derive the unread counters and drop what the caches hold about the
+        # touched tables
+        unread.recount(patients)
+        invalidate_doctor_consents(*doctors)
+        invalidate_models(User, DoctorProfile, PatientProfile, PatientDoctorConsent, Analysis, AnalysisResult,
+                          ClinicalNote, ClinicalNoteAttachment, Reminder, ReminderOccurrence, Notification, AuditLog)
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.monotonic() - started:.1f}s."))
+
+    def insert(self, model, objects: Iterable, report: bool = True) -> List[int]:
+        """
+        bulk_create `objects` in batches; returns the new primary keys in order.
+        """
+        started = time.monotonic()
+        ids = []
+        for batch in _batches(objects, self.batch_size):
+            ids.extend(obj.pk for obj in self.bulk_create(model, batch))
+        if report:
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {len(ids)} rows in {time.monotonic() - started:.1f}s")
+        return ids
+
+    def insert_nested(self, model, parents: Iterable, children: Callable[[list], Iterable], child_model) -> None:
+        """
+        Insert parents batch by batch, each batch followed by its children, so memory stays bounded.
+        """
+        started = time.monotonic()
+        parent_count = child_count = 0
+        for batch in _batches(parents, self.batch_size):
+            created = self.bulk_create(model, batch)
+            parent_count += len(created)
+            child_count += len(self.insert(child_model, children(created), report=False))
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"{model._meta.verbose_name_plural}: {parent_count} rows, "
+                          f"{child_model._meta.verbose_name_plural}: {child_count} rows in {elapsed:.1f}s")
+
+    def bulk_create(self, model, batch: list) -> list:
+        """
+        bulk_create one batch, with primary keys set on the objects even where the backend returns none (MySQL).
+        """
+        if connection.features.can_return_rows_from_bulk_insert:
+            return model.objects.bulk_create(batch)
+        # the auto-increment ids of one multi-row INSERT follow the rows' order; as the command is the only writer,
+        # the ids above the previous maximum are this batch's
+        last = model.objects.aggregate(last=Max("pk"))["last"] or 0
+        created = model.objects.bulk_create(batch)
+        ids = model.objects.filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:len(created)]
+        for obj, pk in zip(created, ids):
+            obj.pk = pk
+        return created
+
+    def days_ago(self, low: int, high: int):
+        return self.now - timedelta(days=self.rng.randint(low, high), minutes=self.rng.randint(0, 1439))
+
+    def create_users(self, role: str, count: int, group: Group, password: str) -> List[int]:
+        rng = self.rng
+        return self.insert(User, (
+            User(
+                email=f"{self.prefix}-{role}-{index}@example.test",
+                password=password,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                birthday=(self.now - timedelta(days=rng.randint(18 * 365, 90 * 365))).date(),
+                gender=rng.choice(Gender.values),
+                group=group,
+                is_staff=group.name == ADMIN,
+            )
+            for index in range(count)
+        ))
+
+    def doctor_profile(self, index: int, user_id: int) -> DoctorProfile:
+        return DoctorProfile(
+            user_id=user_id,
+            specialization=self.rng.choice(SPECIALIZATIONS),
+            license_number=f"{self.prefix}-LIC-{index:07d}",
+            hospital_affiliation=self.rng.choice(HOSPITALS),
+        )
+
+    def patient_profile(self, user_id: int) -> PatientProfile:
+        return PatientProfile(
+            user_id=user_id,
+            family_history=self.rng.choice(["", "Diabetes", "Hypertension", "Cardiovascular disease"]),
+            risk_factors=self.rng.choice(["", "Smoker", "Sedentary", "Overweight"]),
+            insurance_provider=self.rng.choice(["Public", "Private A", "Private B"]),
+        )
+
+    def consents(self, patient_id: int, doctors: List[int], count: int) -> Iterator[PatientDoctorConsent]:
+        for doctor_id in self.rng.sample(doctors, count):
+            expired = self.rng.random() < 0.1
+            yield PatientDoctorConsent(
+                patient_id=patient_id,
+                doctor_id=doctor_id,
+                scope=self.rng.choice(PatientDoctorConsent.Scope.values),
+                expires_at=self.days_ago(1, 90) if expired else self.rng.choice([None, self.now + timedelta(days=365)]),
+                is_active=not expired,
+            )
+
+    def create_analyses(self, patients: List[int], doctors: List[int], per_patient: int, results: int) -> None:
+        rng = self.rng
+        counter = iter(range(len(patients) * per_patient))
+
+        def analyses():
+            for patient_id in patients:
+                for _ in range(per_patient):
+                    by_doctor = doctors and rng.random() < 0.5
+                    yield Analysis(
+                        patient_id=patient_id,
+                        uploaded_by_id=rng.choice(doctors) if by_doctor else patient_id,
+                        source=Analysis.Source.DOCTOR if by_doctor else Analysis.Source.PATIENT,
+                        title=rng.choice(["Blood panel", "Lipid profile", "Annual labs", "Thyroid panel"]),
+                        file=f"analyses/{self.prefix}-report.pdf",
+                        report_date=self.days_ago(0, 3 * 365).date(),
+                        order_id=f"{self.prefix}-ORD-{next(counter):09d}",
+                    )
+
+        def analysis_results(created):
+            for analysis in created:
+                for test_name, unit, low, high in rng.sample(LAB_PANEL, min(results, len(LAB_PANEL))):
+                    spread = high - low
+                    yield AnalysisResult(
+                        analysis_id=analysis.pk,
+                        test_name=test_name,
+                        value=f"{max(0.0, rng.gauss((low + high) / 2, spread / 3)):.1f}",
+                        unit=unit,
+                        reference_range=f"{low:g}-{high:g}",
+                        measured_at=analysis.report_date,
+                    )
+
+        self.insert_nested(Analysis, analyses(), analysis_results, AnalysisResult)
+
+    def create_notes(self, patients: List[int], doctors: List[int], per_patient: int, attachments: int) -> None:
+        rng = self.rng
+
+        def notes():
+            for patient_id in patients:
+                for _ in range(per_patient):
+                    yield ClinicalNote(
+                        patient_id=patient_id,
+                        doctor_id=rng.choice(doctors) if doctors else None,
+                        title=rng.choice(NOTE_TITLES),
+                        body=" ".join(rng.sample(NOTE_SENTENCES, rng.randint(2, 5))),
+                    )
+
+        def note_attachments(created):
+            for note in created:
+                for index in range(attachments):
+                    yield ClinicalNoteAttachment(note_id=note.pk, file=f"notes/{note.patient_id}/{note.pk}/scan-{index}.pdf")
+
+        self.insert_nested(ClinicalNote, notes(), note_attachments, ClinicalNoteAttachment)
+
+    def create_reminders(self, patients: List[int], doctors: List[int], per_patient: int) -> None:
+        horizon = occurrences.horizon(self.now)
+
+        def reminders():
+            for patient_id in patients:
+                for _ in range(per_patient):
+                    yield self.reminder(patient_id, doctors)
+
+        def reminder_occurrences(created):
+            for reminder in created:
+                yield from occurrences.occurrence_rows(reminder, horizon)
+
+        self.insert_nested(Reminder, reminders(), reminder_occurrences, ReminderOccurrence)
+
+    def reminder(self, patient_id: int, doctors: List[int]) -> Reminder:
+        rng = self.rng
+        due_at = self.now + timedelta(days=rng.randint(-180, 180), minutes=rng.randint(0, 1439))
+        return Reminder(
+            patient_id=patient_id,
+            created_by_id=rng.choice(doctors) if doctors and rng.random() < 0.7 else patient_id,
+            title=rng.choice(REMINDER_TITLES),
+            due_at=due_at,
+            rrule=rng.choice(RRULES),
+            preferred_channel=rng.choice(Reminder.Channel.values),
+            last_sent_at=due_at if due_at < self.now else None,
+        )
+
+    def notification(self, user_id: int) -> Notification:
+        rng = self.rng
+        kind = rng.choice(Notification.Kind.values)
+        sent_at = self.days_ago(0, 365) if rng.random() < 0.8 else None
+        return Notification(
+            user_id=user_id,
+            kind=kind,
+            channel=rng.choice(Notification.Channel.values),
+            subject=f"{kind.replace('_', ' ').capitalize()} update",
+            body=rng.choice(NOTE_SENTENCES),
+            payload={"source": "seed"},
+            sent_at=sent_at,
+            read_at=sent_at if sent_at is not None and rng.random() < 0.6 else None,
+        )
+
+    def audit_log(self, users: List[int]) -> AuditLog:
+        rng = self.rng
+        model = rng.choice(AUDITED_MODELS)
+        return AuditLog(
+            actor_id=rng.choice(users),
+            action=rng.choice([AuditLog.Action.READ] * 6 + [AuditLog.Action.CREATE, AuditLog.Action.UPDATE,
+                                                            AuditLog.Action.DELETE, AuditLog.Action.LOGIN]),
+            target_type=model._meta.label_lower,
+            target_id=str(rng.randint(1, 1_000_000)),
+            ip_address=f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            metadata={},
+        )
@@ -0,0 +1,231 @@
+# core/metrics.py
+"""
+Per-request performance histograms (recorded by core.middleware.RequestMetricsMiddleware), labelled by URL name
+and method, and their export in the Prometheus text format (core.views.MetricsView).
+
+Histograms live in process memory. With METRICS_DIR set, every process also writes its own snapshot to
+`<METRICS_DIR>/metrics-<pid>-<start>.json` (atomically, after requests and from a heartbeat thread, at most every
+METRICS_FLUSH_INTERVAL seconds) and the export sums the snapshots of all processes, so any worker can answer a
+scrape for the whole server. The start time keeps a recycled PID from overwriting a dead worker's file; snapshots
+not rewritten for STALE_FLUSH_INTERVALS intervals belong to exited processes and are dropped from the sum (and
+the directory), which Prometheus sees as a counter reset.
+"""
+import glob
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (help text, bucket upper bounds); +Inf is implied
+HISTOGRAMS = {
+    "hv_request_duration_seconds": ("Request wall time", DURATION_BUCKETS),
+    "hv_request_db_queries": ("Database queries per request", COUNT_BUCKETS),
+    "hv_request_db_duration_seconds": ("Time spent in database queries per request", DURATION_BUCKETS),
+    "hv_request_serializer_duration_seconds": ("Time spent serializing per request", DURATION_BUCKETS),
+    "hv_request_audit_duration_seconds": ("Time spent in audit_event receivers per request", DURATION_BUCKETS),
+    "hv_response_size_bytes": ("Response body size (non-streaming responses)", SIZE_BUCKETS),
+}
+
+# Snapshots older than this many METRICS_FLUSH_INTERVALs are of processes that are gone
+STALE_FLUSH_INTERVALS = 3
+
+# "name|view|method" -> per-bucket counts (not cumulative, +Inf last) followed by the sum of observed values
+Snapshot = Dict[str, List[float]]
+
+_lock = threading.Lock()
+_series: Snapshot = {}
+_last_flush = 0.0
+_identity: Optional[Tuple[int, int]] = None  # (pid, start in ms) of the process owning the snapshot file
+_current: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> object:
+    """
+    Begin collecting per-request timings in this context; pass the token to `finish_request()`.
+    """
+    return _current.set({"db_queries": 0, "db": 0.0, "serializer": 0.0, "audit": 0.0})
+
+
+def finish_request(token) -> Dict[str, float]:
+    timings = _current.get()
+    _current.reset(token)
+    return timings
+
+
+@contextmanager
+def timed(part: str):
+    """
+    Add the time spent in the block to `part` ("serializer", "audit", ...) of the current request, if any.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[part] += time.perf_counter() - started
+
+
+def record_query(seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings["db_queries"] += 1
+        timings["db"] += seconds
+
+
+def observe(name: str, view: str, method: str, value: float) -> None:
+    buckets = HISTOGRAMS[name][1]
+    key = f"{name}|{view}|{method}"
+    with _lock:
+        series = _series.get(key)
+        if series is None:
+            series = _series[key] = [0] * (len(buckets) + 2)
+        index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+        series[index] += 1
+        series[-1] += value
+
+
+def observe_request(view: str, method: str, seconds: float, timings: Dict[str, float],
+                    response_size: Optional[int]) -> None:
+    observe("hv_request_duration_seconds", view, method, seconds)
+    observe("hv_request_db_queries", view, method, timings["db_queries"])
+    observe("hv_request_db_duration_seconds", view, method, timings["db"])
+    observe("hv_request_serializer_duration_seconds", view, method, timings["serializer"])
+    observe("hv_request_audit_duration_seconds", view, method, timings["audit"])
+    if response_size is not None:
+        observe("hv_response_size_bytes", view, method, response_size)
+    if time.monotonic() - _last_flush >= _interval():
+        flush()
+
+
+def snapshot() -> Snapshot:
+    with _lock:
+        return {key: list(series) for key, series in _series.items()}
+
+
+def reset() -> None:
+    with _lock:
+        _series.clear()
+
+
+def _directory() -> Optional[str]:
+    return getattr(settings, "METRICS_DIR", None) or None
+
+
+def _interval() -> float:
+    return getattr(settings, "METRICS_FLUSH_INTERVAL", 10)
+
+
+def _heartbeat() -> None:
+    # Keeps an idle process's snapshot fresh, so it is not taken for a dead one
+    while True:
+        time.sleep(_interval())
+        if _directory() is not None:
+            flush()
+
+
+def _own_file(directory: str) -> str:
+    global _identity
+    pid = os.getpid()
+    if _identity is None or _identity[0] != pid:  # first flush of this process (or of a forked child)
+        _identity = (pid, int(time.time() * 1000))
+        threading.Thread(target=_heartbeat, name="metrics-heartbeat", daemon=True).start()
+    return os.path.join(directory, f"metrics-{pid}-{_identity[1]}.json")
+
+
+def flush() -> None:
+    """
+    Write this process's snapshot to METRICS_DIR (no-op without one).
+    """
+    global _last_flush
+    _last_flush = time.monotonic()
+    directory = _directory()
+    if directory is None:
+        return
+    os.makedirs(directory, exist_ok=True)
+    descriptor, path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    with os.fdopen(descriptor, "w") as handle:
+        json.dump(snapshot(), handle)
+    os.replace(path, _own_file(directory))
+
+
+def merge(snapshots: Iterable[Snapshot]) -> Snapshot:
+    merged: Snapshot = {}
+    for item in snapshots:
+        for key, series in item.items():
+            if key not in merged:
+                merged[key] = list(series)
+            elif len(merged[key]) == len(series):
+                merged[key] = [a + b for a, b in zip(merged[key], series)]
+    return merged
+
+
+def collect() -> Snapshot:
+    """
+    All live processes' series when METRICS_DIR is set, else this process's. Stale snapshots are removed.
+    """
+    directory = _directory()
+    if directory is None:
+        return snapshot()
+    own = _own_file(directory)
+    expired = time.time() - STALE_FLUSH_INTERVALS * _interval()
+    snapshots = [snapshot()]
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        if path == own:
+            continue
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+                continue
+            with open(path) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            continue  # removed or being replaced under us
+    return merge(snapshots)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(series: Snapshot) -> str:
+    """
+    Prometheus text exposition format (version 0.0.4).
+    """
+    grouped: Dict[str, List[Tuple[str, str, List[float]]]] = {}
+    for key, values in series.items():
+        name, view, method = key.split("|", 2)
+        grouped.setdefault(name, []).append((view, method, values))
+
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for view, method, values in sorted(grouped.get(name, ())):
+            labels = f'view="{_label(view)}",method="{_label(method)}"'
+            cumulative = 0
+            for bound, count in zip(buckets + (math.inf,), values[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {_number(cumulative)}')
+            lines.append(f"{name}_sum{{{labels}}} {_number(values[-1])}")
+            lines.append(f"{name}_count{{{labels}}} {_number(cumulative)}")
+    return "\n".join(lines) + "\n"
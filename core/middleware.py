@@ -0,0 +1,130 @@
+# core/middleware.py
+import logging
+import re
+import time
+import traceback
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def query_shape(sql: str) -> str:
+    """
+    Query text with parameters already out of the way (`%s`), IN-lists collapsed and whitespace normalized,
+    so the N queries of an N+1 pattern share one shape.
+    """
+    return _SPACES.sub(" ", _IN_LIST.sub("(%s, ...)", sql)).strip()
+
+
+def _call_site() -> Optional[str]:
+    """
+    Innermost stack frame in project code (not Django/DRF and not this module).
+    """
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        filename = frame.filename
+        if filename.startswith(base_dir) and "site-packages" not in filename and filename != __file__:
+            return f"{filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}"
+    return None
+
+
+class _QueryRecorder:
+    def __init__(self) -> None:
+        self.sites: Dict[str, Counter] = defaultdict(Counter)
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        self.sites[query_shape(sql)][_call_site()] += 1
+        return execute(sql, params, many, context)
+
+    def duplicates(self, threshold: int) -> List[tuple]:
+        repeated = [(sum(sites.values()), shape, sites) for shape, sites in self.sites.items()]
+        return sorted((entry for entry in repeated if entry[0] >= threshold), key=lambda entry: -entry[0])
+
+
+class DuplicateQueryMiddleware:
+    """
+    Dev-mode N+1 detector: records every query of a request and logs each query shape executed at least
+    DUPLICATE_QUERY_THRESHOLD times, with the project call sites that issued it.
+    Only active when DEBUG and DUPLICATE_QUERY_DETECTION are both on; it walks the stack on every query, so it is
+    opt-in. Queries run while a streamed response body is sent happen after the view returns and are not seen.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.DEBUG and getattr(settings, "DUPLICATE_QUERY_DETECTION", False)
+        self.threshold = getattr(settings, "DUPLICATE_QUERY_THRESHOLD", 3)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        recorder = _QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        for count, shape, sites in recorder.duplicates(self.threshold):
+            logger.warning(
+                "Duplicate query x%s on %s %s (%s queries in request): %s\n    %s",
+                count, request.method, request.path, recorder.total, shape,
+                "\n    ".join(f"{site or '<unknown>'} x{hits}" for site, hits in sites.most_common()),
+            )
+        return response
+
+
+def _timed_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(time.perf_counter() - started)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time, DB query count and time, serializer time, audit-receiver time and response size of
+    every request into core.metrics histograms, labelled by URL name and method. Disabled by METRICS_ENABLED.
+    Time spent streaming a response body after the view returns is not included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(_timed_query))
+                response = self.get_response(request)
+        finally:
+            timings = metrics.finish_request(token)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        metrics.observe_request(
+            view=match.view_name if match is not None else "unmatched",
+            method=request.method,
+            seconds=elapsed,
+            timings=timings,
+            response_size=None if response.streaming else len(response.content),
+        )
+        return response
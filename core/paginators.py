@@ -1,20 +1,35 @@
 from collections import OrderedDict
+from functools import partial
 
+from django.core.paginator import Paginator as DjangoPaginator
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 
+class KnownCountPaginator(DjangoPaginator):
+    """
+    Django paginator that takes the row count from the caller when it is already known.
+    """
+    def __init__(self, object_list, per_page, known_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if known_count is not None:
+            self.count = known_count  # pre-fills the cached_property
+
+
 class Paginator(PageNumberPagination):
     template = None
     page_query_param = 'page'
     page_size_query_param = 'page_size'
     paginate_query_param = 'paginate'
 
+    def wants_pagination(self, request) -> bool:
+        return request.query_params.get(self.paginate_query_param, 'true').lower() not in ['false', '0', 'no']
+
     def paginate_queryset(self, queryset, request, view=None):
-        paginate = request.query_params.get(self.paginate_query_param, 'true').lower()
-        if paginate in ['false', '0', 'no']:
+        if not self.wants_pagination(request):
             return None
 
+        self.django_paginator_class = partial(KnownCountPaginator, known_count=getattr(view, "known_count", None))
         return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data: dict):
@@ -0,0 +1,97 @@
+# core/permission_matrix.py
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+
+
+class Matrix(NamedTuple):
+    # role (primary group id) -> {"app_label.action_model", ...}
+    roles: Dict[Optional[int], FrozenSet[str]]
+    # user id -> permissions granted besides the role: `user.user_permissions` and the groups in `user.groups`
+    # (only users with such grants appear, so this stays as small as the admin-made exceptions)
+    users: Dict[int, FrozenSet[str]]
+
+_VERSION_KEY = "permission_matrix:version"
+
+_lock = threading.Lock()
+_matrix: Optional[Matrix] = None
+_version: Optional[int] = None
+_version_checked_at: float = 0.0
+
+
+def _compile() -> Matrix:
+    roles: Dict[Optional[int], set] = defaultdict(set)
+    rows = Group.permissions.through.objects.values_list(
+        "group_id", "permission__content_type__app_label", "permission__codename"
+    )
+    for group_id, app_label, codename in rows:
+        roles[group_id].add(f"{app_label}.{codename}")
+
+    User = get_user_model()
+    users: Dict[int, set] = defaultdict(set)
+    for user_id, group_id in User.groups.through.objects.values_list("user_id", "group_id"):
+        users[user_id] |= roles.get(group_id, set())
+    rows = User.user_permissions.through.objects.values_list(
+        "user_id", "permission__content_type__app_label", "permission__codename"
+    )
+    for user_id, app_label, codename in rows:
+        users[user_id].add(f"{app_label}.{codename}")
+    return Matrix(
+        roles={group_id: frozenset(perms) for group_id, perms in roles.items()},
+        users={user_id: frozenset(perms) for user_id, perms in users.items() if perms},
+    )
+
+
+def _shared_version() -> int:
+    return cache.get_or_set(_VERSION_KEY, 1, None)
+
+
+def get_matrix() -> Matrix:
+    """
+    Role -> permission matrix (plus per-user grants), compiled once per process from Group.permissions,
+    User.groups and User.user_permissions and kept in memory.
+    Signals drop it locally and bump a shared version so other worker processes recompile too; the shared
+    version is re-read at most every PERMISSION_MATRIX_CHECK_INTERVAL seconds.
+    """
+    global _matrix, _version, _version_checked_at
+    now = time.monotonic()
+    if _matrix is not None and now - _version_checked_at < getattr(settings, "PERMISSION_MATRIX_CHECK_INTERVAL", 5):
+        return _matrix
+    with _lock:
+        version = _shared_version()
+        _version_checked_at = now
+        if _matrix is None or version != _version:
+            _matrix = _compile()
+            _version = version
+        return _matrix
+
+
+def invalidate_matrix() -> None:
+    global _matrix
+    with _lock:
+        _matrix = None
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 1, None)
+
+
+def role_has_perm(user: Any, action: str, model: Any) -> bool:
+    """
+    O(1) replacement for `user.has_perm("<app_label>.<action>_<model>")`: the user's role (`user.group`), then the
+    user's own grants (`user.user_permissions`, `user.groups`).
+    """
+    if not user or not getattr(user, "is_authenticated", False) or not getattr(user, "is_active", False):
+        return False
+    if getattr(user, "is_superuser", False):
+        return True
+    meta = model._meta
+    perm = f"{meta.app_label}.{action}_{meta.model_name}"
+    matrix = get_matrix()
+    return perm in matrix.roles.get(getattr(user, "group_id", None), ()) or perm in matrix.users.get(user.pk, ())
@@ -7,7 +7,7 @@ from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.request import Request
 
 from authentication.const import ADMIN, DOCTOR, PATIENT
-from profiles.models import PatientDoctorConsent
+from profiles.services.consents import doctor_has_consent
 
 
 def _is_authenticated(user: Any) -> bool:
@@ -101,12 +101,26 @@ class IsParticipantInConsentOrAdmin(BasePermission):
         return getattr(obj, "patient_id", None) == uid or getattr(obj, "doctor_id", None) == uid
 
 
-def _doctor_has_consent(doctor_id: Optional[int], patient_id: Optional[int]) -> bool:
-    if not doctor_id or not patient_id:
-        return False
-    return PatientDoctorConsent.objects.filter(
-        doctor_id=doctor_id, patient_id=patient_id, is_active=True
-    ).exists()
+def _doctor_has_consent(request: Request, view, doctor_id: Optional[int], patient_id: Optional[int]) -> bool:
+    # resolved from the doctor's cached consent set (loaded at most once per request), honoring the
+    # view's `consent_scope` (e.g. NOTES for clinical notes) and consent expiry
+    return doctor_has_consent(doctor_id, patient_id, scope=getattr(view, "consent_scope", None), request=request)
+
+
+def _patient_id_from_path(obj: Any, view) -> Optional[int]:
+    """
+    Follow the view's `patient_path` (e.g. "analysis__patient") down to the patient FK id.
+    """
+    patient_path = getattr(view, "patient_path", None)
+    if not patient_path:
+        return None
+    *relations, field = patient_path.split("__")
+    cur = obj
+    for relation in relations:
+        cur = getattr(cur, relation, None)
+        if cur is None:
+            return None
+    return getattr(cur, f"{field}_id", None)
 
 
 class CanReadPatientData(BasePermission):
@@ -127,18 +141,19 @@ class CanReadPatientData(BasePermission):
         if _has_role(request.user, [ADMIN]):
             return True
 
-        # find patient user id: try common attributes, else custom resolver on the view
-        patient_user_id = None
-        for path in ("patient_id", "user_id", "patient.user_id"):
-            try:
-                parts = path.split(".")
-                cur = obj
-                for p in parts:
-                    cur = getattr(cur, p)
-                patient_user_id = cur
-                break
-            except Exception:
-                continue
+        # find patient user id: view's patient_path, common attributes, else custom resolver on the view
+        patient_user_id = _patient_id_from_path(obj, view)
+        if patient_user_id is None:
+            for path in ("patient_id", "user_id", "patient.user_id"):
+                try:
+                    parts = path.split(".")
+                    cur = obj
+                    for p in parts:
+                        cur = getattr(cur, p)
+                    patient_user_id = cur
+                    break
+                except Exception:
+                    continue
 
         if patient_user_id is None:
             resolver = getattr(view, "resolve_patient_user_id", None)
@@ -153,11 +168,28 @@ class CanReadPatientData(BasePermission):
 
         # doctor with consent
         if _has_role(request.user, [DOCTOR]):
-            return _doctor_has_consent(doctor_id=req_user_id, patient_id=patient_user_id)
+            return _doctor_has_consent(request, view, doctor_id=req_user_id, patient_id=patient_user_id)
 
         return False
 
 
+def can_write_patient_data(request: Request, view, patient_id: Optional[int]) -> bool:
+    """
+    Whether the requesting user may write data of `patient_id`: admins, the patient themself and doctors with
+    a consent covering the view's `consent_scope`.
+    """
+    if _has_role(request.user, [ADMIN]):
+        return True
+    if patient_id is None:
+        return False
+    req_user_id = getattr(request.user, "id", None)
+    if patient_id == req_user_id:
+        return True
+    if _has_role(request.user, [DOCTOR]):
+        return _doctor_has_consent(request, view, doctor_id=req_user_id, patient_id=patient_id)
+    return False
+
+
 class CanWritePatientData(BasePermission):
     """
     Allows writes by:
@@ -191,7 +223,7 @@ class CanWritePatientData(BasePermission):
 
         # doctor with consent to that patient
         if _has_role(request.user, [DOCTOR]):
-            return _doctor_has_consent(doctor_id=getattr(request.user, "id", None), patient_id=int(patient_id))
+            return _doctor_has_consent(request, view, doctor_id=getattr(request.user, "id", None), patient_id=int(patient_id))
 
         return False
 
@@ -203,17 +235,18 @@ class CanWritePatientData(BasePermission):
             return True
 
         # determine patient user id from the object
-        patient_user_id = None
-        for path in ("patient_id", "user_id", "patient.user_id"):
-            try:
-                parts = path.split(".")
-                cur = obj
-                for p in parts:
-                    cur = getattr(cur, p)
-                patient_user_id = cur
-                break
-            except Exception:
-                continue
+        patient_user_id = _patient_id_from_path(obj, view)
+        if patient_user_id is None:
+            for path in ("patient_id", "user_id", "patient.user_id"):
+                try:
+                    parts = path.split(".")
+                    cur = obj
+                    for p in parts:
+                        cur = getattr(cur, p)
+                    patient_user_id = cur
+                    break
+                except Exception:
+                    continue
 
         req_user_id = getattr(request.user, "id", None)
 
@@ -221,6 +254,6 @@ class CanWritePatientData(BasePermission):
             return True
 
         if _has_role(request.user, [DOCTOR]):
-            return _doctor_has_consent(doctor_id=req_user_id, patient_id=patient_user_id)
+            return _doctor_has_consent(request, view, doctor_id=req_user_id, patient_id=patient_user_id)
 
         return False
@@ -0,0 +1,104 @@
+# core/prefetch.py
+"""
+Derives `select_related` / `prefetch_related` lookups from a read serializer, so list views load everything the
+serializer touches in a fixed number of queries.
+
+The planner follows:
+  - nested serializers (`many=True` ones and reverse/many-to-many relations become prefetches),
+  - dotted sources such as `source="patient.email"`,
+  - many-related fields (`PrimaryKeyRelatedField(many=True)`),
+  - method fields, through `Meta.prefetch_hints` on the serializer:
+
+        class Meta:
+            prefetch_hints = {
+                "role": "group",                                  # relation path the method reads
+                "doctor": ("doctor", UserReadSerializer),         # relation + serializer rendering it
+            }
+"""
+from functools import lru_cache
+from typing import FrozenSet, Optional, Set, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+
+def _relation(model, attr):
+    """
+    (related model, is multi-valued) for `attr` on `model`, or None when `attr` is not a relation.
+    """
+    try:
+        field = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation or field.related_model is None:
+        return None
+    return field.related_model, bool(field.many_to_many or field.one_to_many)
+
+
+def _walk(serializer_class, model, prefix: str, in_prefetch: bool, select: Set[str], prefetch: Set[str],
+          seen: FrozenSet) -> None:
+    if model is None or (serializer_class, prefix) in seen:
+        return
+    seen = seen | {(serializer_class, prefix)}
+
+    def follow(attrs, nested_class=None):
+        current, path, many = model, prefix, in_prefetch
+        for attr in attrs:
+            relation = _relation(current, attr)
+            if relation is None:
+                return
+            current, multi = relation
+            path = f"{path}__{attr}" if path else attr
+            many = many or multi
+            (prefetch if many else select).add(path)
+        if nested_class is not None:
+            nested_model = getattr(getattr(nested_class, "Meta", None), "model", None)
+            if nested_model is current:
+                _walk(nested_class, current, path, many, select, prefetch, seen)
+
+    hints = getattr(getattr(serializer_class, "Meta", None), "prefetch_hints", {})
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            hint = hints.get(name)
+            if isinstance(hint, str):
+                follow(hint.split("__"))
+            elif hint:
+                path, nested_class = hint
+                follow(path.split("__"), nested_class)
+            continue
+        attrs = field.source_attrs
+        if not attrs:  # source="*"
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            follow(attrs, type(field.child))
+        elif isinstance(field, serializers.BaseSerializer):
+            follow(attrs, type(field))
+        elif isinstance(field, serializers.ManyRelatedField):
+            follow(attrs)
+        elif len(attrs) > 1:
+            follow(attrs[:-1])
+
+
+@lru_cache(maxsize=None)
+def plan_related(serializer_class, model) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    (select_related lookups, prefetch_related lookups) needed to render `serializer_class` over `model` rows.
+    """
+    select: Set[str] = set()
+    prefetch: Set[str] = set()
+    _walk(serializer_class, model, "", False, select, prefetch, frozenset())
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+def apply_related_plan(queryset: QuerySet, serializer_class: Optional[type]) -> QuerySet:
+    if serializer_class is None:
+        return queryset
+    select, prefetch = plan_related(serializer_class, queryset.model)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
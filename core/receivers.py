@@ -0,0 +1,33 @@
+# core/receivers.py
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core import response_cache
+from core.permission_matrix import invalidate_matrix
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+@receiver(m2m_changed, sender=get_user_model().user_permissions.through)
+def invalidate_on_group_permissions_change(sender: Any, action: str, **kwargs: Any) -> None:
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_matrix()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_on_group_or_permission_change(sender: Any, **kwargs: Any) -> None:
+    invalidate_matrix()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender: Any, **kwargs: Any) -> None:
+    if not kwargs.get("raw") and response_cache.is_tracked(sender):
+        response_cache.invalidate_models(sender)
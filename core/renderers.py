@@ -0,0 +1,52 @@
+# core/renderers.py
+from typing import Any
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder is used without it
+    orjson = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    # datetimes go through DRF's encoder ("Z" suffix for UTC) so both paths produce the same text
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _escape_separators(payload: bytes) -> bytes:
+    # same as DRF: keep the output a strict JavaScript subset
+    if b"\xe2\x80\xa8" in payload or b"\xe2\x80\xa9" in payload:
+        payload = payload.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return payload
+
+
+def fast_dumps(value: Any) -> bytes:
+    """
+    Compact UTF-8 JSON, as DRF's JSONRenderer would write it (dates, decimals, lazy strings, UUIDs, ...),
+    encoded with orjson when it is installed. With orjson, floats are the same numbers but not always the same
+    text: exponents have no sign padding or leading zeros (`1e16`, `1e-7` for DRF's `1e+16`, `1e-07`), small
+    values are written out (`0.00001` for `1e-05`), and NaN/Infinity become `null` where DRF raises ValueError.
+    """
+    if orjson is not None:
+        try:
+            return _escape_separators(orjson.dumps(value, default=_encoder.default, option=_OPTIONS))
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; let the stdlib encoder handle (or reject) it
+    return JSONRenderer().render(value)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer using `fast_dumps`; indented output (browsable API, `; indent=` media types)
+    still goes through the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return fast_dumps(data)
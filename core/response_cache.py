@@ -0,0 +1,167 @@
+# core/response_cache.py
+"""
+Server-side response cache for the base views (`cache_responses = True`).
+
+Two tiers: a per-process TTL/LRU (core.lru) in front of a shared Django cache (RESPONSE_CACHE_ALIAS). Tag
+versions live in the shared tier, so it must really be shared: with a per-process backend (locmem, the default
+when no CACHE_URL is configured) a write in one worker would not invalidate the others' entries, and caching is
+off (`enabled()`) unless RESPONSE_CACHE_ENABLED forces it, e.g. for a single-process server.
+
+Keys combine the view, the requesting user's data scope, the path with its query parameters and the current
+version of every tag the response depends on: the view's model, the models its read serializer pulls in and
+the view's `cache_tags`. Saving or deleting an instance of any of those models bumps its tag version in the
+shared store (core.receivers), so every key built on the old version becomes unreachable in both tiers and
+stale data is never served. Writes that bypass model signals (`queryset.update()`, `bulk_create`) must call
+`invalidate_models()` themselves.
+
+A list hit skips the queryset but not `check_permissions()`; data that can go out of scope without any write (a
+doctor's expiring consents, see PatientScopedMixin) must not be cached. A detail hit still looks the object up,
+without related lookups, so `check_object_permissions()` runs on every request.
+"""
+import hashlib
+import time
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+from authentication.const import ADMIN
+from core.conditional import not_modified, set_validators
+from core.lru import TTLLRUCache
+from core.permissions import _has_role, _is_authenticated
+from core.prefetch import plan_related
+
+_TAG_PREFIX = "respcache:tag:"
+_KEY_PREFIX = "respcache:"
+
+_local = TTLLRUCache(
+    maxsize=getattr(settings, "RESPONSE_CACHE_LOCAL_SIZE", 512),
+    ttl=getattr(settings, "RESPONSE_CACHE_LOCAL_TTL", 30),
+)
+
+
+def _shared():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def enabled() -> bool:
+    """
+    RESPONSE_CACHE_ENABLED if set, else whether the shared tier is shared between processes.
+    """
+    forced = getattr(settings, "RESPONSE_CACHE_ENABLED", None)
+    if forced is not None:
+        return forced
+    return not isinstance(_shared(), (LocMemCache, DummyCache))
+
+
+def model_tag(model) -> str:
+    return model._meta.label_lower
+
+
+def _tag_versions(tags: Iterable[str]) -> Dict[str, Any]:
+    shared = _shared()
+    keys = [_TAG_PREFIX + tag for tag in sorted(tags)]
+    versions = shared.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # a fresh, never-reused version: an evicted tag must not bring back entries of an older one
+            shared.add(key, time.time_ns(), None)
+            versions[key] = shared.get(key)
+    return versions
+
+
+def _bump(tags: Iterable[str]) -> None:
+    shared = _shared()
+    for tag in tags:
+        try:
+            shared.incr(_TAG_PREFIX + tag)
+        except ValueError:
+            shared.set(_TAG_PREFIX + tag, time.time_ns(), None)
+
+
+def invalidate_tags(*tags: str) -> None:
+    # bumped now and again after commit: a request racing the transaction could otherwise cache
+    # pre-commit rows under the already-bumped version
+    _bump(tags)
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def invalidate_models(*models) -> None:
+    invalidate_tags(*(model_tag(model) for model in models))
+
+
+def clear_local() -> None:
+    _local.clear()
+
+
+def is_tracked(model) -> bool:
+    ignored = getattr(settings, "RESPONSE_CACHE_IGNORED_MODELS", ())
+    return model_tag(model) not in {label.lower() for label in ignored}
+
+
+@lru_cache(maxsize=None)
+def _tags_for(model, serializer_class, extra: Tuple[str, ...]) -> FrozenSet[str]:
+    select, prefetch = plan_related(serializer_class, model)
+    models = {model}
+    for path in select + prefetch:
+        current = model
+        for attr in path.split("__"):
+            current = current._meta.get_field(attr).related_model
+            models.add(current)
+    return frozenset({model_tag(related) for related in models} | set(extra))
+
+
+def view_tags(view) -> FrozenSet[str]:
+    return _tags_for(view.get_queryset().model, view.get_serializer_class(), tuple(view.cache_tags))
+
+
+def user_scope(user) -> str:
+    """
+    Admins all see the same data; everyone else gets entries of their own.
+    """
+    if not _is_authenticated(user):
+        return "anonymous"
+    if _has_role(user, [ADMIN]):
+        return "role:admin"
+    return f"user:{user.pk}"
+
+
+def cache_key(view, request) -> str:
+    versions = _tag_versions(view_tags(view))
+    parts = [
+        f"{type(view).__module__}.{type(view).__qualname__}",
+        user_scope(request.user),
+        request.path,
+        sorted(request.query_params.lists()),
+        sorted(versions.items()),
+    ]
+    return _KEY_PREFIX + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _local.get(key)
+    if entry is None:
+        entry = _shared().get(key)
+        if entry is not None:
+            _local.set(key, entry)
+    return entry
+
+
+def store(key: str, response: Response, validators=None) -> Response:
+    if response.status_code == 200 and isinstance(response, Response):
+        entry = {"data": response.data, "validators": validators}
+        _local.set(key, entry)
+        _shared().set(key, entry, getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300))
+    return response
+
+
+def cached_response(request, entry: Dict[str, Any]) -> Response:
+    validators = entry["validators"]
+    if not_modified(request, validators):
+        return set_validators(Response(status=304), validators)
+    return set_validators(Response(entry["data"]), validators)
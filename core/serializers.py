@@ -1,3 +1,7 @@
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 
 from core.const import ERROR_TYPE, MESSAGE, IS_SUCCESS, ERRORS, RESULT
@@ -31,3 +35,59 @@ class ResponseWithResultSerializer(ResponseSerializer):
         if errors is None:
             errors = []
         return {IS_SUCCESS: False, MESSAGE: message, ERRORS: errors, ERROR_TYPE: error_type, RESULT: None}
+
+
+def _prefetched_pk(found: Dict[Any, Any], to_python, fallback, data):
+    try:
+        return found[to_python(data)]
+    except (KeyError, TypeError, ValueError, DjangoValidationError):
+        return fallback(data)  # unknown or malformed: the field's own lookup produces the error
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    `many=True` serializer of the bulk endpoints:
+      - primary-key relations are resolved with one IN query per field instead of one query per item,
+      - `instances` (aligned with the data) validates each item as an update of its instance,
+      - `item_results` maps the position of every valid item to its validated data, also when other items
+        failed, so callers can write the valid part of a batch.
+    """
+
+    def __init__(self, *args, instances: Optional[List[Any]] = None, **kwargs):
+        self.instances = instances
+        self.item_results: Dict[int, Any] = {}
+        self._position = 0
+        super().__init__(*args, **kwargs)
+
+    def _resolve_related(self, items: List[Any]) -> None:
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field:
+                continue
+            queryset = field.get_queryset()
+            to_python = queryset.model._meta.pk.to_python
+            pks = set()
+            for item in items:
+                try:
+                    pks.add(to_python(item[name]))
+                except (KeyError, TypeError, ValueError, DjangoValidationError):
+                    continue
+            pks.discard(None)
+            found = queryset.in_bulk(pks) if pks else {}
+            field.to_internal_value = partial(_prefetched_pk, found, to_python, field.to_internal_value)
+
+    def to_internal_value(self, data):
+        self.item_results = {}
+        self._position = 0
+        if isinstance(data, list):
+            self._resolve_related(data)
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        position = self._position
+        self._position += 1
+        if self.instances is not None:
+            self.child.instance = self.instances[position]
+            self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        self.item_results[position] = validated
+        return validated
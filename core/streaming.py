@@ -0,0 +1,169 @@
+import csv
+import datetime
+import json
+import logging
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q, QuerySet
+from django.db.models.query import ModelIterable, ValuesListIterable
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.renderers import fast_dumps
+from core.serializers import ResponseWithResultSerializer
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+CSV_CONTENT_TYPE = "text/csv"
+JSON_CONTENT_TYPE = "application/json"
+
+_encoder = JSONEncoder()
+
+logger = logging.getLogger(__name__)
+
+
+class _Echo:
+    """
+    File-like object whose `write` just hands the value back, so csv.writer can be used lazily.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def dumps(value: Any) -> str:
+    # Same encoder as DRF's JSONRenderer so streamed rows match the regular API output
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_ndjson(rows: Iterable[Any]) -> Iterator[bytes]:
+    for row in rows:
+        yield fast_dumps(row) + b"\n"
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return dumps(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return _encoder.default(value)
+    return value
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def keyset_ordering(queryset: QuerySet) -> Optional[List[str]]:
+    """
+    The ordering of `queryset` as column names ("-" for descending) ending in the primary key, or None when it
+    cannot be seeked: expressions, related or nullable columns, random order.
+    """
+    opts = queryset.model._meta
+    query = queryset.query
+    ordering = list(query.order_by or (opts.ordering if query.default_ordering else ()))
+    columns = []
+    for item in ordering:
+        if not isinstance(item, str):
+            return None
+        name = item.lstrip("-")
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.null:
+            return None
+        columns.append(("-" if item.startswith("-") else "") + field.attname)
+        if field.primary_key:
+            return columns  # unique: nothing after it changes the order
+    return columns + [opts.pk.attname]
+
+
+def _seek(ordering: Sequence[str], last: Sequence[Any]) -> Q:
+    # rows after `last` in `ordering`: (a > x) OR (a = x AND b > y) OR ...
+    condition, equal = Q(), {}
+    for item, value in zip(ordering, last):
+        column = item.lstrip("-")
+        condition |= Q(**equal, **{f"{column}__{'lt' if item.startswith('-') else 'gt'}": value})
+        equal[column] = value
+    return condition
+
+
+def iter_keyset(
+    queryset: QuerySet,
+    chunk_size: int,
+    rows: Optional[Callable[[QuerySet], QuerySet]] = None,
+    key: Optional[Callable[[Any], Sequence[Any]]] = None,
+) -> Iterator[list]:
+    """
+    `queryset` in its own order, one list of at most `chunk_size` rows per query. Each query seeks past the
+    previous chunk's last row (`WHERE (ordering) > (last) ... LIMIT chunk_size`) instead of reading from an
+    open cursor, which MySQL's driver would buffer whole. An ordering that cannot be seeked (`keyset_ordering`)
+    is replaced by the primary key (list views reject such a `?ordering` before streaming). `rows(queryset)` prepares the rows to fetch (values_list, prefetches, ...).
+    The seek needs the last row's ordering values: model instances carry them, plain `values_list` rows get them
+    as extra trailing columns (trimmed again) and `key(row)` supplies them for anything else. Failing all of
+    these, each chunk takes a second query for its keys first.
+    """
+    ordering = keyset_ordering(queryset)
+    if ordering is None:
+        logger.warning("%s ordering cannot be seeked; streaming it by primary key", queryset.model.__name__)
+        ordering = [queryset.model._meta.pk.attname]
+    queryset = queryset.order_by(*ordering)
+    columns = [item.lstrip("-") for item in ordering]
+    prepared = rows(queryset) if rows is not None else queryset
+    width = None
+    if key is None:
+        if issubclass(prepared._iterable_class, ModelIterable):
+            key = attrgetter(*columns) if len(columns) > 1 else (lambda row: (getattr(row, columns[0]),))
+        elif (issubclass(prepared._iterable_class, ValuesListIterable)
+              and not prepared.query.annotation_select and not prepared.query.extra_select):
+            fields = tuple(prepared.query.values_select)
+            width = len(fields)
+            prepared = prepared.values_list(*fields, *columns)
+            key = itemgetter(slice(width, None))
+    condition = Q()
+    while True:
+        if key is not None:
+            chunk = list(prepared.filter(condition)[:chunk_size])
+            size, last = len(chunk), key(chunk[-1]) if chunk else None
+            if width is not None:
+                chunk = [row[:width] for row in chunk]
+        else:
+            keys = list(queryset.filter(condition).values_list(*columns)[:chunk_size])
+            chunk = list(prepared.filter(pk__in=[row[-1] for row in keys])) if keys else []
+            size, last = len(keys), keys[-1] if keys else None
+        if chunk:
+            yield chunk
+        if size < chunk_size:
+            return
+        condition = _seek(ordering, last)
+
+
+def iter_json_envelope(
+    items: Iterable[Any],
+    message: str = "",
+    chunk_size: int = 500,
+    trailer: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> Iterator[bytes]:
+    """
+    The `ResponseWithResultSerializer.success` envelope with `result` encoded `chunk_size` items at a time,
+    so a large list is never held as one encoded string.
+    `trailer()` is called once the items are exhausted; the keys it returns are appended after `result`.
+    """
+    head = fast_dumps(ResponseWithResultSerializer.success(result=[], message=message))
+    # `result` is the envelope's last key: the rendered text ends with `[]}`
+    yield head[:-2]
+    separator = b""
+    for chunk in iter_chunks(items, chunk_size):
+        yield separator + fast_dumps(chunk)[1:-1]
+        separator = b","
+    extra = trailer() if trailer is not None else None
+    yield b"]" + (b"," + fast_dumps(extra)[1:] if extra else b"}")
@@ -0,0 +1,14 @@
+# core/test_runner.py
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Leaves out tests tagged "benchmark" unless a run asks for tags (`manage.py test --tag=benchmark`): they time
+    the production password hasher and large payloads, which the regular suite has no use for.
+    """
+
+    def __init__(self, *args, tags=None, exclude_tags=None, **kwargs):
+        if not tags:
+            exclude_tags = {*(exclude_tags or ()), "benchmark"}
+        super().__init__(*args, tags=tags, exclude_tags=exclude_tags, **kwargs)
@@ -0,0 +1,45 @@
+# core/testing.py
+"""
+Test helpers for query budgets: every BaseLCAPIView/BaseRUDAPIView endpoint declares how many queries a request
+may cost, and the budget must hold at each data volume, so an N+1 regression fails the suite.
+"""
+from typing import Callable, Iterable, Iterator
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from core.api_views import BaseLCAPIView, BaseRUDAPIView
+
+
+def budgeted_endpoints(patterns=None, namespace: str = "") -> Iterator[str]:
+    """
+    Namespaced URL names of every BaseLCAPIView/BaseRUDAPIView route.
+    """
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            nested = f"{namespace}{pattern.namespace}:" if pattern.namespace else namespace
+            yield from budgeted_endpoints(pattern.url_patterns, nested)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            view_class = getattr(pattern.callback, "view_class", None)
+            if view_class is not None and issubclass(view_class, (BaseLCAPIView, BaseRUDAPIView)):
+                yield f"{namespace}{pattern.name}"
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin. `seed(volume)` must leave at least `volume` rows behind the endpoint;
+    `request()` performs the call and returns the response.
+    """
+    query_budget_volumes = (1, 10)
+
+    def assertQueryBudget(self, budget: int, request: Callable, seed: Callable[[int], None],
+                          volumes: Iterable[int] = None) -> None:
+        for volume in volumes or self.query_budget_volumes:
+            seed(volume)
+            with CaptureQueriesContext(connection) as queries:
+                response = request()
+            self.assertLess(response.status_code, 300, getattr(response, "data", response))
+            if len(queries) > budget:
+                statements = "\n".join(f"  {query['sql']}" for query in queries.captured_queries)
+                self.fail(f"{len(queries)} queries at volume {volume}, budget is {budget}:\n{statements}")
@@ -1,3 +1,998 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.test import TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from analyses.model_serializers.analysis_result_serializers import AnalysisResultReadSerializer
+from analyses.model_views.analysis_view import AnalysisRUDView
+from analyses.models import Analysis, AnalysisResult
+from notes.models import ClinicalNote, ClinicalNoteAttachment
+from audit.model_serializers.audit_log_serializers import AuditLogReadSerializer
+from audit.models import AuditLog
+from authentication.const import ADMIN, DOCTOR, PATIENT
+from authentication.model_serializers.user_serializers import UserReadSerializer
+from core import benchmarks, metrics, response_cache
+from core.api_permissions import CanAdd, CanChange, CanView
+from core.fast_serializers import compile_read_serializer
+from core.permission_matrix import invalidate_matrix
+from core.middleware import DuplicateQueryMiddleware, query_shape
+from core.prefetch import plan_related
+from core.renderers import FastJSONRenderer, fast_dumps, orjson
+from core.serializers import ResponseWithResultSerializer
+from core.streaming import iter_json_envelope
+from core.testing import QueryBudgetMixin, budgeted_endpoints
+from notifications.model_serializers.notification_serializers import NotificationReadSerializer
+from notifications.models import Broadcast, Notification
+from notifications.services import unread
+from profiles.model_serializers.consent_serializers import ConsentReadSerializer
+from profiles.management.commands.expire_consents import Command as ExpireConsentsCommand
+from profiles.models import DoctorProfile, PatientDoctorConsent, PatientProfile
+from reminders.model_serializers.reminder_serializers import ReminderReadSerializer
+from reminders.model_views.reminder_view import ReminderRUDView
+from reminders.models import Reminder, ReminderOccurrence
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+class PatientDataFixtureMixin:
+    """
+    Admin, doctor and two patients; the doctor holds an active consent for `patient` only.
+    """
+
+    def create_users(self):
+        cache.clear()
+        groups = {name: Group.objects.get_or_create(name=name)[0] for name in (ADMIN, DOCTOR, PATIENT)}
+        self.admin = User.objects.create_user(email="admin@example.com", password="pass", group=groups[ADMIN])
+        self.doctor = User.objects.create_user(email="doc@example.com", password="pass", group=groups[DOCTOR])
+        self.patient = User.objects.create_user(email="p1@example.com", password="pass", group=groups[PATIENT])
+        self.stranger = User.objects.create_user(email="p2@example.com", password="pass", group=groups[PATIENT])
+        self.consent = PatientDoctorConsent.objects.create(
+            patient=self.patient, doctor=self.doctor, scope=PatientDoctorConsent.Scope.ALL
+        )
+
+    def create_analysis(self, patient, order_id, results=2):
+        analysis = Analysis.objects.create(
+            patient=patient, uploaded_by=self.doctor, source=Analysis.Source.DOCTOR, title=order_id,
+            file="analyses/report.pdf", order_id=order_id,
+        )
+        AnalysisResult.objects.bulk_create([
+            AnalysisResult(analysis=analysis, test_name=f"Test {i}", value=str(i), unit="mg/dL")
+            for i in range(results)
+        ])
+        return analysis
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+
+class PatientScopedMixinTests(PatientDataFixtureMixin, TestCase):
+
+    def setUp(self):
+        self.create_users()
+        self.create_analysis(self.patient, "ORD-1")
+        self.create_analysis(self.stranger, "ORD-2")
+        for patient in (self.patient, self.stranger):
+            Reminder.objects.create(patient=patient, created_by=self.doctor, title="Check-up", due_at=timezone.now())
+
+    def _patients(self, user, url_name, field):
+        response = self.client_for(user).get(reverse(url_name), {"paginate": "false"})
+        self.assertEqual(response.status_code, 200)
+        return {row[field] for row in json.loads(b"".join(response.streaming_content))["result"]}
+
+    def test_reminders_scoped_by_role(self):
+        url = "reminders:reminder-list-create"
+        self.assertEqual(self._patients(self.admin, url, "patient"), {self.patient.id, self.stranger.id})
+        self.assertEqual(self._patients(self.doctor, url, "patient"), {self.patient.id})
+        self.assertEqual(self._patients(self.stranger, url, "patient"), {self.stranger.id})
+
+    def test_nested_patient_path(self):
+        url = "analyses:analysisresult-list-create"
+        own = set(AnalysisResult.objects.filter(analysis__patient=self.patient).values_list("analysis_id", flat=True))
+        self.assertEqual(self._patients(self.doctor, url, "analysis"), own)
+
+    def test_revoked_consent_hides_rows(self):
+        self.consent.is_active = False
+        self.consent.save()
+        self.assertEqual(self._patients(self.doctor, "reminders:reminder-list-create", "patient"), set())
+
+
+class PermissionMatrixTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        invalidate_matrix()
+        self.group = Group.objects.get_or_create(name=DOCTOR)[0]
+        self.group.permissions.add(Permission.objects.get(codename="view_reminder"))
+        self.user = User.objects.create_user(email="doc@example.com", password="pass", group=self.group)
+        self.request = mock.Mock(user=self.user)
+        self.view = mock.Mock(queryset=Reminder.objects.all())
+
+    def test_checks_answered_from_memory(self):
+        CanView().has_permission(self.request, self.view)  # compile
+        with self.assertNumQueries(0):
+            self.assertTrue(CanView().has_permission(self.request, self.view))
+            self.assertFalse(CanAdd().has_permission(self.request, self.view))
+
+    def test_group_permission_change_invalidates(self):
+        self.assertFalse(CanAdd().has_permission(self.request, self.view))
+        self.group.permissions.add(Permission.objects.get(codename="add_reminder"))
+        self.assertTrue(CanAdd().has_permission(self.request, self.view))
+        self.group.permissions.clear()
+        self.assertFalse(CanView().has_permission(self.request, self.view))
+
+    def test_user_permissions_and_extra_groups_are_honored(self):
+        self.assertFalse(CanAdd().has_permission(self.request, self.view))
+        self.user.user_permissions.add(Permission.objects.get(codename="add_reminder"))
+        self.assertTrue(CanAdd().has_permission(self.request, self.view))
+        self.user.user_permissions.clear()
+        self.assertFalse(CanAdd().has_permission(self.request, self.view))
+
+        editors = Group.objects.create(name="Reminder editors")
+        editors.permissions.add(Permission.objects.get(codename="change_reminder"))
+        self.assertFalse(CanChange().has_permission(self.request, self.view))
+        self.user.groups.add(editors)
+        self.assertTrue(CanChange().has_permission(self.request, self.view))
+
+    def test_superuser_and_inactive(self):
+        self.user.is_superuser = True
+        self.assertTrue(CanAdd().has_permission(self.request, self.view))
+        self.user.is_active = False
+        self.assertFalse(CanView().has_permission(self.request, self.view))
+
+
+class PrefetchPlannerTests(PatientDataFixtureMixin, TestCase):
+
+    def setUp(self):
+        self.create_users()
+        DoctorProfile.objects.create(user=self.doctor, specialization="Cardiology")
+        PatientProfile.objects.create(user=self.patient)
+
+    def test_plan_follows_method_field_hints(self):
+        select, prefetch = plan_related(ConsentReadSerializer, PatientDoctorConsent)
+        self.assertEqual(set(select), {
+            f"{user}{suffix}" for user in ("doctor", "patient")
+            for suffix in ("", "__group", "__doctor_profile", "__patient_profile")
+        })
+        self.assertEqual(prefetch, ())
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client_for(self.admin).get(reverse("profiles:consent-list-create"), {"page_size": 50})
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data["result"]
+
+    def test_consent_list_runs_constant_queries(self):
+        baseline, rows = self._list_queries()
+        self.assertEqual(rows[0]["doctor"]["doctor_profile"]["specialization"], "Cardiology")
+        for i in range(5):
+            patient = User.objects.create_user(email=f"extra{i}@example.com", password="pass", group=self.patient.group)
+            PatientProfile.objects.create(user=patient)
+            PatientDoctorConsent.objects.create(patient=patient, doctor=self.doctor)
+        queries, rows = self._list_queries()
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(queries, baseline)
+
+
+# url name -> (queries allowed per GET as admin, model whose first row a detail route reads)
+QUERY_BUDGETS = {
+    "analyses:analysis-list-create": (3, None),
+    "analyses:analysis-rud": (2, Analysis),
+    "analyses:analysisresult-list-create": (2, None),
+    "analyses:analysisresult-rud": (1, AnalysisResult),
+    "authentication:user-list-create": (2, None),
+    "authentication:user-rud": (1, User),
+    "notes:clinicalnote-list-create": (3, None),
+    "notes:clinicalnote-rud": (2, ClinicalNote),
+    "notes:clinicalnoteattachment-list-create": (2, None),
+    "notes:clinicalnoteattachment-rud": (1, ClinicalNoteAttachment),
+    "notifications:notification-list-create": (2, None),
+    "notifications:notification-rud": (1, Notification),
+    "notifications:broadcast-list-create": (2, None),
+    "profiles:patientprofile-list-create": (2, None),
+    "profiles:patientprofile-rud": (1, PatientProfile),
+    "profiles:doctorprofile-list-create": (2, None),
+    "profiles:doctorprofile-rud": (1, DoctorProfile),
+    "profiles:consent-list-create": (2, None),
+    "profiles:consent-rud": (1, PatientDoctorConsent),
+    "reminders:reminder-list-create": (2, None),
+    "reminders:reminder-rud": (1, Reminder),
+}
+
+
+class QueryBudgetTests(PatientDataFixtureMixin, QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        self.create_users()
+        self.seeded = 0
+
+    def seed(self, volume):
+        """
+        Top up to `volume` patients, each with a profile, a consent for the doctor and one row of every kind.
+        """
+        doctor_group = self.doctor.group
+        for i in range(self.seeded, volume):
+            patient = User.objects.create_user(email=f"seed{i}@example.com", password="pass", group=self.patient.group)
+            doctor = User.objects.create_user(email=f"seed-doc{i}@example.com", password="pass", group=doctor_group)
+            PatientProfile.objects.create(user=patient, insurance_provider="Acme")
+            DoctorProfile.objects.create(user=doctor, specialization="Cardiology", license_number=f"LIC-{i}")
+            PatientDoctorConsent.objects.create(patient=patient, doctor=self.doctor)
+            self.create_analysis(patient, f"SEED-{i}")
+            note = ClinicalNote.objects.create(patient=patient, doctor=doctor, title="Visit", body="Fine")
+            ClinicalNoteAttachment.objects.create(note=note, file="notes/scan.pdf")
+            Reminder.objects.create(patient=patient, created_by=doctor, title="Check-up", due_at=timezone.now())
+            Notification.objects.create(user=patient, kind=Notification.Kind.SYSTEM,
+                                        channel=Notification.Channel.EMAIL, subject="Hello")
+            Broadcast.objects.create(created_by=self.admin, role=PATIENT, subject="Outage")
+        self.seeded = max(self.seeded, volume)
+
+    def test_every_endpoint_declares_a_budget(self):
+        self.assertEqual(set(budgeted_endpoints()), set(QUERY_BUDGETS))
+
+    def test_endpoints_stay_within_budget(self):
+        client = self.client_for(self.admin)
+        for name, (budget, model) in QUERY_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                if model is None:
+                    url = reverse(name)
+                    params = {"page_size": 50}
+                else:
+                    self.seed(1)
+                    url = reverse(name, kwargs={"pk": model.objects.order_by("id").values_list("id", flat=True)[0]})
+                    params = {}
+                self.assertQueryBudget(budget, lambda: client.get(url, params), self.seed)
+
+
+class DuplicateQueryMiddlewareTests(TestCase):
+
+    def test_query_shape_collapses_in_lists(self):
+        self.assertEqual(query_shape('SELECT * FROM "t"\n WHERE "id" IN (%s, %s,%s)'),
+                         'SELECT * FROM "t" WHERE "id" IN (%s, ...)')
+
+    @override_settings(DEBUG=True, DUPLICATE_QUERY_DETECTION=True, DUPLICATE_QUERY_THRESHOLD=3)
+    def test_logs_repeated_query_with_call_site(self):
+        def n_plus_one(request):
+            for pk in range(3):
+                User.objects.filter(pk=pk).first()
+            Group.objects.count()
+            return HttpResponse()
+
+        request = HttpRequest()
+        request.method, request.path = "GET", "/api/things/"
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            DuplicateQueryMiddleware(n_plus_one)(request)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("x3 on GET /api/things/", logs.output[0])
+        self.assertIn("core/tests.py", logs.output[0])
+        self.assertIn("in n_plus_one x3", logs.output[0])
+
+    @override_settings(DEBUG=False, DUPLICATE_QUERY_DETECTION=True)
+    def test_disabled_outside_debug(self):
+        self.assertFalse(DuplicateQueryMiddleware(lambda request: HttpResponse()).enabled)
+
+
+class PartialIndexTests(TestCase):
+
+    def index_sql(self):
+        index = next(index for index in Notification._meta.indexes if index.name == "notification_outbox_idx")
+        return str(index.create_sql(Notification, connection.schema_editor()))  # only renders the statement
+
+    def test_backends_without_partial_indexes_get_the_fallback_columns(self):
+        self.assertIn("WHERE", self.index_sql())
+        with mock.patch.object(type(connection.features), "supports_partial_indexes", False):
+            sql = self.index_sql()
+        self.assertNotIn("WHERE", sql)
+        self.assertIn('("sent_at", "failed_at", "next_attempt_at")', sql)
+
+
+class FastReadSerializerFixtureMixin(PatientDataFixtureMixin):
+    SERIALIZERS = [
+        (AnalysisResultReadSerializer, AnalysisResult.objects.select_related("analysis")),
+        (ReminderReadSerializer, Reminder.objects.select_related("patient", "created_by")),
+        (NotificationReadSerializer, Notification.objects.select_related("user")),
+        (AuditLogReadSerializer, AuditLog.objects.select_related("actor")),
+    ]
+
+    def create_rows(self, count):
+        self.create_users()
+        now = timezone.now()
+        for i in range(count):
+            self.create_analysis(self.patient, f"ORD-{i}", results=1)
+        Reminder.objects.bulk_create([
+            Reminder(patient=self.patient, created_by=self.doctor if i % 2 else None, title=f"Check-up {i}",
+                     due_at=now, last_sent_at=now if i % 3 else None)
+            for i in range(count)
+        ])
+        Notification.objects.bulk_create([
+            Notification(user=self.patient, kind=Notification.Kind.SYSTEM, channel=Notification.Channel.EMAIL,
+                         subject=f"Hello {i}", payload={"n": i, "tags": ["a", "é"]})
+            for i in range(count)
+        ])
+        AuditLog.objects.bulk_create([
+            AuditLog(actor=self.doctor if i % 2 else None, action=AuditLog.Action.READ, target_type="User",
+                     target_id=str(i), ip_address="127.0.0.1" if i % 3 else None, metadata={"count": i})
+            for i in range(count)
+        ])
+
+
+class FastReadSerializerTests(FastReadSerializerFixtureMixin, TestCase):
+
+    def setUp(self):
+        self.create_rows(6)
+
+    def test_output_is_byte_identical_to_drf(self):
+        renderer = JSONRenderer()
+        for serializer_class, queryset in self.SERIALIZERS:
+            queryset = queryset.order_by("id")
+            expected = renderer.render(serializer_class(queryset, many=True).data)
+            compiled = renderer.render(compile_read_serializer(serializer_class).serialize_queryset(queryset))
+            self.assertEqual(compiled, expected, serializer_class.__name__)
+
+    def test_null_relation_on_dotted_source_omits_key(self):
+        row = compile_read_serializer(ReminderReadSerializer).serialize_queryset(
+            Reminder.objects.filter(created_by__isnull=True)[:1]
+        )[0]
+        self.assertIsNone(row["created_by"])
+        self.assertNotIn("created_by_email", row)
+
+    def test_uncompilable_serializer_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            compile_read_serializer(UserReadSerializer)
+
+    def test_list_endpoint_uses_compiled_path(self):
+        client = self.client_for(self.admin)
+        url = reverse("reminders:reminder-list-create")
+        with mock.patch.object(ReminderReadSerializer, "to_representation") as drf:
+            response = client.get(url, {"page_size": 4})
+        drf.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["result"]), 4)
+        self.assertEqual(response.data["pagination"]["count"], 6)
+
+
+@tag("benchmark")
+class FastReadSerializerBenchmark(FastReadSerializerFixtureMixin, TestCase):
+    """
+    Rows/second of the DRF read serializers vs their compiled form. Run with `manage.py test --tag=benchmark`.
+    """
+    ROWS = 2000
+
+    def setUp(self):
+        self.create_rows(self.ROWS)
+
+    def _rate(self, serialize):
+        started = time.perf_counter()
+        rows = len(serialize())
+        return rows / (time.perf_counter() - started)
+
+    def test_rows_per_second(self):
+        for serializer_class, queryset in self.SERIALIZERS:
+            queryset = queryset.order_by("id")
+            compiled = compile_read_serializer(serializer_class)
+            drf = self._rate(lambda: serializer_class(queryset.all(), many=True).data)
+            fast = self._rate(lambda: compiled.serialize_queryset(queryset.all()))
+            logger.info("%s: drf %.0f rows/s, compiled %.0f rows/s (%.1fx)", serializer_class.__name__, drf, fast,
+                        fast / drf)
+            self.assertGreater(fast, drf)
+
+
+class FastJSONRendererTests(PatientDataFixtureMixin, TestCase):
+    PAYLOAD = ResponseWithResultSerializer.success(result=[{
+        "at": datetime.datetime(2025, 3, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+        "local": datetime.datetime(2025, 3, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+        "day": datetime.date(2025, 3, 1),
+        "amount": Decimal("12.50"),
+        "label": gettext_lazy("Reminder"),
+        "token": uuid.UUID(int=7),
+        "pair": (1, 2.5),
+        "counts": {1: "one"},
+        "text": "Zürich \u2028 line",
+        "empty": None,
+    }])
+
+    def test_matches_drf_json_renderer(self):
+        expected = JSONRenderer().render(self.PAYLOAD)
+        self.assertEqual(FastJSONRenderer().render(self.PAYLOAD), expected)
+        with mock.patch("core.renderers.orjson", None):
+            self.assertEqual(FastJSONRenderer().render(self.PAYLOAD), expected)
+
+    @skipIf(orjson is None, "orjson is not installed")
+    def test_float_formatting_differs_from_drf(self):
+        # same numbers, different text: orjson's shortest form against repr()
+        for value, fast, drf in ((1e16, b"1e16", b"1e+16"), (1e-7, b"1e-7", b"1e-07"), (1e-5, b"0.00001", b"1e-05")):
+            self.assertEqual(fast_dumps(value), fast)
+            self.assertEqual(JSONRenderer().render(value), drf)
+            self.assertEqual(json.loads(fast), json.loads(drf))
+        self.assertEqual(fast_dumps(0.1), JSONRenderer().render(0.1))
+
+    @skipIf(orjson is None, "orjson is not installed")
+    def test_non_finite_floats_become_null(self):
+        for value in (float("nan"), float("inf")):
+            self.assertEqual(fast_dumps({"value": value}), b'{"value":null}')
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({"value": value})
+
+    def test_indented_output_uses_stdlib_encoder(self):
+        self.assertEqual(FastJSONRenderer().render(self.PAYLOAD, "application/json; indent=2"),
+                         JSONRenderer().render(self.PAYLOAD, "application/json; indent=2"))
+
+    def test_streamed_envelope_matches_rendered_envelope(self):
+        for count in (0, 1, 7):
+            items = [{"id": i, "at": timezone.now()} for i in range(count)]
+            streamed = b"".join(iter_json_envelope(items, chunk_size=3))
+            self.assertEqual(streamed, JSONRenderer().render(ResponseWithResultSerializer.success(result=items)))
+
+
+class ListStreamingTests(PatientDataFixtureMixin, TestCase):
+
+    def setUp(self):
+        self.create_users()
+        Reminder.objects.bulk_create([
+            Reminder(patient=self.patient, created_by=self.doctor, title=f"R{i}", due_at=timezone.now())
+            for i in range(5)
+        ])
+        self.url = reverse("reminders:reminder-list-create")
+
+    def _stream(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client_for(self.admin).get(self.url, {"paginate": "false", **params})
+            body = b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return response, body, queries
+
+    def test_unpaginated_list_streams_envelope_and_audits_count(self):
+        response, body, queries = self._stream()
+        self.assertEqual(response["Content-Type"], "application/json")
+        payload = json.loads(body)
+        self.assertTrue(payload["is_success"])
+        self.assertEqual(len(payload["result"]), 5)
+        self.assertNotIn("truncated", payload)
+        # no COUNT/MAX over the scope: streamed lists carry no validators
+        self.assertFalse([query for query in queries.captured_queries if "COUNT(" in query["sql"]])
+        self.assertNotIn("ETag", response)
+        audit = AuditLog.objects.get(target_type="reminders.reminder")
+        self.assertEqual(audit.metadata, {"count": 5, "streamed": True})
+
+    def test_ndjson(self):
+        response, body, _ = self._stream(stream_format="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["title"] for row in rows], [f"R{i}" for i in range(5)])
+
+    @override_settings(LIST_STREAM_MAX_ROWS=3, LIST_STREAM_CHUNK_SIZE=2)
+    def test_row_limit_truncates(self):
+        payload = json.loads(self._stream()[1])
+        self.assertEqual(len(payload["result"]), 3)
+        self.assertEqual(payload["truncated"], "row_limit")
+        lines = self._stream(stream_format="ndjson")[1].splitlines()
+        self.assertEqual(json.loads(lines[-1]), {"truncated": "row_limit"})
+        self.assertEqual(AuditLog.objects.filter(metadata__truncated="row_limit").count(), 2)
+
+    @override_settings(LIST_STREAM_CHUNK_SIZE=2)
+    def test_chunks_are_seeked_in_list_order(self):
+        logs = [AuditLog.objects.create(action=AuditLog.Action.READ, target_type="t", target_id=str(i)) for i in range(5)]
+        # ties on the ordering column are broken by id across chunk boundaries
+        AuditLog.objects.filter(pk__in=[logs[1].pk, logs[2].pk, logs[3].pk]).update(date_created=logs[1].date_created)
+        expected = list(AuditLog.objects.order_by("-date_created", "pk").values_list("pk", flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client_for(self.admin).get(reverse("audit:auditlog-list"), {"paginate": "false"})
+            rows = json.loads(b"".join(response.streaming_content))["result"]
+        self.assertEqual([row["id"] for row in rows], expected)
+        self.assertFalse([query for query in queries.captured_queries if "OFFSET" in query["sql"]])
+
+    def test_unseekable_ordering_is_rejected(self):
+        Reminder.objects.filter(title="R3").update(last_sent_at=timezone.now())
+        response = self.client_for(self.admin).get(self.url, {"paginate": "false", "ordering": "-last_sent_at"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data["is_success"])
+        # the same ordering pages fine, and a seekable one streams in the order asked for
+        self.assertEqual(self.client_for(self.admin).get(self.url, {"ordering": "-last_sent_at"}).status_code, 200)
+        rows = json.loads(self._stream(ordering="-title")[1])["result"]
+        self.assertEqual([row["title"] for row in rows], [f"R{i}" for i in reversed(range(5))])
+
+    @override_settings(LIST_STREAM_MAX_ROWS=5)
+    def test_stream_ending_exactly_at_the_limit_is_complete(self):
+        self.assertNotIn("truncated", json.loads(self._stream()[1]))
+
+    @override_settings(LIST_STREAM_MAX_SECONDS=0, LIST_STREAM_CHUNK_SIZE=2)
+    def test_time_limit_truncates(self):
+        payload = json.loads(self._stream()[1])
+        self.assertEqual(len(payload["result"]), 2)
+        self.assertEqual(payload["truncated"], "time_limit")
+
+
+class ConditionalRequestTests(PatientDataFixtureMixin, TestCase):
+
+    def setUp(self):
+        self.create_users()
+        self.reminder = Reminder.objects.create(patient=self.patient, created_by=self.doctor, title="Check-up",
+                                                due_at=timezone.now())
+        self.client = self.client_for(self.admin)
+        self.list_url = reverse("reminders:reminder-list-create")
+        self.detail_url = reverse("reminders:reminder-rud", kwargs={"pk": self.reminder.pk})
+
+    def test_list_not_modified_skips_serialization(self):
+        first = self.client.get(self.list_url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first["ETag"].startswith('W/"'))
+        self.assertNotIn("Last-Modified", first)
+
+        with mock.patch("core.api_views.BaseListAPIView.serialize_list") as serialize:
+            second = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        serialize.assert_not_called()
+
+        Reminder.objects.create(patient=self.patient, title="Another", due_at=timezone.now())
+        third = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third["ETag"], first["ETag"])
+
+    def test_list_deletion_changes_etag_and_if_modified_since_is_ignored(self):
+        other = Reminder.objects.create(patient=self.patient, title="Another", due_at=timezone.now())
+        first = self.client.get(self.list_url)
+        other.delete()
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+        since = http_date(time.time() + 60)
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+    def test_nested_rows_are_part_of_the_version(self):
+        analysis = self.create_analysis(self.patient, "ORD-1", results=0)
+        result = AnalysisResult.objects.create(analysis=analysis, test_name="Glucose", value="98", unit="mg/dL")
+        detail_url = reverse("analyses:analysis-rud", kwargs={"pk": analysis.pk})
+        list_url = reverse("analyses:analysis-list-create")
+        detail, listed = self.client.get(detail_url), self.client.get(list_url)
+        self.assertNotIn("Last-Modified", detail)
+
+        result.value = "99"
+        result.save()
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"]).status_code, 200)
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=listed["ETag"]).status_code, 200)
+
+        AnalysisResult.objects.create(analysis=analysis, test_name="HbA1c", value="5.4", unit="%")
+        detail, listed = self.client.get(detail_url), self.client.get(list_url)
+        result.delete()  # not the latest result: only the count tells
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"]).status_code, 200)
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=listed["ETag"]).status_code, 200)
+
+        current = self.client.get(detail_url)["ETag"]
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=current).status_code, 304)
+        updated = self.client.patch(detail_url, {"title": "Fasting"}, format="json", HTTP_IF_MATCH=current)
+        self.assertEqual(updated.status_code, 200)
+
+    def test_if_match_reads_the_object_for_update(self):
+        view = ReminderRUDView()
+        view.request = view.initialize_request(APIRequestFactory().patch(self.detail_url, HTTP_IF_MATCH='"x"'))
+        self.assertTrue(view.get_queryset().query.select_for_update)
+        view.request = view.initialize_request(APIRequestFactory().patch(self.detail_url))
+        self.assertFalse(view.get_queryset().query.select_for_update)
+
+    def test_list_etag_depends_on_query(self):
+        self.assertNotEqual(self.client.get(self.list_url)["ETag"],
+                            self.client.get(self.list_url, {"page_size": 5})["ETag"])
+
+    def test_detail_not_modified(self):
+        first = self.client.get(self.detail_url)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        self.assertNotIn("Last-Modified", first)  # renders the patient and creator rows too
+
+        result = self.create_analysis(self.patient, "ORD-1", results=1).results.get()
+        flat_url = reverse("analyses:analysisresult-rud", kwargs={"pk": result.pk})
+        first = self.client.get(flat_url)
+        self.assertEqual(self.client.get(flat_url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 304)
+
+    def test_if_match_guards_updates(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        Reminder.objects.filter(pk=self.reminder.pk).update(date_last_updated=timezone.now() + datetime.timedelta(seconds=1))
+
+        stale = self.client.patch(self.detail_url, {"title": "Mine"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(stale.status_code, 412)
+        self.assertEqual(stale.data["type"], "PreconditionFailed")
+        self.assertEqual(self.client.delete(self.detail_url, HTTP_IF_MATCH=etag).status_code, 412)
+
+        current = self.client.get(self.detail_url)["ETag"]
+        updated = self.client.patch(self.detail_url, {"title": "Mine"}, format="json", HTTP_IF_MATCH=current)
+        self.assertEqual(updated.status_code, 200)
+        self.assertNotEqual(updated["ETag"], current)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=updated["ETag"]).status_code, 304)
+
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(PatientDataFixtureMixin, TestCase):
+
+    def setUp(self):
+        response_cache.clear_local()
+        self.create_users()
+        self.analysis = self.create_analysis(self.patient, "ORD-1")
+        self.create_analysis(self.stranger, "ORD-2")
+        self.url = reverse("analyses:analysis-list-create")
+
+    def results(self, response):
+        return response.data["result"]
+
+    def test_hit_runs_no_queries(self):
+        client = self.client_for(self.admin)
+        first = client.get(self.url)
+        with self.assertNumQueries(0):
+            second = client.get(self.url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=None)
+    def test_per_process_backend_disables_caching(self):
+        client = self.client_for(self.admin)
+        client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get(self.url).status_code, 200)
+        self.assertGreater(len(queries), 0)
+        self.assertFalse(response_cache.enabled())
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                                                   "LOCATION": "redis://127.0.0.1:6379/1"}}):
+            self.assertTrue(response_cache.enabled())  # only inspects the backend, connects to nothing
+
+    def test_detail_hit_still_checks_object_permissions(self):
+        url = reverse("analyses:analysis-rud", kwargs={"pk": self.analysis.pk})
+        doctor = self.client_for(self.doctor)
+        with mock.patch.object(AnalysisRUDView, "cache_responses", True):
+            self.assertEqual(doctor.get(url).status_code, 200)
+            with self.assertNumQueries(1):  # the object only: no related lookups, no serialization
+                self.assertEqual(doctor.get(url).status_code, 200)
+
+            PatientDoctorConsent.objects.filter(pk=self.consent.pk).update(expires_at=timezone.now())
+            cache.clear()  # drops the doctor's cached consent set
+            # an entry cached while the consent was live
+            with mock.patch.object(response_cache, "get", return_value={"data": {"leak": True}, "validators": None}):
+                denied = doctor.get(url)
+        self.assertNotEqual(denied.status_code, 200)
+        self.assertNotIn("leak", json.dumps(denied.data))
+
+    def test_writes_to_related_models_invalidate(self):
+        client = self.client_for(self.admin)
+        client.get(self.url)
+
+        AnalysisResult.objects.create(analysis=self.analysis, test_name="Glucose", value="98", unit="mg/dL")
+        analysis = next(row for row in self.results(client.get(self.url)) if row["id"] == self.analysis.pk)
+        self.assertIn("Glucose", [result["test_name"] for result in analysis["results"]])
+
+        self.patient.email = "renamed@example.com"
+        self.patient.save()
+        self.assertIn("renamed@example.com", [row["patient_email"] for row in self.results(client.get(self.url))])
+
+        self.analysis.delete()
+        self.assertNotIn(self.analysis.pk, [row["id"] for row in self.results(client.get(self.url))])
+
+    def test_bulk_writes_invalidate_explicitly(self):
+        client = self.client_for(self.admin)
+        url = reverse("profiles:consent-list-create")
+        self.assertTrue(self.results(client.get(url))[0]["is_active"])
+
+        PatientDoctorConsent.objects.filter(pk=self.consent.pk).update(expires_at=timezone.now())
+        ExpireConsentsCommand.sweep(batch_size=10)
+        self.assertFalse(self.results(client.get(url))[0]["is_active"])
+
+    def test_entries_are_per_user_and_query(self):
+        patient = self.client_for(self.patient)
+        stranger = self.client_for(self.stranger)
+        self.assertEqual([row["order_id"] for row in self.results(patient.get(self.url))], ["ORD-1"])
+        self.assertEqual([row["order_id"] for row in self.results(stranger.get(self.url))], ["ORD-2"])
+
+        admin = self.client_for(self.admin)
+        self.assertEqual(len(self.results(admin.get(self.url))), 2)
+        self.assertEqual(len(self.results(admin.get(self.url, {"page_size": 1}))), 1)
+
+    def test_doctors_and_streamed_lists_bypass_the_cache(self):
+        doctor = self.client_for(self.doctor)
+        doctor.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            doctor.get(self.url)
+        self.assertGreater(len(queries), 0)
+
+        admin = self.client_for(self.admin)
+        admin.get(self.url, {"paginate": "false"})
+        with CaptureQueriesContext(connection) as queries:
+            b"".join(admin.get(self.url, {"paginate": "false"}).streaming_content)
+        self.assertGreater(len(queries), 0)
+
+
+class BulkEndpointTests(PatientDataFixtureMixin, TestCase):
+
+    def setUp(self):
+        self.create_users()
+        self.client = self.client_for(self.doctor)
+        self.url = reverse("reminders:reminder-bulk")
+
+    def reminders(self, patient, count):
+        due_at = timezone.now().isoformat()
+        return [{"patient": patient.pk, "created_by": self.doctor.pk, "title": f"Check-up {i}", "due_at": due_at}
+                for i in range(count)]
+
+    def test_create_is_one_batch(self):
+        self.client.post(self.url, self.reminders(self.patient, 1), format="json")  # loads the consent cache
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, self.reminders(self.patient, 2), format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, self.reminders(self.patient, 30), format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data["result"]["items"]), 30)
+        self.assertEqual(Reminder.objects.filter(patient=self.patient).count(), 33)
+        self.assertEqual(len(large), len(small))
+
+        audit = AuditLog.objects.filter(target_type="reminders.reminder", action="CREATE")
+        self.assertEqual(audit.count(), 3)
+        self.assertEqual(audit.first().metadata["count"], 30)
+
+    def test_invalid_items_reject_the_batch_unless_partial(self):
+        items = self.reminders(self.patient, 3)
+        del items[1]["title"]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("[1] title: This field is required.", response.data["errors"])
+        self.assertFalse(Reminder.objects.exists())
+
+        response = self.client.post(f"{self.url}?partial=true", items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["result"]["items"]), 2)
+        self.assertEqual([failure["index"] for failure in response.data["result"]["failed"]], [1])
+
+    def test_access_is_checked_per_patient(self):
+        items = self.reminders(self.patient, 2) + self.reminders(self.stranger, 1)
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Reminder.objects.exists())
+
+        response = self.client.post(f"{self.url}?partial=true", items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([failure["index"] for failure in response.data["result"]["failed"]], [2])
+        self.assertEqual(set(Reminder.objects.values_list("patient", flat=True)), {self.patient.pk})
+
+    def test_update(self):
+        analysis = self.create_analysis(self.patient, "ORD-1", results=3)
+        foreign = self.create_analysis(self.stranger, "ORD-2", results=1).results.get()
+        results = list(analysis.results.order_by("pk"))
+        url = reverse("analyses:analysisresult-bulk")
+        items = [{"id": result.pk, "value": "42"} for result in results]
+
+        response = self.client.patch(url, items + [{"id": 0, "value": "1"}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("[3] id: Not found.", response.data["errors"])
+
+        response = self.client.patch(url, items + [{"id": foreign.pk, "value": "1"}], format="json")
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.patch(url, items, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(set(AnalysisResult.objects.filter(analysis=analysis).values_list("value", flat=True)), {"42"})
+        self.assertEqual(AnalysisResult.objects.get(pk=foreign.pk).value, "0")
+        updated = AnalysisResult.objects.get(pk=results[0].pk)
+        self.assertGreater(updated.date_last_updated, results[0].date_last_updated)
+
+    def test_non_admins_cannot_bulk_create_notifications(self):
+        url = reverse("notifications:notification-bulk")
+        items = [{"user": self.patient.pk, "kind": "SYSTEM", "channel": "EMAIL", "subject": "Hi"}] * 3
+        self.assertEqual(self.client.post(url, items, format="json").status_code, 403)
+        response = self.client_for(self.admin).post(url, items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Notification.objects.filter(user=self.patient).count(), 3)
+
+    def test_create_returns_ids_without_bulk_returning(self):
+        url = reverse("notifications:notification-bulk")
+        items = [{"user": self.patient.pk, "kind": "SYSTEM", "channel": "EMAIL", "subject": "Hi"}] * 3
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False):
+            response = self.client_for(self.admin).post(url, items, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        ids = [item["id"] for item in response.data["result"]["items"]]
+        self.assertEqual(sorted(ids), sorted(Notification.objects.filter(user=self.patient).values_list("pk", flat=True)))
+        self.assertEqual(unread.unread_count(self.patient.pk), 3)  # post_save counted them, the hook did not
+        event = AuditLog.objects.get(target_type="notifications.notification", action="CREATE")
+        self.assertEqual(sorted(event.metadata["ids"]), sorted(ids))
+
+
+class RequestMetricsTests(PatientDataFixtureMixin, TestCase):
+
+    def setUp(self):
+        self.create_users()
+        metrics.reset()
+        self.url = reverse("reminders:reminder-list-create")
+        self.labels = 'view="reminders:reminder-list-create",method="GET"'
+
+    def test_request_is_recorded(self):
+        Reminder.objects.create(patient=self.patient, created_by=self.doctor, title="Check-up", due_at=timezone.now())
+        client = self.client_for(self.admin)
+        response = client.get(self.url)
+        client.post(self.url, {"patient": self.patient.pk, "title": "Follow-up", "due_at": timezone.now().isoformat()},
+                    format="json")
+        series = metrics.snapshot()
+
+        duration = series["hv_request_duration_seconds|reminders:reminder-list-create|GET"]
+        self.assertEqual(sum(duration[:-1]), 1)
+        self.assertGreater(duration[-1], 0)
+        self.assertGreaterEqual(series["hv_request_db_queries|reminders:reminder-list-create|GET"][-1], 2)
+        self.assertGreater(series["hv_request_serializer_duration_seconds|reminders:reminder-list-create|GET"][-1], 0)
+        self.assertGreater(series["hv_request_audit_duration_seconds|reminders:reminder-list-create|POST"][-1], 0)
+        self.assertEqual(series["hv_response_size_bytes|reminders:reminder-list-create|GET"][-1],
+                         len(response.content))
+
+    def test_endpoint_is_admin_only(self):
+        url = reverse("core:metrics")
+        self.client_for(self.patient).get(self.url)
+        self.assertEqual(self.client_for(self.patient).get(url).status_code, 403)
+
+        response = self.client_for(self.admin).get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = response.content.decode()
+        self.assertIn("# TYPE hv_request_duration_seconds histogram", text)
+        self.assertIn(f'hv_request_duration_seconds_bucket{{{self.labels},le="+Inf"}} 1', text)
+        self.assertIn(f"hv_request_duration_seconds_count{{{self.labels}}} 1", text)
+
+    def test_processes_are_summed_through_the_shared_directory(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            self.client_for(self.patient).get(self.url)
+            metrics.flush()
+            other = {key: [value * 2 for value in series] for key, series in metrics.snapshot().items()}
+            with open(os.path.join(directory, "metrics-1.json"), "w") as handle:
+                json.dump(other, handle)
+
+            text = self.client_for(self.admin).get(reverse("core:metrics")).content.decode()
+        self.assertIn(f"hv_request_duration_seconds_count{{{self.labels}}} 3", text)
+
+    def test_snapshots_of_dead_processes_expire(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            self.client_for(self.patient).get(self.url)
+            metrics.flush()
+            own = os.path.basename(metrics._own_file(directory))
+            self.assertRegex(own, rf"^metrics-{os.getpid()}-\d+\.json$")
+            dead = os.path.join(directory, f"metrics-{os.getpid()}-1.json")  # same PID, earlier process
+            with open(dead, "w") as handle:
+                json.dump(metrics.snapshot(), handle)
+            stale = time.time() - metrics.STALE_FLUSH_INTERVALS * 10 - 1
+            os.utime(dead, (stale, stale))
+
+            text = self.client_for(self.admin).get(reverse("core:metrics")).content.decode()
+            self.assertFalse(os.path.exists(dead))
+            self.assertTrue(os.path.exists(os.path.join(directory, own)))
+        self.assertIn(f"hv_request_duration_seconds_count{{{self.labels}}} 1", text)
+
+
+class SeedScaleCommandTests(TestCase):
+
+    def seed(self, prefix):
+        call_command("seed_scale", patients=6, doctors=3, admins=1, analyses_per_patient=2, results_per_analysis=4,
+                     notes_per_patient=1, reminders_per_patient=2, notifications_per_patient=2, audit_logs_per_user=3,
+                     batch_size=4, seed=7, prefix=prefix, password="secret", stdout=io.StringIO())
+
+    def test_volumes_and_determinism(self):
+        self.seed("one")
+        self.assertEqual(User.objects.filter(group__name=PATIENT).count(), 6)
+        self.assertEqual(DoctorProfile.objects.count(), 3)
+        self.assertEqual(PatientProfile.objects.count(), 6)
+        self.assertEqual(PatientDoctorConsent.objects.count(), 12)
+        self.assertEqual(Analysis.objects.count(), 12)
+        self.assertEqual(AnalysisResult.objects.count(), 48)
+        self.assertEqual(ClinicalNoteAttachment.objects.count(), 6)
+        self.assertEqual(Reminder.objects.count(), 12)
+        self.assertEqual(Notification.objects.count(), 12)
+        self.assertEqual(AuditLog.objects.count(), 27)
+        self.assertTrue(User.objects.get(email="one-patient-0@example.test").check_password("secret"))
+
+        def values(prefix):
+            return list(AnalysisResult.objects.filter(analysis__order_id__startswith=f"{prefix}-")
+                        .order_by("pk").values_list("test_name", "value"))
+
+        self.seed("two")
+        self.assertEqual(values("one"), values("two"))
+
+    def test_ids_are_read_back_without_bulk_returning(self):
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False):
+            self.seed("one")
+        self.assertEqual(DoctorProfile.objects.filter(user__group__name=DOCTOR).count(), 3)
+        self.assertEqual(PatientProfile.objects.filter(user__group__name=PATIENT).count(), 6)
+        self.assertEqual(AnalysisResult.objects.values("analysis").distinct().count(), 12)
+        self.assertEqual(ClinicalNoteAttachment.objects.values("note").distinct().count(), 6)
+        reminders = set(ReminderOccurrence.objects.values_list("reminder", flat=True))
+        self.assertTrue(reminders)
+        self.assertLessEqual(reminders, set(Reminder.objects.values_list("pk", flat=True)))
+
+
+class EndpointBenchmarkTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command("seed_scale", patients=4, doctors=2, admins=1, audit_logs_per_user=1, password="secret",
+                     stdout=io.StringIO())
+        self.cases = benchmarks.endpoint_cases(benchmarks.role_users(), login_password="secret")
+
+    def test_cases_cover_routes_and_roles(self):
+        names = {case.name for case in self.cases}
+        for role in (ADMIN, DOCTOR, PATIENT):
+            self.assertIn(f"reminders:reminder-list-create {role.lower()}", names)
+            self.assertIn(f"reminders:reminder-rud {role.lower()}", names)
+        self.assertIn("authentication:auth-login anonymous", names)
+        self.assertIn("authentication:auth-forgot-password hit", names)
+        # a database that was not seeded: its real users must get no reset links
+        names = {case.name for case in benchmarks.endpoint_cases(benchmarks.role_users())}
+        self.assertNotIn("authentication:auth-forgot-password hit", names)
+        self.assertNotIn("schema-json admin", names)
+
+    def test_measure_and_compare(self):
+        cases = [case for case in self.cases if case.name.startswith(("reminders:", "authentication:auth-login"))]
+        results = benchmarks.run(cases, requests=3, warmup=1)
+        for name, summary in results.items():
+            self.assertEqual(summary["statuses"], {"200": 3}, name)
+            self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+
+        current = {"100": results}
+        self.assertEqual(benchmarks.compare(current, current), [])
+        faster = {"100": {name: dict(summary, p95_ms=summary["p95_ms"] / 2, queries=summary["queries"] - 1)
+                          for name, summary in results.items()}}
+        self.assertEqual(len(benchmarks.compare(current, faster)), 2 * len(results))
+
+    def test_password_reset_hit_and_miss(self):
+        cases = [case for case in self.cases if case.name.startswith("authentication:auth-forgot-password")]
+        results = benchmarks.run(cases, requests=3, warmup=1)
+        hit = results["authentication:auth-forgot-password hit"]
+        miss = results["authentication:auth-forgot-password miss"]
+        self.assertEqual((hit["statuses"], hit["queries"]), (miss["statuses"], miss["queries"]))
+        self.assertEqual(set(benchmarks.hit_miss_gaps(results)), {"authentication:auth-forgot-password"})
+
+    def test_command_writes_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            call_command("bench_endpoints", current_db=True, requests=1, warmup=0, only="notifications:",
+                         output=output, stdout=io.StringIO())
+            with open(output) as handle:
+                report = json.load(handle)
+        self.assertIn("notifications:notification-list-create admin", report["results"]["current"])
+        self.assertEqual(report["meta"]["requests"], 1)
+
+
+@tag("benchmark")
+@skipIf(orjson is None, "orjson is not installed")
+class FastJSONRendererBenchmark(TestCase):
+    """
+    Encoding time of analysis-sized payloads (large `ocr_text`). Run with `manage.py test --tag=benchmark`.
+    """
+    ROUNDS = 20
+
+    def test_render_speed(self):
+        now = timezone.now()
+        payload = ResponseWithResultSerializer.success(result=[
+            {"id": i, "title": f"Blood panel {i}", "ocr_text": "Hémoglobine 13.5 g/dL\n" * 2000,
+             "report_date": now.date(), "date_created": now, "date_last_updated": now}
+            for i in range(50)
+        ])
+        elapsed = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            started = time.perf_counter()
+            for _ in range(self.ROUNDS):
+                renderer.render(payload)
+            elapsed[type(renderer)] = (time.perf_counter() - started) / self.ROUNDS
+            logger.info("%s: %.2f ms/response", type(renderer).__name__, elapsed[type(renderer)] * 1000)
+        self.assertLess(elapsed[FastJSONRenderer], elapsed[JSONRenderer])
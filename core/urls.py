@@ -1,6 +1,9 @@
 from django.urls import path
 
+from core.views import MetricsView
+
+app_name = "core"
 
 urlpatterns = [
-    # path('domain/', DomainListCreateView.as_view(), name='domain-list-create'),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
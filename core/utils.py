@@ -3,9 +3,11 @@ from typing import Dict
 
 import requests
 
+from django.http import StreamingHttpResponse
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import ResponseSerializer, ResponseWithResultSerializer
+from .streaming import JSON_CONTENT_TYPE, iter_json_envelope
 
 
 def post_request(url: str, headers: Dict, payload: Dict) -> Dict:
@@ -28,6 +30,16 @@ def success_response(message="", result=None, status=status.HTTP_200_OK):
         status=status
     )
 
+def success_streaming_response(result, message="", status=status.HTTP_200_OK, trailer=None):
+    """
+    `success_response` for large result lists: the envelope and items are encoded and sent incrementally.
+    """
+    return StreamingHttpResponse(
+        iter_json_envelope(result, message=message, trailer=trailer),
+        content_type=JSON_CONTENT_TYPE,
+        status=status
+    )
+
 def error_response(message, errors=None, status=status.HTTP_400_BAD_REQUEST, error_type=''):
     return Response(
         ResponseSerializer.fail(message=message, errors=errors or [], error_type=error_type),
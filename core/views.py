@@ -0,0 +1,20 @@
+from django.http import HttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from core import metrics
+from core.permissions import IsAdmin
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsView(APIView):
+    """
+    Request histograms of core.metrics in the Prometheus text format, summed over all worker processes when
+    METRICS_DIR is set.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request: Request) -> HttpResponse:
+        return HttpResponse(metrics.render(metrics.collect()), content_type=PROMETHEUS_CONTENT_TYPE)
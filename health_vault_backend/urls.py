@@ -25,6 +25,7 @@ urlpatterns = [
     path("api/reminders/", include("reminders.urls", namespace="reminders")),
     path("api/notifications/", include("notifications.urls", namespace="notifications")),
     path("api/auditlog/", include("audit.urls", namespace="audit")),
+    path("api/core/", include("core.urls", namespace="core")),
 
     path("api/schema/swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
     path("api/schema/redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
@@ -1,15 +1,18 @@
-from core.api_views import BaseLCAPIView, BaseRUDAPIView
+from core.api_views import BaseLCAPIView, BaseRUDAPIView, PatientScopedMixin
 from core.permissions import CanWritePatientData
+from profiles.models import PatientDoctorConsent
 from notes.models import ClinicalNoteAttachment
 from notes.model_serializers.clinical_note_attachment_serializers import ClinicalNoteAttachmentReadSerializer, ClinicalNoteAttachmentWriteSerializer
 
 
-class ClinicalNoteAttachmentListCreateView(BaseLCAPIView):
+class ClinicalNoteAttachmentListCreateView(PatientScopedMixin, BaseLCAPIView):
     queryset = ClinicalNoteAttachment.objects.select_related("note", "note__patient", "note__doctor").all()
     read_serializer_class = ClinicalNoteAttachmentReadSerializer
     write_serializer_class = ClinicalNoteAttachmentWriteSerializer
     list_read_serializer_class = ClinicalNoteAttachmentReadSerializer
     permission_classes = [CanWritePatientData]
+    patient_path = "note__patient"
+    consent_scope = PatientDoctorConsent.Scope.NOTES
 
 
 class ClinicalNoteAttachmentRUDView(BaseRUDAPIView):
@@ -17,3 +20,5 @@ class ClinicalNoteAttachmentRUDView(BaseRUDAPIView):
     read_serializer_class = ClinicalNoteAttachmentReadSerializer
     write_serializer_class = ClinicalNoteAttachmentWriteSerializer
     permission_classes = [CanWritePatientData]
+    patient_path = "note__patient"
+    consent_scope = PatientDoctorConsent.Scope.NOTES
@@ -1,15 +1,18 @@
-from core.api_views import BaseLCAPIView, BaseRUDAPIView
+from core.api_views import BaseLCAPIView, BaseRUDAPIView, PatientScopedMixin
 from core.permissions import CanWritePatientData
+from profiles.models import PatientDoctorConsent
 from notes.model_serializers.clinical_note_serializers import ClinicalNoteReadSerializer, ClinicalNoteWriteSerializer
 from notes.models import ClinicalNote
 
 
-class ClinicalNoteListCreateView(BaseLCAPIView):
+class ClinicalNoteListCreateView(PatientScopedMixin, BaseLCAPIView):
     queryset = ClinicalNote.objects.select_related("patient", "doctor").all()
     read_serializer_class = ClinicalNoteReadSerializer
     write_serializer_class = ClinicalNoteWriteSerializer
     list_read_serializer_class = ClinicalNoteReadSerializer
     permission_classes = [CanWritePatientData]  # doctors with consent can write; patients can read theirs
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.NOTES
 
 
 class ClinicalNoteRUDView(BaseRUDAPIView):
@@ -17,3 +20,5 @@ class ClinicalNoteRUDView(BaseRUDAPIView):
     read_serializer_class = ClinicalNoteReadSerializer
     write_serializer_class = ClinicalNoteWriteSerializer
     permission_classes = [CanWritePatientData]
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.NOTES
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.const import ADMIN, DOCTOR, PATIENT
+from notifications.models import Broadcast, Notification
+from notifications.services import broadcast
+from profiles.models import PatientDoctorConsent
+
+
+class Command(BaseCommand):
+    help = ("Notify every active user of a role and/or of a doctor's consent cohort, generating the notifications "
+            "in chunks with progress output; --resume continues an interrupted broadcast. With --pending, work "
+            "off the broadcasts created through the API and those whose worker died (run periodically, or with "
+            "--interval as a daemon; any number of workers may run at once).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--role", choices=[ADMIN, DOCTOR, PATIENT], default="")
+        parser.add_argument("--doctor", type=int, help="Doctor id: target the patients consenting to them")
+        parser.add_argument("--consent-scope", choices=PatientDoctorConsent.Scope.values, default="",
+                            help="Only consents covering this scope (with --doctor)")
+        parser.add_argument("--subject", default="")
+        parser.add_argument("--body", default="")
+        parser.add_argument("--kind", choices=Notification.Kind.values, default=Notification.Kind.SYSTEM)
+        parser.add_argument("--channel", choices=Notification.Channel.values, default=Notification.Channel.EMAIL)
+        parser.add_argument("--chunk-size", type=int, default=None, help="Recipients per transaction")
+        parser.add_argument("--resume", type=int, help="Id of a broadcast to continue instead of creating one")
+        parser.add_argument("--pending", action="store_true",
+                            help="Run pending broadcasts and those with a stale lease instead of creating one")
+        parser.add_argument("--interval", type=int, default=0,
+                            help="With --pending: keep running and poll every N seconds (0 = drain once and exit)")
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            while True:
+                count = broadcast.run_pending(chunk_size=options["chunk_size"], progress=self.report)
+                self.stdout.write(self.style.SUCCESS(f"Ran {count} broadcasts."))
+                if not options["interval"]:
+                    return
+                time.sleep(options["interval"])
+        if options["resume"]:
+            instance = Broadcast.objects.filter(pk=options["resume"]).first()
+            if instance is None:
+                raise CommandError(f"No broadcast {options['resume']}")
+        else:
+            instance = self.create(options)
+        self.stdout.write(f"Broadcast {instance.pk}: {instance.total} recipients")
+        instance = broadcast.run(instance.pk, chunk_size=options["chunk_size"], progress=self.report)
+        self.stdout.write(self.style.SUCCESS(f"Broadcast {instance.pk} sent to {instance.done} users."))
+
+    @staticmethod
+    def create(options) -> Broadcast:
+        if not options["role"] and not options["doctor"]:
+            raise CommandError("Give --role, --doctor or both")
+        if options["consent_scope"] and not options["doctor"]:
+            raise CommandError("--consent-scope needs --doctor")
+        if not options["subject"]:
+            raise CommandError("--subject is required")
+        instance = Broadcast(
+            role=options["role"], doctor_id=options["doctor"], consent_scope=options["consent_scope"],
+            kind=options["kind"], channel=options["channel"], subject=options["subject"], body=options["body"],
+        )
+        instance.total = broadcast.audience(instance).count()
+        instance.save()
+        return instance
+
+    def report(self, instance: Broadcast) -> None:
+        self.stdout.write(f"  {instance.pk}: {instance.done}/{instance.total}")
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from authentication.services import password_reset
+from notifications.services.outbox import Outbox
+
+
+class Command(BaseCommand):
+    help = ("Deliver unsent notifications from the outbox (run periodically, or with --interval as a daemon), after "
+            "turning pending password reset requests into notifications. Any number of workers may run at once: "
+            "each claims its own batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Notifications claimed per batch")
+        parser.add_argument("--interval", type=int, default=0,
+                            help="Keep running and poll every N seconds (0 = drain once and exit)")
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        interval: int = options["interval"]
+        # one outbox for the whole run: channel connections (SMTP) are reused across batches
+        with Outbox() as outbox:
+            while True:
+                while password_reset.resolve_pending(batch_size) == batch_size:
+                    pass
+                claimed, failed = self.drain(outbox, batch_size)
+                self.stdout.write(self.style.SUCCESS(f"Delivered {claimed - failed} notifications, {failed} failed."))
+                if not interval:
+                    return
+                time.sleep(interval)
+
+    @staticmethod
+    def drain(outbox: Outbox, batch_size: int):
+        total_claimed = total_failed = 0
+        while True:
+            claimed, failed = outbox.process(batch_size)
+            total_claimed += claimed
+            total_failed += failed
+            if claimed < batch_size:
+                return total_claimed, total_failed
@@ -1,5 +1,11 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from notifications.models import Notification
+
+from authentication.const import ADMIN, DOCTOR, PATIENT
+from notifications.models import Broadcast, Notification
+from profiles.models import PatientDoctorConsent
+
+User = get_user_model()
 
 
 class NotificationReadSerializer(serializers.ModelSerializer):
@@ -13,10 +19,11 @@ class NotificationReadSerializer(serializers.ModelSerializer):
             "kind", "channel",
             "subject", "body",
             "payload",
-            "sent_at",
+            "sent_at", "attempts", "last_error", "failed_at", "read_at",
             "date_created", "date_last_updated",
         ]
-        read_only_fields = ["id", "user_email", "date_created", "date_last_updated"]
+        read_only_fields = ["id", "user_email", "attempts", "last_error", "failed_at", "read_at",
+                            "date_created", "date_last_updated"]
 
 
 class NotificationWriteSerializer(serializers.ModelSerializer):
@@ -31,3 +38,53 @@ class NotificationWriteSerializer(serializers.ModelSerializer):
             "sent_at",
         ]
         read_only_fields = ["id"]
+
+
+class MarkReadSerializer(serializers.Serializer):
+    # None marks every unread notification read
+    up_to = serializers.IntegerField(required=False, min_value=1)
+
+
+class BroadcastReadSerializer(serializers.ModelSerializer):
+    created_by_email = serializers.EmailField(source="created_by.email", read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = [
+            "id",
+            "created_by", "created_by_email",
+            "role", "doctor", "consent_scope",
+            "kind", "channel",
+            "subject", "body",
+            "payload",
+            "status", "total", "done",
+            "started_at", "finished_at", "error",
+            "date_created", "date_last_updated",
+        ]
+        read_only_fields = fields
+
+
+class BroadcastWriteSerializer(serializers.ModelSerializer):
+    role = serializers.ChoiceField(choices=[ADMIN, DOCTOR, PATIENT], required=False, allow_blank=True)
+    doctor = serializers.PrimaryKeyRelatedField(queryset=User.objects.filter(group__name=DOCTOR), required=False,
+                                                allow_null=True)
+    consent_scope = serializers.ChoiceField(choices=PatientDoctorConsent.Scope.choices, required=False,
+                                            allow_blank=True)
+
+    class Meta:
+        model = Broadcast
+        fields = [
+            "id",
+            "role", "doctor", "consent_scope",
+            "kind", "channel",
+            "subject", "body",
+            "payload",
+        ]
+        read_only_fields = ["id"]
+
+    def validate(self, attrs):
+        if not attrs.get("role") and not attrs.get("doctor"):
+            raise serializers.ValidationError("Target a `role`, a `doctor`'s consent cohort, or both.")
+        if attrs.get("consent_scope") and not attrs.get("doctor"):
+            raise serializers.ValidationError("`consent_scope` narrows a `doctor`'s consent cohort.")
+        return attrs
@@ -1,7 +1,18 @@
-from core.api_views import BaseLCAPIView, BaseRUDAPIView
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.api_views import BaseBulkAPIView, BaseLCAPIView, BaseRetrieveAPIView, BaseRUDAPIView
 from core.permissions import IsAdmin, IsOwnerByField
-from notifications.models import Notification
-from notifications.model_serializers.notification_serializers import NotificationReadSerializer, NotificationWriteSerializer
+from core.utils import error_response, success_response
+from notifications.models import Broadcast, Notification
+from notifications.model_serializers.notification_serializers import (
+    BroadcastReadSerializer, BroadcastWriteSerializer, MarkReadSerializer, NotificationReadSerializer,
+    NotificationWriteSerializer,
+)
+from notifications.services import broadcast, unread
 
 
 class NotificationListCreateView(BaseLCAPIView):
@@ -10,10 +21,76 @@ class NotificationListCreateView(BaseLCAPIView):
     write_serializer_class = NotificationWriteSerializer
     list_read_serializer_class = NotificationReadSerializer
     permission_classes = [IsAdmin]
+    fast_read_serializer = True
 
 
 class NotificationRUDView(BaseRUDAPIView):
     queryset = Notification.objects.select_related("user").all()
     read_serializer_class = NotificationReadSerializer
     write_serializer_class = NotificationWriteSerializer
-    permission_classes = [IsAdmin | IsOwnerByField]
\ No newline at end of file
+    permission_classes = [IsAdmin | IsOwnerByField]
+
+
+class NotificationBulkView(BaseBulkAPIView):
+    queryset = Notification.objects.select_related("user").all()
+    read_serializer_class = NotificationReadSerializer
+    write_serializer_class = NotificationWriteSerializer
+    permission_classes = [IsAdmin]
+
+    def after_bulk_write(self, objects, creating: bool) -> None:
+        if creating:
+            unread.notifications_created(objects)
+
+
+class NotificationUnreadCountView(APIView):
+    """
+    The requesting user's unread notification count: one primary key lookup, cheap enough to poll.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request) -> Response:
+        return success_response(result={"unread": unread.unread_count(request.user.id)})
+
+
+class NotificationMarkReadView(APIView):
+    """
+    Marks the requesting user's unread notifications read: all of them, or those up to `up_to` (an id, e.g. the
+    newest one the client has shown). One UPDATE either way.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Request) -> Response:
+        serializer = MarkReadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message="Invalid payload",
+                errors=serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        marked = unread.mark_read(request.user.id, up_to=serializer.validated_data.get("up_to"))
+        return success_response(result={"marked": marked, "unread": unread.unread_count(request.user.id)})
+
+
+class BroadcastListCreateView(BaseLCAPIView):
+    """
+    Creating a broadcast only records it (with its audience size as `total`), as PENDING; the notifications are
+    generated by a `broadcast_notifications --pending` worker, and `status`/`done` on the broadcast show the
+    progress.
+    """
+    queryset = Broadcast.objects.select_related("created_by").all()
+    read_serializer_class = BroadcastReadSerializer
+    write_serializer_class = BroadcastWriteSerializer
+    list_read_serializer_class = BroadcastReadSerializer
+    permission_classes = [IsAdmin]
+    fast_read_serializer = True
+
+    def perform_create(self, serializer):
+        instance = serializer.save(created_by=self.request.user)
+        instance.total = broadcast.audience(instance).count()
+        instance.save(update_fields=["total", "date_last_updated"])
+
+
+class BroadcastRetrieveView(BaseRetrieveAPIView):
+    queryset = Broadcast.objects.select_related("created_by").all()
+    serializer_class = BroadcastReadSerializer
+    permission_classes = [IsAdmin]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from core.indexes import PartialIndex
 from core.models import BaseModel
 
 
@@ -21,6 +22,14 @@ class Notification(BaseModel):
         indexes = [
             models.Index(fields=["user", "date_created"]),
             models.Index(fields=["kind"]),
+            # the outbox's claim query: undelivered rows whose next attempt is due (notifications.services.outbox)
+            PartialIndex(fields=["next_attempt_at"],
+                         condition=models.Q(sent_at__isnull=True, failed_at__isnull=True),
+                         fallback_fields=["sent_at", "failed_at", "next_attempt_at"],
+                         name="notification_outbox_idx"),
+            # a user's unread rows: "mark read up to id" and recounts (notifications.services.unread)
+            PartialIndex(fields=["user", "id"], condition=models.Q(read_at__isnull=True),
+                         fallback_fields=["user", "read_at", "id"], name="notification_unread_idx"),
         ]
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
@@ -30,3 +39,69 @@ class Notification(BaseModel):
     body = models.TextField(blank=True, default="")
     payload = models.JSONField(blank=True, default=dict)  # arbitrary context
     sent_at = models.DateTimeField(null=True, blank=True)
+    # delivery bookkeeping of the outbox: attempts so far, when to try again (NULL = right away), why the
+    # last attempt failed, and when it gave up
+    attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_error = models.TextField(blank=True, default="", editable=False)
+    failed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # set by the mark-read endpoints only, which keep UnreadNotificationCounter in step
+    read_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+
+class UnreadNotificationCounter(models.Model):
+    """
+    Number of unread notifications per user, kept by notifications.services.unread with relative UPDATEs
+    whenever notifications are created, read or deleted, so a badge count is one primary key lookup.
+    """
+    class Meta:
+        verbose_name = "Unread notification counter"
+        verbose_name_plural = "Unread notification counters"
+        db_table = "notification_unread_counter"
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name="unread_notification_counter")
+    unread = models.PositiveIntegerField(default=0)
+
+
+class Broadcast(BaseModel):
+    """
+    One notification fanned out to every active user of a role and/or of a doctor's consent cohort (patients
+    with an active consent for `doctor`, covering `consent_scope` if set). The rows are generated in chunks by
+    notifications.services.broadcast, which records its progress here: `done` recipients so far, all of them
+    with ids up to `last_user_id`, so an interrupted run resumes where it stopped. A running broadcast is leased
+    to its worker until `lease_expires_at`; once that passes, the worker is presumed dead and another one claims it.
+    """
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    class Meta:
+        verbose_name = "Broadcast"
+        verbose_name_plural = "Broadcasts"
+        db_table = "notification_broadcast"
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name="broadcasts")
+    # audience
+    role = models.CharField(max_length=150, blank=True, default="")  # auth Group name
+    doctor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name="cohort_broadcasts")
+    consent_scope = models.CharField(max_length=16, blank=True, default="")
+    # the notification
+    kind = models.CharField(max_length=20, choices=Notification.Kind.choices, default=Notification.Kind.SYSTEM)
+    channel = models.CharField(max_length=10, choices=Notification.Channel.choices, default=Notification.Channel.EMAIL)
+    subject = models.CharField(max_length=200)
+    body = models.TextField(blank=True, default="")
+    payload = models.JSONField(blank=True, default=dict)
+    # progress
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, editable=False)
+    total = models.PositiveIntegerField(default=0, editable=False)
+    done = models.PositiveIntegerField(default=0, editable=False)
+    last_user_id = models.PositiveBigIntegerField(default=0, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+    error = models.TextField(blank=True, default="", editable=False)
+    lease_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
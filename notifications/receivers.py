@@ -0,0 +1,21 @@
+# notifications/receivers.py
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from notifications.models import Notification
+from notifications.services import unread
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_on_create(sender: Any, instance: Notification, created: bool, raw: bool = False,
+                           **kwargs: Any) -> None:
+    if created and not raw and instance.read_at is None:
+        unread.add({instance.user_id: 1})
+
+
+@receiver(post_delete, sender=Notification)
+def count_unread_on_delete(sender: Any, instance: Notification, **kwargs: Any) -> None:
+    if instance.read_at is None:
+        unread.subtract(instance.user_id, 1)
@@ -0,0 +1,159 @@
+# notifications/services/broadcast.py
+"""
+Fan-out of a Broadcast into one Notification per recipient.
+
+Recipients are walked in primary key order, BROADCAST_CHUNK_SIZE at a time, as bare ids (`values_list`): no
+User instances are loaded. Each chunk is one transaction that bulk_creates the notifications, adds them to the
+unread counters (one UPDATE) and advances the broadcast's cursor and progress. The broadcast row is locked
+for that transaction, so a second runner waits and then continues after the first one's cursor: no
+recipient is notified twice, and a failed or interrupted run can simply be run again.
+
+Workers (`manage.py broadcast_notifications --pending`) find their work with `claim()`: a PENDING broadcast, or
+a RUNNING one whose lease (BROADCAST_LEASE_SECONDS, renewed with every chunk) has run out because its worker
+died. Claiming uses SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers take different broadcasts.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from core.response_cache import invalidate_models
+from notifications.models import Broadcast, Notification
+from notifications.services import unread
+from profiles.services.consents import active_consent_exists
+
+logger = logging.getLogger(__name__)
+
+
+def audience(broadcast: Broadcast) -> QuerySet:
+    """
+    Active users the broadcast targets: members of `role`, patients of `doctor`'s consent cohort, or both.
+    """
+    users = get_user_model().objects.filter(is_active=True)
+    if broadcast.role:
+        users = users.filter(group__name=broadcast.role)
+    if broadcast.doctor_id:
+        users = users.filter(active_consent_exists(broadcast.doctor_id, "pk", broadcast.consent_scope or None))
+    return users
+
+
+def _notification(broadcast: Broadcast, user_id: int) -> Notification:
+    return Notification(
+        user_id=user_id,
+        kind=broadcast.kind,
+        channel=broadcast.channel,
+        subject=broadcast.subject,
+        body=broadcast.body,
+        payload={**broadcast.payload, "broadcast_id": broadcast.pk},
+    )
+
+
+def _lease_expiry(now: datetime) -> datetime:
+    return now + timedelta(seconds=getattr(settings, "BROADCAST_LEASE_SECONDS", 300))
+
+
+def claim(now: Optional[datetime] = None) -> Optional[int]:
+    """
+    Lease the oldest PENDING broadcast, or RUNNING one with a stale lease, to the caller; returns its id, or None.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        instance = (
+            Broadcast.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=Broadcast.Status.PENDING)
+                    | Q(status=Broadcast.Status.RUNNING, lease_expires_at__lt=now)
+                    | Q(status=Broadcast.Status.RUNNING, lease_expires_at__isnull=True))
+            .order_by("pk").first()
+        )
+        if instance is None:
+            return None
+        Broadcast.objects.filter(pk=instance.pk).update(
+            status=Broadcast.Status.RUNNING, lease_expires_at=_lease_expiry(now), date_last_updated=now,
+        )
+        return instance.pk
+
+
+def run_pending(chunk_size: Optional[int] = None,
+                progress: Optional[Callable[[Broadcast], None]] = None) -> int:
+    """
+    Claim and run broadcasts until none is left; returns how many were run. A failing broadcast is left FAILED
+    (see `run()`) and the next one is claimed.
+    """
+    count = 0
+    while True:
+        broadcast_id = claim()
+        if broadcast_id is None:
+            return count
+        count += 1
+        try:
+            run(broadcast_id, chunk_size=chunk_size, progress=progress)
+        except Exception:
+            continue  # recorded on the broadcast and logged by run()
+
+
+def _fan_out_chunk(broadcast_id: int, chunk_size: int) -> Optional[Broadcast]:
+    """
+    Notify the next chunk of recipients; None once every recipient has been notified.
+    """
+    with transaction.atomic():
+        broadcast = Broadcast.objects.select_for_update().get(pk=broadcast_id)
+        user_ids = list(
+            audience(broadcast).filter(pk__gt=broadcast.last_user_id).order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return None
+        Notification.objects.bulk_create([_notification(broadcast, user_id) for user_id in user_ids])
+        unread.add(dict.fromkeys(user_ids, 1))
+        broadcast.last_user_id = user_ids[-1]
+        broadcast.done += len(user_ids)
+        broadcast.lease_expires_at = _lease_expiry(timezone.now())
+        broadcast.save(update_fields=["last_user_id", "done", "lease_expires_at", "date_last_updated"])
+        return broadcast
+
+
+def run(broadcast_id: int, chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[Broadcast], None]] = None) -> Broadcast:
+    """
+    Fan the broadcast out from its cursor to the end, calling `progress` after every chunk. Failures are
+    recorded on the broadcast (status FAILED, `error`) and re-raised; running it again resumes.
+    """
+    chunk_size = chunk_size or getattr(settings, "BROADCAST_CHUNK_SIZE", 2000)
+    broadcast = Broadcast.objects.get(pk=broadcast_id)
+    if broadcast.status == Broadcast.Status.DONE:
+        return broadcast
+    now = timezone.now()
+    Broadcast.objects.filter(pk=broadcast_id).update(
+        status=Broadcast.Status.RUNNING, started_at=broadcast.started_at or now, error="",
+        lease_expires_at=_lease_expiry(now), date_last_updated=now,
+    )
+    try:
+        while True:
+            chunk = _fan_out_chunk(broadcast_id, chunk_size)
+            if chunk is None:
+                break
+            if progress is not None:
+                progress(chunk)
+    except Exception as exc:
+        logger.exception("Broadcast %s failed", broadcast_id)
+        Broadcast.objects.filter(pk=broadcast_id).update(
+            status=Broadcast.Status.FAILED, error=str(exc)[:1000], lease_expires_at=None,
+            date_last_updated=timezone.now(),
+        )
+        raise
+    finally:
+        invalidate_models(Notification, Broadcast)  # bulk writes send no post_save
+    finished_at = timezone.now()
+    Broadcast.objects.filter(pk=broadcast_id).update(
+        status=Broadcast.Status.DONE, finished_at=finished_at, lease_expires_at=None, date_last_updated=finished_at,
+    )
+    broadcast.refresh_from_db()
+    logger.info("Broadcast %s sent to %s users", broadcast_id, broadcast.done)
+    return broadcast
@@ -0,0 +1,178 @@
+# notifications/services/outbox.py
+"""
+Outbox delivery of Notification rows that were never sent (`sent_at IS NULL`).
+
+A worker (`manage.py deliver_notifications`) claims due rows in batches with SELECT ... FOR UPDATE SKIP LOCKED
+and, in the same short transaction, leases them: `attempts` goes up and `next_attempt_at` moves
+NOTIFICATION_OUTBOX_LEASE_SECONDS ahead. Concurrent workers therefore take disjoint batches, and a batch whose
+worker died is claimed again once its lease runs out. Delivery happens after that commit, with the channels of
+a batch (NOTIFICATION_CHANNELS) delivering concurrently. Delivered rows then get `sent_at` in one UPDATE; failed
+ones are retried with exponential backoff and given up (`failed_at`) after NOTIFICATION_MAX_ATTEMPTS attempts.
+Delivery is at least once: a worker dying between sending and marking sends that batch again.
+
+Channels without a configured class (PUSH has no provider yet) are never claimed and stay in the outbox.
+"""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.response_cache import invalidate_models
+from notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class EmailChannel:
+    """
+    Email through EMAIL_BACKEND over one connection, opened on first use and kept for the worker's lifetime
+    (one SMTP login per run instead of one per message). Messages go out one `send_messages()` call each, so a
+    rejected recipient fails only its own notification; a broken connection is reopened for the next message.
+    """
+
+    def __init__(self):
+        self.connection = get_connection()
+        self.from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
+
+    def deliver(self, notifications: List[Notification]) -> Dict[int, str]:
+        failures = {}
+        for notification in notifications:
+            recipient = notification.user.email
+            if not recipient:
+                failures[notification.pk] = "The user has no email address"
+                continue
+            message = EmailMessage(notification.subject, notification.body, self.from_email, [recipient],
+                                   connection=self.connection)
+            try:
+                self.connection.open()  # no-op while open
+                if not self.connection.send_messages([message]):
+                    failures[notification.pk] = "Not accepted by the email backend"
+            except Exception as exc:
+                failures[notification.pk] = f"{type(exc).__name__}: {exc}"
+                self.close()
+        return failures
+
+    def close(self) -> None:
+        try:
+            self.connection.close()
+        except Exception:
+            logger.exception("Closing the email connection failed")
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Backoff before the attempt after `attempts` failed ones: NOTIFICATION_RETRY_BASE_SECONDS doubled per attempt,
+    at most NOTIFICATION_RETRY_MAX_SECONDS.
+    """
+    base = getattr(settings, "NOTIFICATION_RETRY_BASE_SECONDS", 60)
+    ceiling = getattr(settings, "NOTIFICATION_RETRY_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), ceiling))
+
+
+class Outbox:
+    """
+    Claims and delivers batches with one instance per configured channel; use it as a context manager so the
+    channels' connections are reused across batches and closed at the end.
+    """
+
+    def __init__(self, channels: Optional[Dict[str, object]] = None):
+        if channels is None:
+            channels = {name: import_string(path)()
+                        for name, path in getattr(settings, "NOTIFICATION_CHANNELS", {}).items()}
+        self.channels = channels
+        self._executor = ThreadPoolExecutor(max_workers=max(len(channels), 1), thread_name_prefix="hv-outbox")
+
+    def __enter__(self) -> "Outbox":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for channel in self.channels.values():
+            close = getattr(channel, "close", None)
+            if close is not None:
+                close()
+        self._executor.shutdown(wait=True)
+
+    def claim(self, batch_size: int, now: datetime) -> List[Notification]:
+        """
+        Lock, lease and return up to `batch_size` due notifications of the configured channels, oldest first.
+        """
+        lease = timedelta(seconds=getattr(settings, "NOTIFICATION_OUTBOX_LEASE_SECONDS", 300))
+        with transaction.atomic():
+            batch = list(
+                Notification.objects.select_for_update(skip_locked=True, of=("self",)).select_related("user")
+                .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+                        sent_at__isnull=True, failed_at__isnull=True, channel__in=list(self.channels))
+                .order_by("pk")[:batch_size]
+            )
+            if batch:
+                Notification.objects.filter(pk__in=[notification.pk for notification in batch]).update(
+                    attempts=F("attempts") + 1, next_attempt_at=now + lease,
+                )
+        for notification in batch:
+            notification.attempts += 1
+        return batch
+
+    def deliver(self, notifications: List[Notification]) -> Dict[int, str]:
+        """
+        Hand every channel its share of `notifications`, all channels at once; returns errors by notification id.
+        """
+        by_channel: Dict[str, List[Notification]] = {}
+        for notification in notifications:
+            by_channel.setdefault(notification.channel, []).append(notification)
+        futures = {channel: self._executor.submit(self.channels[channel].deliver, batch)
+                   for channel, batch in by_channel.items()}
+        failures = {}
+        for channel, future in futures.items():
+            try:
+                failures.update(future.result())
+            except Exception as exc:
+                logger.exception("Delivering %s notifications failed", channel)
+                failures.update({notification.pk: f"{type(exc).__name__}: {exc}"
+                                 for notification in by_channel[channel]})
+        return failures
+
+    def process(self, batch_size: int = 100, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        Claim, deliver and record one batch; returns (claimed, failed).
+        """
+        now = now or timezone.now()
+        batch = self.claim(batch_size, now)
+        if not batch:
+            return 0, 0
+        failures = self.deliver(batch)
+
+        delivered_at = timezone.now()
+        delivered = [notification.pk for notification in batch if notification.pk not in failures]
+        failed = [notification for notification in batch if notification.pk in failures]
+        max_attempts = getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 5)
+        for notification in failed:
+            notification.last_error = failures[notification.pk][:1000]
+            notification.date_last_updated = delivered_at  # bulk_update skips auto_now
+            if notification.attempts >= max_attempts:
+                notification.failed_at, notification.next_attempt_at = delivered_at, None
+            else:
+                notification.next_attempt_at = now + retry_delay(notification.attempts)
+        with transaction.atomic():
+            if delivered:
+                Notification.objects.filter(pk__in=delivered).update(
+                    sent_at=delivered_at, next_attempt_at=None, last_error="", date_last_updated=delivered_at,
+                )
+            Notification.objects.bulk_update(
+                failed, ["last_error", "next_attempt_at", "failed_at", "date_last_updated"]
+            )
+        invalidate_models(Notification)  # bulk writes send no post_save
+        if failed:
+            logger.warning("%s of %s notifications failed to deliver", len(failed), len(batch))
+        return len(batch), len(failed)
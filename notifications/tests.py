@@ -1,3 +1,299 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.const import ADMIN, DOCTOR, PATIENT
+from authentication.services.password_reset import resolve_pending
+from notifications.models import Broadcast, Notification, UnreadNotificationCounter
+from notifications.services import broadcast, unread
+from notifications.services.outbox import EmailChannel, Outbox, retry_delay
+from profiles.models import PatientDoctorConsent
+from reminders.models import Reminder
+from reminders.services.dispatch import dispatch_due
+
+User = get_user_model()
+
+
+class FlakyChannel:
+    """
+    Stand-in push channel: fails the notifications whose subject says so.
+    """
+
+    def __init__(self):
+        self.delivered = []
+
+    def deliver(self, notifications):
+        self.delivered.extend(notification.pk for notification in notifications)
+        return {notification.pk: "provider unavailable" for notification in notifications
+                if notification.subject == "fail"}
+
+
+class NotificationOutboxTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.patient = User.objects.create_user(email="p1@example.com", password="pass",
+                                                group=Group.objects.get_or_create(name=PATIENT)[0])
+        self.now = timezone.now()
+
+    def notify(self, channel=Notification.Channel.EMAIL, subject="Hello", **kwargs) -> Notification:
+        return Notification.objects.create(user=self.patient, kind=Notification.Kind.SYSTEM, channel=channel,
+                                           subject=subject, body="Body", **kwargs)
+
+    def test_email_is_delivered_once_and_marked_sent(self):
+        first, second = self.notify(), self.notify()
+        self.notify(sent_at=self.now)
+        push = self.notify(channel=Notification.Channel.PUSH)
+
+        with Outbox() as outbox:
+            self.assertEqual(outbox.process(now=self.now), (2, 0))
+            self.assertEqual(outbox.process(now=self.now), (0, 0))
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual((mail.outbox[0].subject, mail.outbox[0].to), ("Hello", ["p1@example.com"]))
+        for notification in (first, second):
+            notification.refresh_from_db()
+            self.assertIsNotNone(notification.sent_at)
+            self.assertEqual(notification.attempts, 1)
+        push.refresh_from_db()
+        self.assertIsNone(push.sent_at)  # no push channel configured
+
+    def test_channels_are_delivered_together(self):
+        self.notify()
+        pushed = self.notify(channel=Notification.Channel.PUSH)
+        push = FlakyChannel()
+        with Outbox({"EMAIL": EmailChannel(), "PUSH": push}) as outbox:
+            self.assertEqual(outbox.process(now=self.now), (2, 0))
+        self.assertEqual(push.delivered, [pushed.pk])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(Notification.objects.filter(sent_at__isnull=True).count(), 0)
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=3, NOTIFICATION_RETRY_BASE_SECONDS=60)
+    def test_failures_back_off_then_give_up(self):
+        notification = self.notify(channel=Notification.Channel.PUSH, subject="fail")
+        with Outbox({"PUSH": FlakyChannel()}) as outbox:
+            now = self.now
+            for attempt in (1, 2):
+                self.assertEqual(outbox.process(now=now), (1, 1))
+                notification.refresh_from_db()
+                self.assertEqual(notification.attempts, attempt)
+                self.assertEqual(notification.next_attempt_at, now + retry_delay(attempt))
+                self.assertEqual(notification.last_error, "provider unavailable")
+                self.assertEqual(outbox.process(now=now), (0, 0))  # not due yet
+                now = notification.next_attempt_at
+            self.assertEqual(outbox.process(now=now), (1, 1))
+            self.assertEqual(outbox.process(now=now + timedelta(days=1)), (0, 0))
+
+        notification.refresh_from_db()
+        self.assertIsNotNone(notification.failed_at)
+        self.assertIsNone(notification.sent_at)
+        self.assertEqual(retry_delay(2), timedelta(seconds=120))
+
+    def test_leased_rows_are_not_claimed_twice(self):
+        self.notify()
+        with Outbox({"EMAIL": FlakyChannel()}) as outbox:
+            self.assertEqual(len(outbox.claim(10, self.now)), 1)
+            self.assertEqual(outbox.claim(10, self.now), [])
+            # a worker that died mid-batch: the lease runs out and the row is claimed again
+            self.assertEqual(len(outbox.claim(10, self.now + timedelta(hours=1))), 1)
+
+    def test_command_reuses_one_connection(self):
+        for _ in range(5):
+            self.notify()
+        with tempfile.TemporaryDirectory() as directory:
+            # the file backend writes one file per opened connection
+            with override_settings(EMAIL_BACKEND="django.core.mail.backends.filebased.EmailBackend",
+                                   EMAIL_FILE_PATH=directory):
+                out = StringIO()
+                call_command("deliver_notifications", batch_size=2, stdout=out)
+            self.assertEqual(len(os.listdir(directory)), 1)
+        self.assertIn("Delivered 5 notifications, 0 failed.", out.getvalue())
+
+    def test_forgot_password_only_queues_the_email(self):
+        response = self.client.post(reverse("authentication:auth-forgot-password"), {"email": "p1@example.com"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(resolve_pending(), 1)
+        self.assertEqual(mail.outbox, [])
+        notification = Notification.objects.get(user=self.patient)
+        self.assertIn(notification.payload["reset_url"], notification.body)
+        with Outbox() as outbox:
+            outbox.process()
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class UnreadNotificationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        patients = Group.objects.get_or_create(name=PATIENT)[0]
+        self.patient = User.objects.create_user(email="p1@example.com", password="pass", group=patients)
+        self.other = User.objects.create_user(email="p2@example.com", password="pass", group=patients)
+        self.client = APIClient()
+        self.client.force_authenticate(self.patient)
+
+    def notify(self, user=None) -> Notification:
+        return Notification.objects.create(user=user or self.patient, kind=Notification.Kind.SYSTEM,
+                                           channel=Notification.Channel.EMAIL, subject="Hello")
+
+    def count(self) -> int:
+        response = self.client.get(reverse("notifications:notification-unread-count"))
+        self.assertEqual(response.status_code, 200)
+        return response.data["result"]["unread"]
+
+    def test_counter_follows_creates_and_deletes(self):
+        self.assertEqual(self.count(), 0)
+        first = self.notify()
+        self.notify()
+        self.notify(self.other)
+        self.assertEqual(self.count(), 2)
+        first.delete()
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(unread.unread_count(self.other.pk), 1)
+
+    def test_counter_endpoint_is_one_lookup(self):
+        self.notify()
+        self.count()  # warm the authentication cache
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.count(), 1)
+        self.assertEqual(len(queries), 1)
+
+    def test_mark_read_up_to_and_all(self):
+        notifications = [self.notify() for _ in range(4)]
+        self.notify(self.other)
+        url = reverse("notifications:notification-mark-read")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {"up_to": notifications[1].pk}, format="json")
+        self.assertEqual(response.data["result"], {"marked": 2, "unread": 2})
+        self.assertEqual(sum(query["sql"].startswith('UPDATE "notification"') for query in queries), 1)
+
+        response = self.client.post(url, {}, format="json")
+        self.assertEqual(response.data["result"], {"marked": 2, "unread": 0})
+        self.assertEqual(self.client.post(url, {}, format="json").data["result"], {"marked": 0, "unread": 0})
+        self.assertFalse(Notification.objects.filter(user=self.patient, read_at__isnull=True).exists())
+        self.assertEqual(unread.unread_count(self.other.pk), 1)
+        self.assertEqual(self.client.post(url, {"up_to": "x"}, format="json").status_code, 400)
+
+    def test_bulk_inserts_and_recount(self):
+        Reminder.objects.create(patient=self.patient, title="Check-up", due_at=timezone.now() - timedelta(minutes=1))
+        dispatch_due()
+        self.assertEqual(unread.unread_count(self.patient.pk), 1)
+
+        UnreadNotificationCounter.objects.update(unread=42)
+        unread.recount([self.patient.pk])
+        self.assertEqual(unread.unread_count(self.patient.pk), 1)
+
+        # everyone's, without upserts (MySQL has no ON CONFLICT target), missing counters included
+        UnreadNotificationCounter.objects.all().delete()
+        UnreadNotificationCounter.objects.create(user=self.other, unread=7)
+        with mock.patch.object(type(connection.features), "supports_update_conflicts_with_target", False):
+            unread.recount()
+        self.assertEqual(unread.unread_count(self.patient.pk), 1)
+        self.assertEqual(unread.unread_count(self.other.pk), 0)
+
+
+class BroadcastTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        groups = {name: Group.objects.get_or_create(name=name)[0] for name in (ADMIN, DOCTOR, PATIENT)}
+        self.admin = User.objects.create_user(email="admin@example.com", password="pass", group=groups[ADMIN])
+        self.doctor = User.objects.create_user(email="doc@example.com", password="pass", group=groups[DOCTOR])
+        self.patients = [User.objects.create_user(email=f"p{i}@example.com", password="pass", group=groups[PATIENT])
+                         for i in range(5)]
+        self.patients[4].is_active = False
+        self.patients[4].save()
+        for patient, scope in zip(self.patients[:2], (PatientDoctorConsent.Scope.ALL,
+                                                      PatientDoctorConsent.Scope.ANALYSES)):
+            PatientDoctorConsent.objects.create(patient=patient, doctor=self.doctor, scope=scope)
+
+    def recipients(self, instance: Broadcast) -> set:
+        return set(Notification.objects.filter(payload__broadcast_id=instance.pk).values_list("user_id", flat=True))
+
+    def test_endpoint_fans_out_to_a_role_in_chunks(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(reverse("notifications:broadcast-list-create"),
+                               {"role": PATIENT, "subject": "Planned outage", "body": "Sunday 2-4am"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        instance = Broadcast.objects.get(pk=response.data["result"]["id"])
+        self.assertEqual((instance.status, instance.total), (Broadcast.Status.PENDING, 4))
+        self.assertFalse(Notification.objects.exists())
+
+        out = StringIO()
+        call_command("broadcast_notifications", pending=True, chunk_size=2, stdout=out)
+        self.assertIn("Ran 1 broadcasts.", out.getvalue())
+        instance.refresh_from_db()
+        self.assertEqual((instance.status, instance.total, instance.done), (Broadcast.Status.DONE, 4, 4))
+        self.assertEqual(instance.created_by, self.admin)
+        self.assertEqual(self.recipients(instance), {patient.pk for patient in self.patients[:4]})
+        self.assertEqual(unread.unread_count(self.patients[0].pk), 1)
+
+        response = client.get(reverse("notifications:broadcast-retrieve", kwargs={"pk": instance.pk}))
+        self.assertEqual(response.data["result"]["done"], 4)
+
+    def test_endpoint_validation_and_permissions(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = reverse("notifications:broadcast-list-create")
+        self.assertEqual(client.post(url, {"subject": "No audience"}, format="json").status_code, 400)
+        self.assertEqual(client.post(url, {"role": PATIENT, "consent_scope": "ALL", "subject": "x"},
+                                     format="json").status_code, 400)
+        client.force_authenticate(self.patients[0])
+        self.assertEqual(client.post(url, {"role": PATIENT, "subject": "x"}, format="json").status_code, 403)
+
+    def test_consent_cohort_and_resume(self):
+        instance = Broadcast.objects.create(doctor=self.doctor, consent_scope=PatientDoctorConsent.Scope.REMINDERS,
+                                            subject="Policy change")
+        self.assertEqual(set(broadcast.audience(instance).values_list("pk", flat=True)), {self.patients[0].pk})
+
+        instance = Broadcast.objects.create(doctor=self.doctor, subject="Policy change")
+        # an interrupted run: the first chunk went out, then the worker died
+        broadcast._fan_out_chunk(instance.pk, chunk_size=1)
+        with CaptureQueriesContext(connection) as queries:
+            instance = broadcast.run(instance.pk)
+        self.assertEqual((instance.status, instance.done), (Broadcast.Status.DONE, 2))
+        self.assertEqual(self.recipients(instance), {self.patients[0].pk, self.patients[1].pk})
+        self.assertEqual(Notification.objects.filter(payload__broadcast_id=instance.pk).count(), 2)
+        # recipients are read as ids only, never as user rows
+        self.assertFalse(any('"password"' in query["sql"] for query in queries))
+
+    def test_workers_take_over_stale_leases(self):
+        now = timezone.now()
+        running = Broadcast.objects.create(role=PATIENT, subject="Running", status=Broadcast.Status.RUNNING,
+                                           lease_expires_at=now + timedelta(minutes=1))
+        stale = Broadcast.objects.create(role=PATIENT, subject="Stale", status=Broadcast.Status.RUNNING,
+                                         lease_expires_at=now - timedelta(minutes=1))
+        Broadcast.objects.create(role=PATIENT, subject="Failed", status=Broadcast.Status.FAILED)
+        self.assertEqual(broadcast.claim(now), stale.pk)
+        self.assertIsNone(broadcast.claim(now))  # the live lease is left alone, and so is the failed one
+
+        # the claiming worker dies before its first chunk
+        Broadcast.objects.filter(pk=stale.pk).update(lease_expires_at=now - timedelta(minutes=1))
+        self.assertEqual(broadcast.run_pending(), 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.done, stale.lease_expires_at), (Broadcast.Status.DONE, 4, None))
+        self.assertEqual(Broadcast.objects.get(pk=running.pk).status, Broadcast.Status.RUNNING)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("broadcast_notifications", role=PATIENT, subject="Outage", chunk_size=3, stdout=out)
+        self.assertIn("3/4", out.getvalue())
+        self.assertIn("sent to 4 users", out.getvalue())
+        instance = Broadcast.objects.get()
+        call_command("broadcast_notifications", resume=instance.pk, stdout=StringIO())
+        self.assertEqual(Notification.objects.count(), 4)
@@ -1,7 +1,9 @@
 from django.urls import path
 
 from notifications.model_views.notification_view import (
-    NotificationListCreateView, NotificationRUDView,
+    BroadcastListCreateView, BroadcastRetrieveView,
+    NotificationBulkView, NotificationListCreateView, NotificationMarkReadView, NotificationRUDView,
+    NotificationUnreadCountView,
 )
 
 app_name = "notifications"
@@ -9,4 +11,9 @@ app_name = "notifications"
 urlpatterns = [
     path("", NotificationListCreateView.as_view(), name="notification-list-create"),
     path("<int:pk>/", NotificationRUDView.as_view(), name="notification-rud"),
+    path("bulk/", NotificationBulkView.as_view(), name="notification-bulk"),
+    path("unread-count/", NotificationUnreadCountView.as_view(), name="notification-unread-count"),
+    path("mark-read/", NotificationMarkReadView.as_view(), name="notification-mark-read"),
+    path("broadcasts/", BroadcastListCreateView.as_view(), name="broadcast-list-create"),
+    path("broadcasts/<int:pk>/", BroadcastRetrieveView.as_view(), name="broadcast-retrieve"),
 ]
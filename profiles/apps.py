@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self) -> None:
+        # Import signal receivers
+        from . import receivers  # noqa: F401
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.response_cache import invalidate_models
+from profiles.models import PatientDoctorConsent
+from profiles.services.consents import invalidate_doctor_consents
+
+
+class Command(BaseCommand):
+    help = "Deactivate expired patient-doctor consents in batches (run periodically, or with --interval as a daemon)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Consents deactivated per UPDATE")
+        parser.add_argument("--interval", type=int, default=0,
+                            help="Keep running and sweep every N seconds (0 = sweep once and exit)")
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        interval: int = options["interval"]
+        while True:
+            total = self.sweep(batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Deactivated {total} expired consents."))
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @staticmethod
+    def expired_batch(now, batch_size: int) -> list:
+        return list(
+            PatientDoctorConsent.objects.filter(is_active=True, expires_at__lte=now)
+            .order_by("pk")
+            .values_list("pk", "doctor_id")[:batch_size]
+        )
+
+    @classmethod
+    def sweep(cls, batch_size: int) -> int:
+        total = 0
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                rows = cls.expired_batch(now, batch_size)
+                if not rows:
+                    return total
+                # the conditions again: a consent extended since the SELECT is left active
+                deactivated = PatientDoctorConsent.objects.filter(
+                    pk__in=[pk for pk, _ in rows], is_active=True, expires_at__lte=now
+                ).update(is_active=False, date_last_updated=now)
+            # queryset.update() skips model signals, so evict the cached consent sets and responses explicitly
+            invalidate_doctor_consents(*{doctor_id for _, doctor_id in rows})
+            invalidate_models(PatientDoctorConsent)
+            total += deactivated
@@ -12,6 +12,10 @@ class ConsentReadSerializer(serializers.ModelSerializer):
     class Meta:
         model = PatientDoctorConsent
         fields = ["id", "doctor", "patient", "is_active", "scope", "date_created", "date_last_updated"]
+        prefetch_hints = {
+            "doctor": ("doctor", UserReadSerializer),
+            "patient": ("patient", UserReadSerializer),
+        }
 
     @staticmethod
     def get_doctor(obj):
@@ -10,6 +10,7 @@ class ConsentListCreateView(BaseLCAPIView):
     write_serializer_class = ConsentWriteSerializer
     list_read_serializer_class = ConsentReadSerializer
     permission_classes = [IsParticipantInConsentOrAdmin]
+    cache_responses = True
 
 
 class ConsentRUDView(BaseRUDAPIView):
@@ -10,6 +10,7 @@ class DoctorProfileListCreateView(BaseLCAPIView):
     write_serializer_class = DoctorProfileWriteSerializer
     list_read_serializer_class = DoctorProfileReadSerializer
     permission_classes = [IsAdmin]
+    cache_responses = True
 
 
 class DoctorProfileRUDView(BaseRUDAPIView):
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.db import models
 
 from authentication.models import User
+from core.indexes import PartialIndex
 from core.models import BaseModel
 
 
@@ -52,6 +53,18 @@ class PatientDoctorConsent(BaseModel):
         ]
         indexes = [
             models.Index(fields=["patient", "doctor", "is_active"]),
+            # doctor-side lookups: consent sets and the EXISTS probe used by PatientScopedMixin
+            models.Index(fields=["doctor", "is_active", "patient"]),
+            # hot-path consent checks only ever look at active rows; expired ones are flipped to inactive by
+            # the `expire_consents` sweeper, so this stays small (MySQL indexes every row, with is_active as a key column)
+            PartialIndex(
+                fields=["doctor", "patient", "scope", "expires_at"],
+                condition=models.Q(is_active=True),
+                fallback_fields=["doctor", "patient", "is_active", "scope", "expires_at"],
+                name="consent_active_doctor_idx",
+            ),
+            # the `expire_consents` sweep: active consents past `expires_at`
+            models.Index(fields=["is_active", "expires_at"]),
         ]
 
     patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="consents_as_patient")
@@ -0,0 +1,28 @@
+# profiles/receivers.py
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from profiles.models import PatientDoctorConsent
+from profiles.services.consents import invalidate_doctor_consents
+
+
+@receiver(pre_save, sender=PatientDoctorConsent)
+def remember_previous_doctor(sender: Any, instance: PatientDoctorConsent, **kwargs: Any) -> None:
+    # a consent moved to another doctor must also evict the previous doctor's cached set
+    instance._previous_doctor_id = None
+    if instance.pk:
+        instance._previous_doctor_id = (
+            PatientDoctorConsent.objects.filter(pk=instance.pk).values_list("doctor_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=PatientDoctorConsent)
+def invalidate_on_consent_save(sender: Any, instance: PatientDoctorConsent, **kwargs: Any) -> None:
+    invalidate_doctor_consents(instance.doctor_id, getattr(instance, "_previous_doctor_id", None))
+
+
+@receiver(post_delete, sender=PatientDoctorConsent)
+def invalidate_on_consent_delete(sender: Any, instance: PatientDoctorConsent, **kwargs: Any) -> None:
+    invalidate_doctor_consents(instance.doctor_id)
@@ -0,0 +1,119 @@
+# profiles/services/consents.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from profiles.models import PatientDoctorConsent
+
+ConsentMap = Dict[int, Dict[str, Optional[datetime]]]  # patient id -> {scope: expires_at}
+
+_REQUEST_ATTR = "_consent_cache"
+
+
+def _cache_key(doctor_id: int) -> str:
+    return f"consents:doctor:{doctor_id}"
+
+
+def scopes_granting(scope: Optional[str]) -> Optional[list[str]]:
+    """
+    Consent scopes that grant access to `scope`; None means any scope will do.
+    """
+    if scope is None:
+        return None
+    return [scope, PatientDoctorConsent.Scope.ALL]
+
+
+def _load(doctor_id: int) -> ConsentMap:
+    consents: ConsentMap = {}
+    rows = PatientDoctorConsent.objects.filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=Now()),
+        doctor_id=doctor_id,
+        is_active=True,
+    ).values_list("patient_id", "scope", "expires_at")
+    for patient_id, scope, expires_at in rows:
+        consents.setdefault(patient_id, {})[scope] = expires_at
+    return consents
+
+
+def get_doctor_consents(doctor_id: int, request: Optional[Any] = None) -> ConsentMap:
+    """
+    Active consents of a doctor as {patient_id: {scope: expires_at}}.
+    Looked up once per request (memoized on the request) and shared between requests and workers through
+    the default cache for CONSENT_CACHE_TIMEOUT seconds. Consent save/delete signals evict the entry.
+    Expiry is re-checked on every lookup, so a cached consent stops granting access the moment it expires.
+    """
+    http_request = getattr(request, "_request", request)
+    memo = getattr(http_request, _REQUEST_ATTR, None) if http_request is not None else None
+    if memo is not None and doctor_id in memo:
+        return memo[doctor_id]
+
+    key = _cache_key(doctor_id)
+    consents = cache.get(key)
+    if consents is None:
+        consents = _load(doctor_id)
+        cache.set(key, consents, getattr(settings, "CONSENT_CACHE_TIMEOUT", 300))
+
+    if http_request is not None:
+        if memo is None:
+            memo = {}
+            setattr(http_request, _REQUEST_ATTR, memo)
+        memo[doctor_id] = consents
+    return consents
+
+
+def _grants(scopes: Dict[str, Optional[datetime]], scope: Optional[str], now: datetime) -> bool:
+    wanted = scopes_granting(scope)
+    return any(
+        (wanted is None or granted in wanted) and (expires_at is None or expires_at > now)
+        for granted, expires_at in scopes.items()
+    )
+
+
+def doctor_has_consent(
+    doctor_id: Optional[int],
+    patient_id: Optional[int],
+    scope: Optional[str] = None,
+    request: Optional[Any] = None,
+) -> bool:
+    if not doctor_id or not patient_id:
+        return False
+    scopes = get_doctor_consents(doctor_id, request).get(int(patient_id))
+    return bool(scopes) and _grants(scopes, scope, timezone.now())
+
+
+def consented_patient_ids(doctor_id: int, scope: Optional[str] = None, request: Optional[Any] = None) -> FrozenSet[int]:
+    now = timezone.now()
+    return frozenset(
+        patient_id
+        for patient_id, scopes in get_doctor_consents(doctor_id, request).items()
+        if _grants(scopes, scope, now)
+    )
+
+
+def invalidate_doctor_consents(*doctor_ids: Optional[int]) -> None:
+    cache.delete_many([_cache_key(doctor_id) for doctor_id in doctor_ids if doctor_id])
+
+
+def active_consent_exists(doctor_id: int, patient_path: str, scope: Optional[str] = None) -> Exists:
+    """
+    Correlated `EXISTS` over the doctor's active, unexpired consents covering `scope`, for narrowing querysets in SQL.
+    `patient_path` is the ORM path from the outer model to the patient user ("patient", "analysis__patient", ...).
+    Served by the partial `consent_active_doctor_idx` index.
+    """
+    consents = PatientDoctorConsent.objects.filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=Now()),
+        doctor_id=doctor_id,
+        patient_id=OuterRef(patient_path),
+        is_active=True,
+    )
+    wanted = scopes_granting(scope)
+    if wanted is not None:
+        consents = consents.filter(scope__in=wanted)
+    return Exists(consents)
@@ -1,3 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpRequest
 from django.test import TestCase
+from django.utils import timezone
+
+from authentication.const import DOCTOR, PATIENT
+from profiles.management.commands.expire_consents import Command as ExpireConsentsCommand
+from profiles.models import PatientDoctorConsent
+from profiles.services.consents import consented_patient_ids, doctor_has_consent, get_doctor_consents
+
+User = get_user_model()
+
+
+class ConsentResolverTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.doctor = User.objects.create_user(email="doc@example.com", password="pass",
+                                               group=Group.objects.get_or_create(name=DOCTOR)[0])
+        patient_group = Group.objects.get_or_create(name=PATIENT)[0]
+        self.patient = User.objects.create_user(email="p1@example.com", password="pass", group=patient_group)
+        self.other = User.objects.create_user(email="p2@example.com", password="pass", group=patient_group)
+        self.consent = PatientDoctorConsent.objects.create(
+            patient=self.patient, doctor=self.doctor, scope=PatientDoctorConsent.Scope.NOTES
+        )
+
+    def test_loaded_once_per_request_and_shared_between_requests(self):
+        request = HttpRequest()
+        with self.assertNumQueries(1):
+            self.assertTrue(doctor_has_consent(self.doctor.id, self.patient.id, request=request))
+            self.assertFalse(doctor_has_consent(self.doctor.id, self.other.id, request=request))
+            self.assertEqual(consented_patient_ids(self.doctor.id, request=request), {self.patient.id})
+        with self.assertNumQueries(0):
+            self.assertTrue(doctor_has_consent(self.doctor.id, self.patient.id, request=HttpRequest()))
+        self.assertEqual(set(get_doctor_consents(self.doctor.id)[self.patient.id]), {"NOTES"})
+
+    def test_save_and_delete_invalidate(self):
+        self.assertFalse(doctor_has_consent(self.doctor.id, self.other.id))
+        consent = PatientDoctorConsent.objects.create(patient=self.other, doctor=self.doctor)
+        self.assertTrue(doctor_has_consent(self.doctor.id, self.other.id))
+
+        consent.is_active = False
+        consent.save()
+        self.assertFalse(doctor_has_consent(self.doctor.id, self.other.id))
+
+        self.consent.delete()
+        self.assertEqual(consented_patient_ids(self.doctor.id), frozenset())
+
+
+class ConsentScopeAndExpiryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.doctor = User.objects.create_user(email="doc@example.com", password="pass",
+                                               group=Group.objects.get_or_create(name=DOCTOR)[0])
+        self.patient = User.objects.create_user(email="p1@example.com", password="pass",
+                                                group=Group.objects.get_or_create(name=PATIENT)[0])
+
+    def test_scope_is_honored(self):
+        PatientDoctorConsent.objects.create(patient=self.patient, doctor=self.doctor,
+                                            scope=PatientDoctorConsent.Scope.NOTES)
+        self.assertTrue(doctor_has_consent(self.doctor.id, self.patient.id, scope=PatientDoctorConsent.Scope.NOTES))
+        self.assertFalse(doctor_has_consent(self.doctor.id, self.patient.id, scope=PatientDoctorConsent.Scope.ANALYSES))
+        self.assertTrue(doctor_has_consent(self.doctor.id, self.patient.id))
+
+    def test_all_scope_covers_everything(self):
+        PatientDoctorConsent.objects.create(patient=self.patient, doctor=self.doctor,
+                                            scope=PatientDoctorConsent.Scope.ALL)
+        for scope in PatientDoctorConsent.Scope.values:
+            self.assertTrue(doctor_has_consent(self.doctor.id, self.patient.id, scope=scope))
+
+    def test_expired_consent_denied_even_when_cached(self):
+        consent = PatientDoctorConsent.objects.create(patient=self.patient, doctor=self.doctor,
+                                                      expires_at=timezone.now() + timedelta(hours=1))
+        self.assertTrue(doctor_has_consent(self.doctor.id, self.patient.id))
+        with mock.patch("profiles.services.consents.timezone.now", return_value=consent.expires_at + timedelta(seconds=1)):
+            self.assertFalse(doctor_has_consent(self.doctor.id, self.patient.id))
+
+    def test_sweeper_deactivates_expired_consents(self):
+        expired = PatientDoctorConsent.objects.create(patient=self.patient, doctor=self.doctor,
+                                                      expires_at=timezone.now() - timedelta(minutes=1))
+        live = PatientDoctorConsent.objects.create(patient=self.patient, doctor=self.doctor,
+                                                   scope=PatientDoctorConsent.Scope.NOTES)
+        call_command("expire_consents", batch_size=1, stdout=StringIO())
+        expired.refresh_from_db()
+        live.refresh_from_db()
+        self.assertFalse(expired.is_active)
+        self.assertTrue(live.is_active)
+        self.assertEqual(set(get_doctor_consents(self.doctor.id)[self.patient.id]), {"NOTES"})
+
+    def test_sweeper_keeps_consent_extended_after_selecting_it(self):
+        consent = PatientDoctorConsent.objects.create(patient=self.patient, doctor=self.doctor,
+                                                      expires_at=timezone.now() - timedelta(minutes=1))
+        select = ExpireConsentsCommand.expired_batch
+
+        def select_then_extend(now, batch_size):
+            rows = select(now, batch_size)
+            PatientDoctorConsent.objects.filter(pk=consent.pk).update(expires_at=now + timedelta(days=30))
+            return rows
 
-# Create your tests here.
+        with mock.patch.object(ExpireConsentsCommand, "expired_batch", side_effect=select_then_extend):
+            self.assertEqual(ExpireConsentsCommand.sweep(batch_size=10), 0)
+        consent.refresh_from_db()
+        self.assertTrue(consent.is_active)
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reminders.services.dispatch import dispatch_due
+
+
+class Command(BaseCommand):
+    help = ("Turn due reminders into notifications and advance recurring ones (run periodically, or with --interval "
+            "as a daemon). Any number of dispatchers may run at once: each claims its own batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Reminders claimed per transaction")
+        parser.add_argument("--interval", type=int, default=0,
+                            help="Keep running and poll every N seconds (0 = drain once and exit)")
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        interval: int = options["interval"]
+        while True:
+            total = self.drain(batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Dispatched {total} reminders."))
+            if not interval:
+                return
+            time.sleep(interval)
+
+    @staticmethod
+    def drain(batch_size: int) -> int:
+        total = 0
+        while True:
+            sent = dispatch_due(batch_size)
+            total += sent
+            if sent < batch_size:
+                return total
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reminders.services.occurrences import extend_horizon
+
+
+class Command(BaseCommand):
+    help = ("Materialize the occurrences of recurring reminders that the rolling horizon has reached (run daily, or "
+            "with --interval as a daemon).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Reminders expanded per batch")
+        parser.add_argument("--interval", type=int, default=0,
+                            help="Keep running and extend every N seconds (0 = extend once and exit)")
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        interval: int = options["interval"]
+        while True:
+            added = extend_horizon(batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Materialized {added} reminder occurrences."))
+            if not interval:
+                return
+            time.sleep(interval)
@@ -1,5 +1,10 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from reminders.models import Reminder
+from reminders.models import Reminder, ReminderOccurrence
+from reminders.services.recurrence import is_valid_rrule
 
 
 class ReminderReadSerializer(serializers.ModelSerializer):
@@ -35,3 +40,43 @@ class ReminderWriteSerializer(serializers.ModelSerializer):
             "active",
         ]
         read_only_fields = ["id"]
+
+    def validate_rrule(self, value: str) -> str:
+        if value and not is_valid_rrule(value):
+            raise serializers.ValidationError("Not a valid iCal RRULE (an UNTIL must be given in UTC).")
+        return value
+
+    def validate(self, attrs):
+        if "due_at" in attrs or "rrule" in attrs:
+            attrs["recurrence_start"] = None  # the series restarts at the new due_at
+        return attrs
+
+
+class ReminderOccurrenceReadSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source="reminder.title", read_only=True)
+    preferred_channel = serializers.CharField(source="reminder.preferred_channel", read_only=True)
+
+    class Meta:
+        model = ReminderOccurrence
+        fields = ["id", "reminder", "patient", "occurs_at", "title", "preferred_channel"]
+        read_only_fields = fields
+
+
+class ReminderCalendarWindowSerializer(serializers.Serializer):
+    """
+    Query parameters of the calendar: the window [start, end) and optionally one patient. The window defaults to
+    the coming REMINDER_CALENDAR_DEFAULT_DAYS.
+    """
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    patient = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        attrs.setdefault("start", timezone.now())
+        attrs.setdefault("end", attrs["start"] + timedelta(days=getattr(settings, "REMINDER_CALENDAR_DEFAULT_DAYS", 30)))
+        if attrs["end"] <= attrs["start"]:
+            raise serializers.ValidationError("`end` must be after `start`.")
+        max_days = getattr(settings, "REMINDER_CALENDAR_MAX_DAYS", 366)
+        if attrs["end"] - attrs["start"] > timedelta(days=max_days):
+            raise serializers.ValidationError(f"The window may span at most {max_days} days.")
+        return attrs
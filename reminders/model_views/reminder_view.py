@@ -1,15 +1,22 @@
-from core.api_views import BaseLCAPIView, BaseRUDAPIView
-from core.permissions import CanWritePatientData
-from reminders.models import Reminder
-from reminders.model_serializers.reminder_serializers import ReminderReadSerializer, ReminderWriteSerializer
+from core.api_views import BaseBulkAPIView, BaseLCAPIView, BaseListAPIView, BaseRUDAPIView, PatientScopedMixin
+from core.permissions import CanReadPatientData, CanWritePatientData
+from profiles.models import PatientDoctorConsent
+from reminders.models import Reminder, ReminderOccurrence
+from reminders.model_serializers.reminder_serializers import (
+    ReminderCalendarWindowSerializer, ReminderOccurrenceReadSerializer, ReminderReadSerializer, ReminderWriteSerializer,
+)
+from reminders.services.occurrences import sync
 
 
-class ReminderListCreateView(BaseLCAPIView):
+class ReminderListCreateView(PatientScopedMixin, BaseLCAPIView):
     queryset = Reminder.objects.select_related("patient", "created_by").all()
     read_serializer_class = ReminderReadSerializer
     write_serializer_class = ReminderWriteSerializer
     list_read_serializer_class = ReminderReadSerializer
     permission_classes = [CanWritePatientData]  # doctor/admin can create for patient; patient reads theirs
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.REMINDERS
+    fast_read_serializer = True
 
 
 class ReminderRUDView(BaseRUDAPIView):
@@ -17,3 +24,40 @@ class ReminderRUDView(BaseRUDAPIView):
     read_serializer_class = ReminderReadSerializer
     write_serializer_class = ReminderWriteSerializer
     permission_classes = [CanWritePatientData]
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.REMINDERS
+
+
+class ReminderBulkView(BaseBulkAPIView):
+    queryset = Reminder.objects.select_related("patient", "created_by").all()
+    read_serializer_class = ReminderReadSerializer
+    write_serializer_class = ReminderWriteSerializer
+    permission_classes = [CanWritePatientData]
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.REMINDERS
+
+    def after_bulk_write(self, objects, creating: bool) -> None:
+        sync([reminder for reminder in objects if reminder.schedule_changed()])
+
+
+class ReminderCalendarView(PatientScopedMixin, BaseListAPIView):
+    """
+    Materialized reminder occurrences in `?start=...&end=...` (ISO 8601, end exclusive; by default the coming
+    REMINDER_CALENDAR_DEFAULT_DAYS), optionally for one `?patient=`: a patient's own, a doctor's consented
+    patients' or, for admins, everyone's. One range query on (patient, occurs_at); nothing is expanded per request.
+    """
+    queryset = ReminderOccurrence.objects.all()
+    serializer_class = ReminderOccurrenceReadSerializer
+    permission_classes = [CanReadPatientData]
+    patient_path = "patient"
+    consent_scope = PatientDoctorConsent.Scope.REMINDERS
+    fast_read_serializer = True
+
+    def filter_queryset(self, queryset):
+        window = ReminderCalendarWindowSerializer(data=self.request.query_params)
+        window.is_valid(raise_exception=True)
+        queryset = queryset.filter(occurs_at__gte=window.validated_data["start"],
+                                   occurs_at__lt=window.validated_data["end"])
+        if "patient" in window.validated_data:
+            queryset = queryset.filter(patient_id=window.validated_data["patient"])
+        return super().filter_queryset(queryset).order_by("occurs_at", "pk")
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from core.indexes import PartialIndex
 from core.models import BaseModel
 
 
@@ -15,6 +16,9 @@ class Reminder(BaseModel):
         indexes = [
             models.Index(fields=["patient", "due_at"]),
             models.Index(fields=["active"]),
+            # the dispatcher's claim query: active reminders in due_at order (reminders.services.dispatch)
+            PartialIndex(fields=["due_at"], condition=models.Q(active=True), fallback_fields=["active", "due_at"],
+                         name="reminder_due_active_idx"),
         ]
 
     patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="reminders")
@@ -25,4 +29,47 @@ class Reminder(BaseModel):
     rrule = models.CharField(max_length=300, blank=True, default="")  # optional iCal RRULE for periodic check-ups
     preferred_channel = models.CharField(max_length=10, choices=Channel.choices, default=Channel.EMAIL)
     last_sent_at = models.DateTimeField(null=True, blank=True)
+    # DTSTART of `rrule`: the first due_at of the series, kept while the dispatcher advances due_at
+    recurrence_start = models.DateTimeField(null=True, blank=True, editable=False)
     active = models.BooleanField(default=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_schedule = instance.schedule_state()
+        return instance
+
+    def schedule_state(self) -> tuple:
+        # read from __dict__ so deferred fields are never loaded just for this
+        return tuple(self.__dict__.get(name) for name in ("patient_id", "due_at", "rrule", "recurrence_start", "active"))
+
+    def schedule_changed(self) -> bool:
+        """
+        Whether anything its occurrences depend on differs from the row as loaded (always True for new instances).
+        """
+        return getattr(self, "_loaded_schedule", None) != self.schedule_state()
+
+
+class ReminderOccurrence(models.Model):
+    """
+    One occurrence of a reminder, materialized up to REMINDER_OCCURRENCE_HORIZON_DAYS ahead so calendar windows
+    are a range scan instead of an RRULE expansion per request (maintained by reminders.services.occurrences).
+    Occurrences already past are kept as history; future ones follow every change of the reminder's schedule.
+    """
+    class Meta:
+        verbose_name = "Reminder occurrence"
+        verbose_name_plural = "Reminder occurrences"
+        db_table = "reminder_occurrence"
+        constraints = [
+            models.UniqueConstraint(fields=["reminder", "occurs_at"], name="reminder_occurrence_unique"),
+        ]
+        indexes = [
+            # the calendar's window query, per patient (or per consented patient of a doctor)
+            models.Index(fields=["patient", "occurs_at"]),
+            models.Index(fields=["occurs_at"]),
+        ]
+
+    reminder = models.ForeignKey(Reminder, on_delete=models.CASCADE, related_name="occurrences")
+    # copied from the reminder so a window is filtered without a join
+    patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="reminder_occurrences")
+    occurs_at = models.DateTimeField()
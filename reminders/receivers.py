@@ -0,0 +1,17 @@
+# reminders/receivers.py
+from typing import Any
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from reminders.models import Reminder
+from reminders.services.occurrences import sync
+
+
+@receiver(post_save, sender=Reminder)
+def sync_occurrences_on_save(sender: Any, instance: Reminder, raw: bool = False, **kwargs: Any) -> None:
+    # title/description edits leave the materialized occurrences as they are
+    if raw or not instance.schedule_changed():
+        return
+    sync([instance])
+    instance._loaded_schedule = instance.schedule_state()
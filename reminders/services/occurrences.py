@@ -0,0 +1,117 @@
+# reminders/services/occurrences.py
+"""
+Materialized reminder occurrences (ReminderOccurrence) over a rolling horizon.
+
+A reminder fires first at its `due_at`, then at each occurrence of its `rrule` (anchored at `recurrence_start`,
+else `due_at`) after that, exactly as reminders.services.dispatch sends it. `sync()` replaces a reminder's
+occurrences from its next pending one (or from now, once deactivated) up to the horizon and is called on every
+schedule change: post_save (reminders.receivers) and the bulk endpoint, which sends no signals. The dispatcher
+only moves `due_at` along the same series, so it leaves the rows alone. `extend_horizon()` runs periodically
+(`manage.py extend_reminder_occurrences`) to keep recurring series materialized as the horizon moves on.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from itertools import takewhile
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from core.response_cache import invalidate_models
+from core.streaming import iter_chunks
+from reminders.models import Reminder, ReminderOccurrence
+from reminders.services.recurrence import parse_rrule
+
+# reminders per DELETE: one OR-ed condition each, well under SQLite's expression depth limit
+_DELETE_CHUNK = 200
+
+
+def horizon(now: datetime) -> datetime:
+    return now + timedelta(days=getattr(settings, "REMINDER_OCCURRENCE_HORIZON_DAYS", 365))
+
+
+def expand(reminder: Reminder, until: datetime, after: Optional[datetime] = None) -> List[datetime]:
+    """
+    Occurrences of `reminder` up to `until`: from `due_at` on, or strictly after `after` when that is later; at most
+    REMINDER_OCCURRENCE_MAX_PER_REMINDER of them (`extend_horizon()` continues where a capped run stopped).
+    """
+    limit = getattr(settings, "REMINDER_OCCURRENCE_MAX_PER_REMINDER", 1000)
+    occurrences = []
+    if after is None or after < reminder.due_at:
+        if reminder.due_at > until:
+            return []
+        occurrences.append(reminder.due_at)
+        after = reminder.due_at
+    if not reminder.rrule:
+        return occurrences
+    try:
+        rule = parse_rrule(reminder.rrule, reminder.recurrence_start or reminder.due_at)
+        following = rule.xafter(after, count=limit - len(occurrences))
+        occurrences.extend(takewhile(lambda occurs_at: occurs_at <= until, following))
+    except (ValueError, TypeError):
+        pass  # invalid rule: only due_at, as the dispatcher would deactivate it after sending
+    return occurrences
+
+
+def occurrence_rows(reminder: Reminder, until: datetime,
+                    after: Optional[datetime] = None) -> List[ReminderOccurrence]:
+    """
+    Unsaved ReminderOccurrence rows for `expand(reminder, until, after)`.
+    """
+    return [ReminderOccurrence(reminder_id=reminder.pk, patient_id=reminder.patient_id, occurs_at=occurs_at)
+            for occurs_at in expand(reminder, until, after)]
+
+
+def sync(reminders: Iterable[Reminder], now: Optional[datetime] = None) -> int:
+    """
+    Rebuild the pending occurrences of `reminders` from their current schedule: rows from the next pending
+    occurrence (an overdue `due_at` included) on are replaced, earlier ones stay as history; an inactive
+    reminder only loses its future rows. Returns the number of rows written.
+    """
+    now = now or timezone.now()
+    until = horizon(now)
+    rows = []
+    with transaction.atomic():
+        for chunk in iter_chunks(reminders, _DELETE_CHUNK):
+            stale = Q()
+            for reminder in chunk:
+                since = min(reminder.due_at, now) if reminder.active else now
+                stale |= Q(reminder_id=reminder.pk, occurs_at__gte=since)
+                if reminder.active:
+                    rows.extend(occurrence_rows(reminder, until))
+            ReminderOccurrence.objects.filter(stale).delete()
+        ReminderOccurrence.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    invalidate_models(ReminderOccurrence)  # bulk writes send no post_save
+    return len(rows)
+
+
+def extend_horizon(batch_size: int = 500, now: Optional[datetime] = None) -> int:
+    """
+    Materialize the occurrences of active recurring reminders that the moving horizon has reached, continuing
+    after each series' last stored occurrence. Returns the number of rows added.
+    """
+    now = now or timezone.now()
+    until = horizon(now)
+    reminders = (
+        Reminder.objects.filter(active=True).exclude(rrule="")
+        .annotate(last_occurrence=Max("occurrences__occurs_at"))
+        .filter(Q(last_occurrence__isnull=True) | Q(last_occurrence__lt=until))
+        .order_by("pk")
+    )
+    added, last_pk = 0, 0
+    while True:
+        batch = list(reminders.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        rows = []
+        for reminder in batch:
+            rows.extend(occurrence_rows(reminder, until, after=reminder.last_occurrence))
+        ReminderOccurrence.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+        added += len(rows)
+        last_pk = batch[-1].pk
+    if added:
+        invalidate_models(ReminderOccurrence)
+    return added
@@ -0,0 +1,36 @@
+# reminders/services/recurrence.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from dateutil.rrule import rrule, rruleset, rrulestr
+
+
+@lru_cache(maxsize=1024)
+def parse_rrule(rule: str, dtstart: datetime) -> rrule | rruleset:
+    """
+    Parsed iCal RRULE anchored at `dtstart`; raises ValueError for rules dateutil cannot read (including an
+    UNTIL that is not in UTC while `dtstart` is aware).
+    """
+    return rrulestr(rule, dtstart=dtstart)
+
+
+def next_occurrence(rule: str, start: datetime, after: datetime) -> Optional[datetime]:
+    """
+    First occurrence of `rule` (anchored at `start`) strictly after `after`; None when the series has ended or
+    the rule is invalid.
+    """
+    try:
+        return parse_rrule(rule, start).after(after)
+    except (ValueError, TypeError):
+        return None
+
+
+def is_valid_rrule(rule: str) -> bool:
+    try:
+        parse_rrule(rule, datetime(2000, 1, 1, tzinfo=timezone.utc))
+    except (ValueError, TypeError):
+        return False
+    return True
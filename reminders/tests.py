@@ -1,3 +1,212 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.const import ADMIN, DOCTOR, PATIENT
+from notifications.models import Notification
+from profiles.models import PatientDoctorConsent
+from reminders.model_serializers.reminder_serializers import ReminderWriteSerializer
+from reminders.models import Reminder, ReminderOccurrence
+from reminders.services.dispatch import dispatch_due
+from reminders.services.occurrences import extend_horizon
+
+User = get_user_model()
+
+
+class ReminderDispatchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.patient = User.objects.create_user(email="p1@example.com", password="pass",
+                                                group=Group.objects.get_or_create(name=PATIENT)[0])
+        self.now = timezone.now().replace(microsecond=0)
+
+    def reminder(self, due_in: timedelta, **kwargs) -> Reminder:
+        return Reminder.objects.create(patient=self.patient, title="Blood test", due_at=self.now + due_in, **kwargs)
+
+    def test_one_off_reminder_is_sent_once(self):
+        reminder = self.reminder(-timedelta(minutes=5), preferred_channel=Reminder.Channel.PUSH)
+        later = self.reminder(timedelta(days=1))
+
+        self.assertEqual(dispatch_due(now=self.now), 1)
+        self.assertEqual(dispatch_due(now=self.now), 0)
+
+        notification = Notification.objects.get()
+        self.assertEqual((notification.user, notification.kind, notification.channel),
+                         (self.patient, Notification.Kind.REMINDER, Notification.Channel.PUSH))
+        self.assertEqual(notification.payload["reminder_id"], reminder.pk)
+        reminder.refresh_from_db()
+        self.assertFalse(reminder.active)
+        self.assertEqual(reminder.last_sent_at, self.now)
+        later.refresh_from_db()
+        self.assertTrue(later.active)
+        self.assertIsNone(later.last_sent_at)
+
+    def test_recurring_reminder_advances_until_the_series_ends(self):
+        reminder = self.reminder(timedelta(0), rrule="FREQ=DAILY;COUNT=3")
+        for day in range(3):
+            self.assertEqual(dispatch_due(now=self.now + timedelta(days=day)), 1)
+            reminder.refresh_from_db()
+            self.assertEqual(reminder.recurrence_start, self.now)
+        self.assertFalse(reminder.active)
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_missed_occurrences_are_not_replayed(self):
+        reminder = self.reminder(-timedelta(days=10), rrule="FREQ=DAILY")
+        self.assertEqual(dispatch_due(now=self.now), 1)
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.due_at, self.now + timedelta(days=1))
+        self.assertEqual(dispatch_due(now=self.now), 0)
+
+    def test_batches_and_command(self):
+        for _ in range(5):
+            self.reminder(-timedelta(minutes=1))
+        self.assertEqual(dispatch_due(batch_size=2, now=self.now), 2)
+        out = StringIO()
+        call_command("dispatch_reminders", batch_size=2, stdout=out)
+        self.assertIn("Dispatched 3 reminders.", out.getvalue())
+        self.assertFalse(Reminder.objects.filter(active=True).exists())
+
+    def test_invalid_rrule_is_rejected(self):
+        data = {"patient": self.patient.pk, "title": "Check-up", "due_at": self.now.isoformat()}
+        self.assertFalse(ReminderWriteSerializer(data=dict(data, rrule="FREQ=SOMETIMES")).is_valid())
+        self.assertFalse(ReminderWriteSerializer(data=dict(data, rrule="FREQ=DAILY;UNTIL=20300101T000000")).is_valid())
+        self.assertTrue(ReminderWriteSerializer(data=dict(data, rrule="FREQ=WEEKLY;UNTIL=20300101T000000Z")).is_valid())
+
+
+class ReminderOccurrenceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        groups = {name: Group.objects.get_or_create(name=name)[0] for name in (ADMIN, DOCTOR, PATIENT)}
+        self.admin = User.objects.create_user(email="admin@example.com", password="pass", group=groups[ADMIN])
+        self.doctor = User.objects.create_user(email="doc@example.com", password="pass", group=groups[DOCTOR])
+        self.patient = User.objects.create_user(email="p1@example.com", password="pass", group=groups[PATIENT])
+        self.stranger = User.objects.create_user(email="p2@example.com", password="pass", group=groups[PATIENT])
+        PatientDoctorConsent.objects.create(patient=self.patient, doctor=self.doctor,
+                                            scope=PatientDoctorConsent.Scope.REMINDERS)
+        self.now = timezone.now().replace(microsecond=0)
+
+    def reminder(self, due_in: timedelta, patient=None, **kwargs) -> Reminder:
+        return Reminder.objects.create(patient=patient or self.patient, title="Blood test",
+                                       due_at=self.now + due_in, **kwargs)
+
+    def occurrences(self, reminder: Reminder) -> list:
+        return list(reminder.occurrences.order_by("occurs_at").values_list("occurs_at", flat=True))
+
+    def calendar(self, user, start: timedelta, end: timedelta, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        params.update(start=(self.now + start).isoformat(), end=(self.now + end).isoformat(), page_size=100)
+        return client.get(reverse("reminders:reminder-calendar"), params)
+
+    @override_settings(REMINDER_OCCURRENCE_HORIZON_DAYS=30)
+    def test_materialized_on_create_up_to_the_horizon(self):
+        one_off = self.reminder(timedelta(days=2))
+        weekly = self.reminder(timedelta(days=1), rrule="FREQ=WEEKLY")
+        beyond = self.reminder(timedelta(days=40))
+        self.assertEqual(self.occurrences(one_off), [self.now + timedelta(days=2)])
+        self.assertEqual(self.occurrences(weekly), [self.now + timedelta(days=1 + 7 * week) for week in range(5)])
+        self.assertEqual(self.occurrences(beyond), [])
+        self.assertEqual(set(ReminderOccurrence.objects.values_list("patient_id", flat=True)), {self.patient.pk})
+
+    def test_edit_and_deactivation_replace_future_occurrences(self):
+        reminder = self.reminder(timedelta(days=1), rrule="FREQ=DAILY;COUNT=3")
+        reminder.title = "Renamed"
+        with CaptureQueriesContext(connection) as queries:
+            reminder.save()
+        self.assertFalse(any("reminder_occurrence" in query["sql"] for query in queries))
+
+        reminder.due_at = self.now + timedelta(days=5)
+        reminder.rrule = "FREQ=DAILY;COUNT=2"
+        reminder.save()
+        self.assertEqual(self.occurrences(reminder), [self.now + timedelta(days=5), self.now + timedelta(days=6)])
+
+        reminder.active = False
+        reminder.save()
+        self.assertEqual(self.occurrences(reminder), [])
+
+    def test_past_occurrences_stay_and_dispatch_leaves_the_series(self):
+        reminder = self.reminder(-timedelta(days=1), rrule="FREQ=DAILY;COUNT=3")
+        expected = [self.now + timedelta(days=day) for day in (-1, 0, 1)]
+        self.assertEqual(self.occurrences(reminder), expected)
+        dispatch_due(now=self.now + timedelta(minutes=1))
+        self.assertEqual(self.occurrences(reminder), expected)
+
+        reminder.refresh_from_db()
+        reminder.active = False
+        reminder.save()
+        self.assertEqual(self.occurrences(reminder), expected[:2])
+
+    def test_bulk_endpoint_maintains_occurrences(self):
+        client = APIClient()
+        client.force_authenticate(self.doctor)
+        url = reverse("reminders:reminder-bulk")
+        due_at = (self.now + timedelta(days=1)).isoformat()
+        response = client.post(url, [{"patient": self.patient.pk, "title": f"R{i}", "due_at": due_at,
+                                      "rrule": "FREQ=DAILY;COUNT=2"} for i in range(3)], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ReminderOccurrence.objects.count(), 6)
+
+        ids = [item["id"] for item in response.data["result"]["items"]]
+        response = client.patch(url, [{"id": ids[0], "active": False}, {"id": ids[1], "title": "Renamed"}],
+                                format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ReminderOccurrence.objects.filter(reminder_id=ids[0]).count(), 0)
+        self.assertEqual(ReminderOccurrence.objects.filter(reminder_id=ids[1]).count(), 2)
+
+    @override_settings(REMINDER_OCCURRENCE_HORIZON_DAYS=10)
+    def test_horizon_extension(self):
+        reminder = self.reminder(timedelta(days=1), rrule="FREQ=DAILY")
+        self.assertEqual(len(self.occurrences(reminder)), 10)
+        self.assertEqual(extend_horizon(now=self.now), 0)
+        self.assertEqual(extend_horizon(now=self.now + timedelta(days=5)), 5)
+        self.assertEqual(self.occurrences(reminder)[-1], self.now + timedelta(days=15))
+        out = StringIO()
+        call_command("extend_reminder_occurrences", stdout=out)
+        self.assertIn("reminder occurrences", out.getvalue())
+
+    def test_calendar_scoped_by_role_and_window(self):
+        own = self.reminder(timedelta(days=1), rrule="FREQ=DAILY;COUNT=3")
+        self.reminder(timedelta(days=2), patient=self.stranger)
+        self.reminder(timedelta(days=20))
+
+        response = self.calendar(self.doctor, timedelta(0), timedelta(days=10))
+        self.assertEqual(response.status_code, 200)
+        rows = response.data["result"]
+        self.assertEqual([row["occurs_at"] for row in rows],
+                         [(self.now + timedelta(days=day)).isoformat().replace("+00:00", "Z") for day in (1, 2, 3)])
+        self.assertEqual({(row["reminder"], row["patient"], row["title"]) for row in rows},
+                         {(own.pk, self.patient.pk, "Blood test")})
+
+        self.assertEqual(len(self.calendar(self.stranger, timedelta(0), timedelta(days=10)).data["result"]), 1)
+        self.assertEqual(len(self.calendar(self.admin, timedelta(0), timedelta(days=30)).data["result"]), 5)
+        response = self.calendar(self.admin, timedelta(0), timedelta(days=30), patient=self.stranger.pk)
+        self.assertEqual(len(response.data["result"]), 1)
+
+    def test_calendar_rejects_bad_windows(self):
+        self.assertEqual(self.calendar(self.patient, timedelta(days=2), timedelta(days=1)).status_code, 400)
+        self.assertEqual(self.calendar(self.patient, timedelta(0), timedelta(days=400)).status_code, 400)
+
+    def test_calendar_defaults_to_the_coming_days(self):
+        self.reminder(timedelta(days=1))
+        self.reminder(timedelta(days=40))
+        client = APIClient()
+        client.force_authenticate(self.patient)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("reminders:reminder-calendar"), {"paginate": "false"})
+            rows = json.loads(b"".join(response.streaming_content))["result"]
+        self.assertEqual(len(rows), 1)
+        # one range query for the rows, nothing per reminder
+        self.assertEqual(sum("reminder_occurrence" in query["sql"] for query in queries), 1)
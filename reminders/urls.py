@@ -1,7 +1,7 @@
 from django.urls import path
 
 from reminders.model_views.reminder_view import (
-    ReminderListCreateView, ReminderRUDView,
+    ReminderBulkView, ReminderCalendarView, ReminderListCreateView, ReminderRUDView,
 )
 
 app_name = "reminders"
@@ -9,4 +9,6 @@ app_name = "reminders"
 urlpatterns = [
     path("", ReminderListCreateView.as_view(), name="reminder-list-create"),
     path("<int:pk>/", ReminderRUDView.as_view(), name="reminder-rud"),
+    path("bulk/", ReminderBulkView.as_view(), name="reminder-bulk"),
+    path("calendar/", ReminderCalendarView.as_view(), name="reminder-calendar"),
 ]